@@ -5,7 +5,6 @@ import os
 import sys
 import logging
 import re
-import hashlib
 import time 
 import traceback 
 import os.path 
@@ -18,6 +17,7 @@ import simplejson
 import doekbase.Transform.script_utils as script_utils
 import TextFileDecoder
 import doekbase.workspace.client
+from doekbase.data_api.sequence import digest
 
 # transformation method that can be called if this module is imported
 # Note the logger has different levels it could be run.  
@@ -129,7 +129,7 @@ def transform(shock_service_url=None,
         sequence_list = []
         fasta_dict = dict()
         first_header_found = False
-        contig_set_md5_list = []
+        assembly_digest = digest.AssemblyDigest()
         # Pattern for replacing white space
         pattern = re.compile(r'\s+')
         sequence_exists = False
@@ -171,9 +171,12 @@ def transform(shock_service_url=None,
                             if character in amino_acid_specific_characters:
                                 raise Exception("This fasta file may have amino acids in it instead of the required nucleotides.")
                             raise Exception("This FASTA file has non nucleic acid characters : {0}".format(character))
-                    length = len(total_sequence)
+                    # md5, length and GC in one pass, as the Assembly API computes them
+                    contig_digest = digest.digest_sequence(total_sequence)
+                    assembly_digest.add_digest(contig_digest)
+                    length = contig_digest.length
                     total_length = total_length + length
-                    contig_gc_length = len(re.findall('G|g|C|c',total_sequence))
+                    contig_gc_length = contig_digest.gc_count
                     contig_dict = dict() 
                     contig_dict["gc_content"] = float(contig_gc_length)/float(length) 
                     gc_length = gc_length + contig_gc_length
@@ -182,9 +185,8 @@ def transform(shock_service_url=None,
                     contig_dict["length"] = length 
                     contig_dict["name"] = fasta_key 
                     contig_dict["description"] = "Note MD5 is generated from uppercasing the sequence" 
-                    contig_md5 = hashlib.md5(total_sequence.upper()).hexdigest() 
+                    contig_md5 = contig_digest.hexdigest() 
                     contig_dict["md5"] = contig_md5 
-                    contig_set_md5_list.append(contig_md5)
                     contig_dict["is_circular"] = "unknown"
                     contig_dict["start_position"] = sequence_start
                     contig_dict["num_bytes"] = sequence_stop - sequence_start
@@ -231,9 +233,12 @@ def transform(shock_service_url=None,
                         raise Exception("This fasta file may have amino acids in it instead of the required nucleotides.")
                     raise Exception("This FASTA file has non nucleic acid characters : {0}".format(character))
 
-            length = len(total_sequence)
+            # md5, length and GC in one pass, as the Assembly API computes them
+            contig_digest = digest.digest_sequence(total_sequence)
+            assembly_digest.add_digest(contig_digest)
+            length = contig_digest.length
             total_length = total_length + length
-            contig_gc_length = len(re.findall('G|g|C|c',total_sequence))
+            contig_gc_length = contig_digest.gc_count
             contig_dict = dict()
             contig_dict["gc_content"] = float(contig_gc_length)/float(length) 
             gc_length = gc_length + contig_gc_length
@@ -242,9 +247,8 @@ def transform(shock_service_url=None,
             contig_dict["length"] = length
             contig_dict["name"] = fasta_key
             contig_dict["description"] = "Note MD5 is generated from uppercasing the sequence" 
-            contig_md5 = hashlib.md5(total_sequence.upper()).hexdigest()
+            contig_md5 = contig_digest.hexdigest()
             contig_dict["md5"]= contig_md5
-            contig_set_md5_list.append(contig_md5)
             contig_dict["is_circular"] = "unknown"
             contig_dict["start_position"] = sequence_start
             contig_dict["num_bytes"] = sequence_stop - sequence_start
@@ -258,7 +262,7 @@ def transform(shock_service_url=None,
 #            output_file_name = "{0}_contig_set.json".format(os.path.splitext(base)[0])
     
         contig_set_dict = dict()
-        contig_set_dict["md5"] = hashlib.md5(",".join(sorted(contig_set_md5_list))).hexdigest()
+        contig_set_dict["md5"] = assembly_digest.hexdigest()
         contig_set_dict["assembly_id"] = genome_id
         contig_set_dict["name"] = genome_id
         contig_set_dict["external_source"] = "KBase"
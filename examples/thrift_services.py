@@ -11,15 +11,10 @@ import logging
 import sys
 # Third-party
 from thrift import Thrift
-from thrift.transport import TSocket
-from thrift.transport import TTransport
-from thrift.protocol import TBinaryProtocol
-from thrift.server import TServer
 # Local
-from doekbase.data_api.baseobj import thrift_service
 from doekbase.data_api.baseobj.ttypes import *
-from doekbase.data_api.baseobj.impl import ObjectImpl
 from doekbase.data_api.util import get_logger
+from doekbase.data_api import thrift_server
 
 DEFAULT_WS_URL = 'https://ci.kbase.us/services/ws/'
 DEFAULT_SHOCK_URL = 'https://ci.kbase.us/services/shock-api/'
@@ -31,19 +26,15 @@ def get_services_dict(ws=DEFAULT_WS_URL, shock=DEFAULT_SHOCK_URL):
     return {'workspace_service_url': ws,
             'shock_service_url': shock}
 
-def object_service():
-    handler = ObjectImpl(services=get_services_dict())
-    processor = thrift_service.Processor(handler)
-    transport = TSocket.TServerSocket(port=9090)
-    tfactory = TTransport.TBufferedTransportFactory()
-    pfactory = TBinaryProtocol.TBinaryProtocolFactory()
-
-    server = TServer.TSimpleServer(processor, transport, tfactory, pfactory)
-
+def object_service(server_type='threadpool', workers=10):
+    factory = thrift_server.object_processor_factory(get_services_dict())
+    server = thrift_server.create_server(factory, port=9090,
+                                         server_type=server_type,
+                                         workers=workers)
     return server
 
 def main():
-    server = object_service() # XXX: Run alternate ones
+    server = object_service()
     print('Starting the server...')
     server.serve()
     print('done.')
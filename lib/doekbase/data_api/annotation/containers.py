@@ -0,0 +1,257 @@
+"""
+Cache of the feature containers of a Genome Annotation.
+
+A GenomeAnnotation object keeps its features in one FeatureContainer
+object per feature type, and most feature methods read some or all of
+the features of several containers. The cache keeps, for each
+container, either all its features or those fetched so far, so that
+calls on the same GenomeAnnotationAPI object do not transfer the same
+features twice. Containers are dropped, least recently used first, to
+keep the estimated size of the cached features under a cap.
+
+Containers that are not cached are fetched concurrently, one Workspace
+call per container, so that fetching several large containers costs
+about as long as fetching the largest. Each cache starts its threads
+the first time it needs them and reuses them until it is closed.
+
+Workspace objects never change once saved, so cached features never
+go stale.
+"""
+
+# Imports
+
+# Stdlib
+import collections
+from multiprocessing.pool import ThreadPool
+import os
+import threading
+# Local
+from doekbase.data_api.util import get_logger
+
+# Constants
+
+#: Environment variable with the size cap, in bytes
+CACHE_MAX_BYTES_ENV = 'KB_FEATURE_CACHE_MAX_BYTES'
+#: Default size cap, in bytes
+DEFAULT_MAX_BYTES = 512 * 2**20
+#: Key in the services dictionary with the number of containers to
+#: fetch at once
+WORKERS_SERVICE_KEY = 'feature_container_workers'
+#: Default number of containers to fetch at once
+MAX_WORKERS = 4
+
+# Logging
+
+_log = get_logger('feature_containers')
+
+# Classes and functions
+
+def estimate_size(value):
+    """Rough size in memory of decoded object data, in bytes.
+    Strings count their length, and every other value a fixed overhead.
+    """
+    size, stack = 0, [value]
+    while stack:
+        v = stack.pop()
+        if isinstance(v, basestring):
+            size += 40 + len(v)
+        elif isinstance(v, dict):
+            size += 100 + 16 * len(v)
+            stack.extend(v.keys())
+            stack.extend(v.values())
+        elif isinstance(v, (list, tuple)):
+            size += 60 + 8 * len(v)
+            stack.extend(v)
+        else:
+            size += 24
+    return size
+
+
+class _Container(object):
+    """Features cached for one container."""
+    __slots__ = ('features', 'complete', 'nbytes')
+
+    def __init__(self):
+        self.features = dict()
+        self.complete = False
+        self.nbytes = 0
+
+
+class FeatureContainerCache(object):
+    """Features of the containers of one Genome Annotation.
+
+    Args:
+      ws_client: Workspace client, with a `batch()` method as in
+        :class:`doekbase.data_api.wsfile.WorkspaceFile`.
+      max_bytes (int): Most bytes of features to keep, as estimated by
+        :func:`estimate_size`. If None, taken from the environment
+        variable named by `CACHE_MAX_BYTES_ENV`, or `DEFAULT_MAX_BYTES`.
+      max_workers (int): Most containers fetched at once. With 1, they
+        are fetched in a single batched Workspace call instead.
+    """
+    def __init__(self, ws_client, max_bytes=None, max_workers=MAX_WORKERS):
+        if max_bytes is None:
+            max_bytes = int(os.environ.get(CACHE_MAX_BYTES_ENV,
+                                           DEFAULT_MAX_BYTES))
+        self.max_bytes = max_bytes
+        self.max_workers = max_workers
+        self._ws = ws_client
+        self._lock = threading.Lock()
+        self._containers = collections.OrderedDict()
+        self._nbytes = 0
+        self._pool = None
+
+    def __del__(self):
+        # let the idle threads exit; close() also waits for them
+        pool = getattr(self, '_pool', None)
+        if pool is not None:
+            pool.close()
+
+    @property
+    def nbytes(self):
+        """Estimated bytes of cached features."""
+        return self._nbytes
+
+    def features(self, container_refs, feature_ids=None, fields=None):
+        """Get features of several containers, fetching any that are not
+        cached concurrently.
+
+        Args:
+          container_refs (list<str>): Feature container references.
+          feature_ids (dict<str,list<str>>): For each container reference,
+            the keys of the features to get. If None, get all features.
+          fields (list<str>): If given, get only these fields of every
+            feature. Not used with `feature_ids`. Such partial features
+            are not cached, but are taken from the cache when the whole
+            container is there.
+        Returns:
+          dict<str,dict>: Features, by feature key, for each container.
+            The features are shared with the cache and must not be changed.
+        """
+        result, wanted = dict(), dict()
+        with self._lock:
+            for ref in container_refs:
+                container = self._touch(ref)
+                if container is not None and container.complete:
+                    result[ref] = container.features
+                elif feature_ids is None:
+                    wanted[ref] = None
+                else:
+                    cached = container.features if container else {}
+                    missing = [k for k in feature_ids[ref] if k not in cached]
+                    if missing:
+                        wanted[ref] = missing
+                    else:
+                        result[ref] = self._select(cached, feature_ids[ref])
+        if not wanted:
+            return result
+        fetched = self._fetch(wanted, fields if feature_ids is None else None)
+        with self._lock:
+            for ref, keys in wanted.items():
+                if feature_ids is None and fields is not None:
+                    result[ref] = fetched[ref]
+                    continue
+                container = self._store(ref, fetched[ref], keys is None)
+                if keys is None:
+                    result[ref] = container.features
+                else:
+                    result[ref] = self._select(container.features,
+                                               feature_ids[ref])
+            self._evict()
+        return result
+
+    def clear(self):
+        """Drop all cached features."""
+        with self._lock:
+            self._containers.clear()
+            self._nbytes = 0
+
+    def close(self):
+        """Stop the threads fetching containers, waiting for them to
+        finish. The cache starts new threads if it is used again.
+        """
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPool(self.max_workers)
+            return self._pool
+
+    def _touch(self, ref):
+        # caller must hold the lock
+        container = self._containers.pop(ref, None)
+        if container is not None:
+            self._containers[ref] = container  # most recently used
+        return container
+
+    def _select(self, features, keys):
+        return dict([(k, features[k]) for k in keys if k in features])
+
+    def _subset(self, ref, keys, fields):
+        """Arguments of the Workspace call fetching whole containers
+        (keys None), some features, or some fields of every feature.
+        """
+        if keys is None and fields is not None:
+            return "get_object_subset", [{
+                "ref": ref, "included": ["features/*/" + x for x in fields]}]
+        elif keys is None:
+            return "get_objects", [{"ref": ref}]
+        return "get_object_subset", [{
+            "ref": ref, "included": ["features/" + x for x in keys]}]
+
+    def _features(self, objects):
+        # a subset matching nothing has no object
+        return objects[0]["data"]["features"] if objects else {}
+
+    def _fetch(self, wanted, fields):
+        """Fetch containers, concurrently or, with one worker, in one batch.
+        """
+        refs = wanted.keys()
+        if self.max_workers <= 1:
+            results = dict()
+            with self._ws.batch() as batch:
+                for ref in refs:
+                    method, params = self._subset(ref, wanted[ref], fields)
+                    results[ref] = getattr(batch, method)(params)
+            return dict([(ref, self._features(results[ref].result()))
+                         for ref in refs])
+
+        def fetch(ref):
+            method, params = self._subset(ref, wanted[ref], fields)
+            return self._features(getattr(self._ws, method)(params))
+
+        if len(refs) == 1:
+            fetched = [fetch(refs[0])]
+        else:
+            fetched = self._get_pool().map(fetch, refs)
+        return dict(zip(refs, fetched))
+
+    def _store(self, ref, features, complete):
+        # caller must hold the lock
+        container = self._touch(ref)
+        if container is None:
+            container = self._containers[ref] = _Container()
+        self._nbytes -= container.nbytes
+        if complete:
+            container.features = features
+            container.nbytes = estimate_size(features)
+            container.complete = True
+        else:
+            # only features not already cached are fetched
+            container.features.update(features)
+            container.nbytes += estimate_size(features)
+        self._nbytes += container.nbytes
+        return container
+
+    def _evict(self):
+        # caller must hold the lock; keeps at least the newest container
+        while self._nbytes > self.max_bytes and len(self._containers) > 1:
+            ref, container = self._containers.popitem(last=False)
+            self._nbytes -= container.nbytes
+            _log.debug('Dropped feature container {} ({:d} bytes)'
+                       .format(ref, container.nbytes))
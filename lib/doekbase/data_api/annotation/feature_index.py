@@ -0,0 +1,240 @@
+"""
+Indexes of Genome Annotation features, built once per genome.
+
+An index is built from all the features of a genome the first time a
+query needs it. Workspace objects never change once saved, so the index
+is kept in a process-wide cache keyed by the versioned object reference,
+and shared by every API object for that genome.
+"""
+
+# Imports
+
+# Stdlib
+import array
+import bisect
+import collections
+import threading
+
+# Constants
+
+#: Most genomes whose indexes are kept at once
+MAX_CACHED_GENOMES = 32
+
+# Classes and functions
+
+class IntervalIndex(object):
+    """Feature locations on each contig and strand, as sorted arrays,
+    for overlap queries.
+
+    Locations follow the Genome Annotation convention
+    (contig_id, start, strand, length), and a location overlaps a region
+    [start, stop] if `loc_start <= stop and start <= loc_start + length`,
+    as in :meth:`GenomeInterface.get_feature_ids`.
+
+    Locations are grouped by length, each group holding lengths within
+    a factor of two, and sorted by start within a group. A query only
+    looks at locations of a group that start at most the longest length
+    of the group before the region, so one long location, such as a
+    whole-contig feature, does not slow down queries elsewhere. A query
+    costs O(g log n + k) for g groups and k results, plus the shorter
+    locations of each group that start just before the region; in the
+    worst case, O(n).
+
+    Args:
+      locations (iterable<tuple>): (feature_id, contig_id, start,
+        strand, length) for each location of each feature.
+    """
+    def __init__(self, locations):
+        by_key = collections.defaultdict(list)
+        for feature_id, contig_id, start, strand, length in locations:
+            # group by length class: lengths in [2**(b-1), 2**b)
+            group = (contig_id, strand, max(length, 0).bit_length())
+            by_key[group].append((start, start + length, feature_id))
+        self._tables = collections.defaultdict(list)
+        for (contig_id, strand, _), items in by_key.items():
+            items.sort()
+            starts = array.array('l', [s for s, _, _ in items])
+            ends = array.array('l', [e for _, e, _ in items])
+            max_length = max([e - s for s, e, _ in items])
+            self._tables[(contig_id, strand)].append(
+                (starts, ends, max_length, [f for _, _, f in items]))
+        self._tables = dict(self._tables)
+
+    def strands(self, contig_id):
+        """Strands with locations on a contig."""
+        return [s for c, s in self._tables if c == contig_id]
+
+    def overlapping(self, contig_id, strand, start, stop):
+        """Find features with a location overlapping a region.
+
+        Args:
+          contig_id (str): Contig
+          strand (str): "+", "-", or "?" for either
+          start (int): First position of the region
+          stop (int): Last position of the region
+        Returns:
+          list<str>: Ids of the features, in order of location start,
+            each once.
+        """
+        if strand == "?":
+            strands = self.strands(contig_id)
+        else:
+            strands = [strand]
+        found = []
+        for s in strands:
+            for starts, ends, max_length, ids in self._tables.get((contig_id, s), ()):
+                # no location of the group starting earlier can reach start
+                lo = bisect.bisect_left(starts, start - max_length)
+                hi = bisect.bisect_right(starts, stop)
+                found.extend([(starts[i], ids[i]) for i in xrange(lo, hi)
+                              if ends[i] >= start])
+        found.sort()
+        seen = set()
+        result = []
+        for _, feature_id in found:
+            if feature_id not in seen:
+                seen.add(feature_id)
+                result.append(feature_id)
+        return result
+
+
+class FunctionIndex(object):
+    """Inverted index from the words of feature functions to the
+    features, for function text searches.
+
+    A feature matches a search term if any word of its function, split
+    on whitespace, equals the term, as in
+    :meth:`GenomeInterface.get_feature_ids`.
+
+    Args:
+      functions (iterable<tuple>): (feature_id, function) for each
+        feature, in order; function may be None.
+    """
+    def __init__(self, functions):
+        self._order = dict()
+        self._exact = collections.defaultdict(set)
+        self._folded = collections.defaultdict(set)
+        for feature_id, function in functions:
+            self._order.setdefault(feature_id, len(self._order))
+            if not function:
+                continue
+            for token in function.split():
+                self._exact[token].add(feature_id)
+                self._folded[token.lower()].add(feature_id)
+        self._exact = dict(self._exact)
+        self._folded = dict(self._folded)
+        # sorted words, for prefix matching by binary search
+        self._exact_words = sorted(self._exact)
+        self._folded_words = sorted(self._folded)
+
+    def _matches(self, token, ignore_case, prefix):
+        if ignore_case:
+            token, table, words = token.lower(), self._folded, self._folded_words
+        else:
+            table, words = self._exact, self._exact_words
+        if not prefix:
+            return table.get(token, set())
+        result = set()
+        i = bisect.bisect_left(words, token)
+        while i < len(words) and words[i].startswith(token):
+            result.update(table[words[i]])
+            i += 1
+        return result
+
+    def search(self, text, match_all=False, ignore_case=False, prefix=False):
+        """Find features whose function matches the words of some text.
+
+        Args:
+          text (str): Search terms, separated by whitespace
+          match_all (bool): If True, features must match every term,
+            otherwise any one of them.
+          ignore_case (bool): If True, compare words without case.
+          prefix (bool): If True, a term matches the words it begins.
+        Returns:
+          list<str>: Ids of the matching features, in feature order.
+        """
+        found = None
+        for token in text.split():
+            ids = self._matches(token, ignore_case, prefix)
+            if found is None:
+                found = set(ids)
+            elif match_all:
+                found &= ids
+            else:
+                found |= ids
+            if match_all and not found:
+                break
+        if not found:
+            return list()
+        return sorted(found, key=self._order.__getitem__)
+
+
+def alias_lookup(features):
+    """Map each alias to the features that have it.
+
+    Args:
+      features (iterable<tuple>): (feature_id, aliases) for each
+        feature, in order; aliases may be None.
+    Returns:
+      dict<str,list<str>>: Ids of the features with each alias, in order.
+    """
+    lookup = dict()
+    for feature_id, aliases in features:
+        for alias in aliases or ():
+            ids = lookup.setdefault(alias, [])
+            if not ids or ids[-1] != feature_id:
+                ids.append(feature_id)
+    return lookup
+
+
+def feature_locations(feature_id, feature):
+    """Locations of one feature, as expected by :class:`IntervalIndex`.
+    Features have their locations under "location" (KBaseGenomes.Genome)
+    or "locations" (GenomeAnnotation).
+    """
+    locations = feature.get("location", None)
+    if locations is None:
+        locations = feature.get("locations", [])
+    return [(feature_id, loc[0], loc[1], loc[2], loc[3]) for loc in locations]
+
+
+class _IndexCache(object):
+    """Thread-safe cache of built indexes, dropping those of the least
+    recently used genomes when there are too many.
+    """
+    def __init__(self, max_genomes=MAX_CACHED_GENOMES):
+        self._lock = threading.Lock()
+        self._genomes = collections.OrderedDict()
+        self.max_genomes = max_genomes
+
+    def get(self, genome_key, kind, build):
+        """Get an index, building it with `build()` if it is not cached.
+
+        Args:
+          genome_key (tuple): Identifies the genome, e.g. Workspace URL
+            and versioned reference.
+          kind (str): Kind of index, e.g. "intervals" or "functions"
+          build (function): Called with no arguments to build the index
+        Returns:
+          The index.
+        """
+        with self._lock:
+            indexes = self._genomes.pop(genome_key, None)
+            if indexes is None:
+                indexes = dict()
+            self._genomes[genome_key] = indexes  # most recently used
+            if kind in indexes:
+                return indexes[kind]
+        index = build()  # outside the lock; at worst built twice
+        with self._lock:
+            indexes[kind] = index
+            while len(self._genomes) > self.max_genomes:
+                self._genomes.popitem(last=False)
+        return index
+
+    def clear(self):
+        with self._lock:
+            self._genomes.clear()
+
+#: Indexes shared by all Genome Annotation API objects
+index_cache = _IndexCache()
@@ -11,6 +11,8 @@ import hashlib
 
 # local imports
 from doekbase.data_api.core import ObjectAPI
+from doekbase.data_api.annotation import containers
+from doekbase.data_api.annotation import feature_index
 
 _GENOME_TYPES = ['KBaseGenomes.Genome']
 _GENOME_ANNOTATION_TYPES = ['KBaseGenomesCondensedPrototypeV2.GenomeAnnotation']
@@ -123,6 +125,40 @@ class GenomeInterface(object):
         """
         pass  # TODO: add examples in docs for function_list and alias_list
 
+    @abc.abstractmethod
+    def get_feature_ids_by_function(self, function_list, match_all=False,
+                                    ignore_case=False, prefix=False):
+        """Retrieves feature ids by searching the words of feature functions.
+
+        With the default options, each function string matches the same
+        features as in :meth:`get_feature_ids`: those whose function has
+        any of its words.
+
+        Args:
+          function_list (list<str>): Function search strings
+          match_all (bool): If True, a feature must have every word of a
+            search string, not just one of them.
+          ignore_case (bool): If True, words are compared without case.
+          prefix (bool): If True, a search word matches any function word
+            that begins with it, e.g. "kinase" matches "kinases".
+        Returns:
+          dict<str,list<str>>: Feature ids matching each search string.
+        """
+        pass
+
+    @abc.abstractmethod
+    def resolve_aliases(self, alias_list):
+        """Retrieves the ids of the features with each of some aliases,
+        such as locus tags.
+
+        Args:
+          alias_list (list<str>): Feature aliases
+        Returns:
+          dict<str,list<str>>: Feature ids with each alias, empty for
+            an unknown alias.
+        """
+        pass
+
     @abc.abstractmethod
     def get_feature_type_counts(self, type_list=None):
         """Retrieve the number of Genome Features, grouped by
@@ -320,13 +356,11 @@ class GenomeAnnotationAPI(ObjectAPI, GenomeInterface):
     def __init__(self, services, token, ref):
         super(GenomeAnnotationAPI, self).__init__(services, token, ref)
 
-        generic_object = ObjectAPI(services, token, ref)
-
-        is_annotation_type = generic_object._typestring.split('-')[0] in _GENOME_ANNOTATION_TYPES
-        is_genome_type = generic_object._typestring.split('-')[0] in _GENOME_TYPES
+        is_annotation_type = self._typestring.split('-')[0] in _GENOME_ANNOTATION_TYPES
+        is_genome_type = self._typestring.split('-')[0] in _GENOME_TYPES
     
         if not (is_annotation_type or is_genome_type):
-            raise TypeError("Invalid type! Expected one of {0}, received {1}".format(TYPES, generic_object._typestring))
+            raise TypeError("Invalid type! Expected one of {0}, received {1}".format(TYPES, self._typestring))
 
         if is_annotation_type:
             self.proxy = _Prototype(services, token, ref)
@@ -345,6 +379,14 @@ class GenomeAnnotationAPI(ObjectAPI, GenomeInterface):
     def get_feature_ids(self, type_list=None, region_list=None, function_list=None, alias_list=None):
         return self.proxy.get_feature_ids(type_list, region_list, function_list, alias_list)
 
+    def get_feature_ids_by_function(self, function_list, match_all=False,
+                                    ignore_case=False, prefix=False):
+        return self.proxy.get_feature_ids_by_function(function_list, match_all,
+                                                      ignore_case, prefix)
+
+    def resolve_aliases(self, alias_list):
+        return self.proxy.resolve_aliases(alias_list)
+
     def get_feature_type_counts(self, type_list=None):
         return self.proxy.get_feature_type_counts(type_list)
     
@@ -464,30 +506,15 @@ class _KBaseGenomes_Genome(ObjectAPI, GenomeInterface):
 
             if type_list is None:
                 type_list = self.get_feature_types()
-    
-            def is_feature_in_regions(f, regions):
-                location_key = None                
-                
-                if "location" in f:
-                    location_key = "location"
-                elif "locations" in f:
-                    location_key = "locations"
-                    
-                for loc in f[location_key]:
-                    for r in regions:
-                        if (r["contig_id"] == loc[0]) and \
-                           (loc[2] == r["strand"] or r["strand"] == "?") and \
-                           (loc[1] <= r["stop"] and r["start"] <= loc[1] + loc[3]):
-                            return True
-                return False
 
+            index = self._get_interval_index()
             region_ids = dict()
             for r in region_list:
                 region_ids[r["contig_id"]] = list()
-            
-            for x in data["features"]:
-                if is_feature_in_regions(x, region_list):
-                    region_ids[x["contig_id"]].append(x["id"])
+
+            for r in region_list:
+                region_ids[r["contig_id"]].extend(index.overlapping(
+                    r["contig_id"], r["strand"], r["start"], r["stop"]))
 
         if function_list is not None:
             if not isinstance(function_list, list):
@@ -497,23 +524,8 @@ class _KBaseGenomes_Genome(ObjectAPI, GenomeInterface):
             
             if type_list is None:        
                 type_list = self.get_feature_types()
-                        
-            def is_function_in_feature(feature, function_tokens):
-                if "function" not in feature:
-                    return False
-                
-                tokens = feature["function"].split()
-                
-                for t in tokens:
-                    if t in function_tokens:
-                        return True
-                
-                return False
-                    
-            function_ids = dict()
-            for function in function_list:
-                function_tokens = function.split()
-                function_ids[function] = [x['id'] for x in data["features"] if is_function_in_feature(x, function_tokens)]
+
+            function_ids = self.get_feature_ids_by_function(function_list)
                 
         if alias_list is not None:
             if not isinstance(alias_list, list):
@@ -524,14 +536,7 @@ class _KBaseGenomes_Genome(ObjectAPI, GenomeInterface):
             if type_list is None:
                 type_list = self.get_feature_types()
             
-            alias_ids = dict()            
-            for alias in alias_list:
-                alias_ids[alias] = list()
-            
-            for x in data["features"]:
-                for alias in alias_list:
-                    if "aliases" in x and alias in x["aliases"]:
-                        alias_ids[alias].append(x["id"])
+            alias_ids = self.resolve_aliases(alias_list)
         
         # collect the results and find the intersection
         intersecting_ids = dict()
@@ -579,6 +584,54 @@ class _KBaseGenomes_Genome(ObjectAPI, GenomeInterface):
         
         return intersecting_ids
 
+    def _index_key(self):
+        return (self.services["workspace_service_url"],
+                self._info["object_reference_versioned"])
+
+    def _get_interval_index(self):
+        """Interval index of the feature locations, built once per genome."""
+        def build():
+            locations = list()
+            for x in self.get_data()["features"]:
+                locations.extend(feature_index.feature_locations(x["id"], x))
+            return feature_index.IntervalIndex(locations)
+        return feature_index.index_cache.get(self._index_key(), "intervals", build)
+
+    def _get_function_index(self):
+        """Inverted index of the feature functions, built once per genome."""
+        def build():
+            return feature_index.FunctionIndex(
+                [(x["id"], x.get("function", None)) for x in self.get_data()["features"]])
+        return feature_index.index_cache.get(self._index_key(), "functions", build)
+
+    def get_feature_ids_by_function(self, function_list, match_all=False,
+                                    ignore_case=False, prefix=False):
+        if not isinstance(function_list, list):
+            raise TypeError("A list of feature function strings is required.")
+        elif len(function_list) == 0:
+            raise TypeError("A list of feature function strings is required, recieved an empty list.")
+
+        index = self._get_function_index()
+        function_ids = dict()
+        for function in function_list:
+            function_ids[function] = index.search(function, match_all=match_all,
+                                                  ignore_case=ignore_case, prefix=prefix)
+        return function_ids
+
+    def _get_alias_index(self):
+        """Feature ids by alias, built once per genome."""
+        def build():
+            return feature_index.alias_lookup(
+                [(x["id"], x.get("aliases", None)) for x in self.get_data()["features"]])
+        return feature_index.index_cache.get(self._index_key(), "aliases", build)
+
+    def resolve_aliases(self, alias_list):
+        if not isinstance(alias_list, list):
+            raise TypeError("A list of feature alias strings is required.")
+
+        index = self._get_alias_index()
+        return dict([(alias, list(index.get(alias, []))) for alias in alias_list])
+
     def get_feature_type_counts(self, type_list=None):
         """
         Retrieves number of Genome Features from a KBaseGenomes.Genome object, filtering on Feature type.
@@ -637,18 +690,17 @@ class _KBaseGenomes_Genome(ObjectAPI, GenomeInterface):
             except AssertionError:
                 raise TypeError("A list of strings indicating feature identifiers is required, received an empty list.")
 
-            for x in features:
-                if x['id'] in feature_id_list:
-                    locations[x['id']] = list()
-
-                    if 'location' in x:
-                        for loc in x['location']:
-                            locations[x['id']].append({
-                                "contig_id": loc[0],
-                                "strand": loc[2],
-                                "start": loc[1],
-                                "length": loc[3]
-                            })
+            for x in self._get_records("features", feature_id_list):
+                locations[x['id']] = list()
+
+                if 'location' in x:
+                    for loc in x['location']:
+                        locations[x['id']].append({
+                            "contig_id": loc[0],
+                            "strand": loc[2],
+                            "start": loc[1],
+                            "length": loc[3]
+                        })
 
         return locations
 
@@ -672,12 +724,11 @@ class _KBaseGenomes_Genome(ObjectAPI, GenomeInterface):
             except AssertionError:
                 raise TypeError("A list of strings indicating feature identifiers is required, received an empty list.")
 
-            for x in features:
-                if x['id'] in feature_id_list:
-                    if "sequence" in x:
-                        sequences[x['id']] = x["sequence"]
-                    else:
-                        sequences[x['id']] = None
+            for x in self._get_records("features", feature_id_list):
+                if "sequence" in x:
+                    sequences[x['id']] = x["sequence"]
+                else:
+                    sequences[x['id']] = None
 
         return sequences
 
@@ -701,12 +752,11 @@ class _KBaseGenomes_Genome(ObjectAPI, GenomeInterface):
             except AssertionError:
                 raise TypeError("A list of strings indicating feature identifiers is required, received an empty list.")
 
-            for x in features:
-                if x['id'] in feature_id_list:
-                    if "function" in x:
-                        functions[x['id']] = x["function"]
-                    else:
-                        functions[x['id']] = "Unknown"
+            for x in self._get_records("features", feature_id_list):
+                if "function" in x:
+                    functions[x['id']] = x["function"]
+                else:
+                    functions[x['id']] = "Unknown"
 
         return functions
 
@@ -730,12 +780,11 @@ class _KBaseGenomes_Genome(ObjectAPI, GenomeInterface):
             except AssertionError:
                 raise TypeError("A list of strings indicating feature identifiers is required, received an empty list.")
 
-            for x in features:
-                if x['id'] in feature_id_list:
-                    if "aliases" in x:
-                        aliases[x['id']] = x["aliases"]
-                    else:
-                        aliases[x['id']] = list()
+            for x in self._get_records("features", feature_id_list):
+                if "aliases" in x:
+                    aliases[x['id']] = x["aliases"]
+                else:
+                    aliases[x['id']] = list()
 
         return aliases
     
@@ -759,12 +808,11 @@ class _KBaseGenomes_Genome(ObjectAPI, GenomeInterface):
             except AssertionError:
                 raise TypeError("A list of strings indicating feature identifiers is required, received an empty list.")
 
-            for x in features:
-                if x['id'] in feature_id_list:
-                    if "publications" in x:
-                        publications[x['id']] = x["publications"]
-                    else:
-                        publications[x['id']] = list()
+            for x in self._get_records("features", feature_id_list):
+                if "publications" in x:
+                    publications[x['id']] = x["publications"]
+                else:
+                    publications[x['id']] = list()
 
         return publications
 
@@ -831,9 +879,8 @@ class _KBaseGenomes_Genome(ObjectAPI, GenomeInterface):
             except AssertionError:
                 raise TypeError("A list of strings indicating feature identifiers is required, received an empty list.")
 
-            for x in features:
-                if x['id'] in feature_id_list:
-                    out_features[x['id']] = fill_out_feature(x)
+            for x in self._get_records("features", feature_id_list):
+                out_features[x['id']] = fill_out_feature(x)
 
         return out_features
 
@@ -928,12 +975,52 @@ class _KBaseGenomes_Genome(ObjectAPI, GenomeInterface):
 class _Prototype(ObjectAPI, GenomeInterface):
     def __init__(self, services, token, ref):
         super(_Prototype, self).__init__(services, token, ref)
+        self._header = None
+        self._feature_lookup = None
+        self._containers = containers.FeatureContainerCache(
+            self.ws_client, max_workers=int(services.get(
+                containers.WORKERS_SERVICE_KEY, containers.MAX_WORKERS)))
+
+    def _get_header(self):
+        """Fetch the small top-level fields that most methods need,
+        in one call, the first time any of them is needed.
+        """
+        if self._header is None:
+            self._header = self.get_data_subset(path_list=[
+                "feature_container_references", "taxon_ref", "assembly_ref"])
+        return self._header
+
+    def _get_feature_lookup(self):
+        """Fetch the map of feature ids and aliases to feature
+        containers, the first time it is needed.
+        """
+        if self._feature_lookup is None:
+            self._feature_lookup = self.get_data_subset(
+                path_list=["feature_lookup"])["feature_lookup"]
+        return self._feature_lookup
+
+    def _get_container_features(self, container_refs, feature_ids=None,
+                                fields=None):
+        """Get features from several feature containers, through the
+        container cache of this object; see
+        :meth:`doekbase.data_api.annotation.containers.FeatureContainerCache.features`.
+
+        Args:
+          container_refs (list<str>): Feature container references.
+          feature_ids (dict<str,list<str>>): For each container reference,
+            the features to get. If None, get all features.
+          fields (list<str>): If given, get only these fields of
+            every feature. Not used with `feature_ids`.
+        Returns:
+          dict<str,dict>: Features, by feature key, for each container.
+        """
+        return self._containers.features(container_refs, feature_ids, fields)
 
     def _get_feature_containers(self, feature_id_list=None):
         if feature_id_list is None:
-            feature_containers = self.get_data_subset(["feature_container_references"])["feature_container_references"].values()
+            feature_containers = self._get_header()["feature_container_references"].values()
         else:
-            feature_lookup = self.get_data_subset(path_list=["feature_lookup"])["feature_lookup"]
+            feature_lookup = self._get_feature_lookup()
             feature_containers = dict()
 
             try:
@@ -954,14 +1041,14 @@ class _Prototype(ObjectAPI, GenomeInterface):
 
     def get_taxon(self):
         from doekbase.data_api.taxonomy.taxon.api import TaxonAPI
-        return TaxonAPI(self.services, token=self._token, ref=self.get_data_subset(path_list=["taxon_ref"])["taxon_ref"])
+        return TaxonAPI(self.services, token=self._token, ref=self._get_header()["taxon_ref"])
 
     def get_assembly(self):
         from doekbase.data_api.sequence.assembly import AssemblyAPI
-        return AssemblyAPI(self.services, token=self._token, ref=self.get_data_subset(path_list=["assembly_ref"])["assembly_ref"])
+        return AssemblyAPI(self.services, token=self._token, ref=self._get_header()["assembly_ref"])
 
     def get_feature_types(self):
-        return self.get_data_subset(path_list=["feature_container_references"])["feature_container_references"].keys()
+        return self._get_header()["feature_container_references"].keys()
 
     def get_feature_ids(self, type_list=None, region_list=None, function_list=None, alias_list=None):
         """
@@ -972,13 +1059,13 @@ class _Prototype(ObjectAPI, GenomeInterface):
         
         if type_list is None and region_list is None and function_list is None and alias_list is None:
             # just grab everything
-            feature_container_references = self.get_data_subset(path_list=["feature_container_references"])["feature_container_references"]
+            feature_container_references = self._get_header()["feature_container_references"]
+            container_features = self._get_container_features(
+                feature_container_references.values())
             
             out_ids = {"type": {}}
             for x in feature_container_references:
-                feature_container = ObjectAPI(self.services, self._token, feature_container_references[x])
-                container_data = feature_container.get_data()
-                out_ids[x] = container_data["features"].keys()
+                out_ids[x] = container_features[feature_container_references[x]].keys()
             return out_ids
 
         # once we get here we have to start pulling and filtering features
@@ -987,11 +1074,18 @@ class _Prototype(ObjectAPI, GenomeInterface):
         function_ids = None
         alias_ids = None
 
-        data = self.get_data()
-        
-        feature_container_references = data["feature_container_references"]        
+        feature_container_references = self._get_header()["feature_container_references"]
         features = dict()
 
+        def load_features(type_keys):
+            # fetch any containers not already loaded, in one batch
+            missing = [t for t in type_keys if t not in features]
+            if missing:
+                loaded = self._get_container_features(
+                    [feature_container_references[t] for t in missing])
+                for t in missing:
+                    features[t] = loaded[feature_container_references[t]]
+
         if type_list is not None:
             if not isinstance(type_list, list):
                 raise TypeError("A list of strings indicating feature types is required.")
@@ -1002,11 +1096,9 @@ class _Prototype(ObjectAPI, GenomeInterface):
             for x in type_list:
                 type_ids[x] = list()
             
+            load_features([f for f in feature_container_references if f in type_list])
             for f in feature_container_references:
                 if f in type_list:
-                    if f not in features:
-                        features[f] = ObjectAPI(self.services, self._token, feature_container_references[f]).get_data()["features"]
-                    
                     type_ids[f] = features[f].keys()                    
 
         if region_list is not None:
@@ -1015,33 +1107,14 @@ class _Prototype(ObjectAPI, GenomeInterface):
             elif len(region_list) == 0:
                 raise TypeError("A list of region dictionaries is required, recieved an empty list.")
 
-            def is_feature_in_region(f, region):
-                location_key = None                
-                
-                if "location" in f:
-                    location_key = "location"
-                elif "locations" in f:
-                    location_key = "locations"
-                    
-                for loc in f[location_key]:
-                    if (region["contig_id"] == loc[0]) and \
-                       (loc[2] == region["strand"] or region["strand"] == "?") and \
-                       (loc[1] <= region["stop"] and region["start"] <= loc[1] + loc[3]):
-                        return True
-                return False
-            
+            index = self._get_interval_index()
             region_ids = dict()
             for r in region_list:
                 region_ids[r["contig_id"]] = list()
-            
-            for f in feature_container_references:
-                if f not in features:
-                    features[f] = ObjectAPI(self.services, self._token, feature_container_references[f]).get_data()["features"]
-                
-                for x in features[f]:
-                    for r in region_list:
-                        if is_feature_in_region(features[f][x], r):
-                            region_ids[r["contig_id"]].append(features[f][x]["feature_id"])
+
+            for r in region_list:
+                region_ids[r["contig_id"]].extend(index.overlapping(
+                    r["contig_id"], r["strand"], r["start"], r["stop"]))
 
         if function_list is not None:
             if not isinstance(function_list, list):
@@ -1049,35 +1122,7 @@ class _Prototype(ObjectAPI, GenomeInterface):
             elif len(function_list) == 0:
                 raise TypeError("A list of feature function strings is required, recieved an empty list.")
 
-            function_tokens = list()
-            for x in function_list:
-                function_tokens.extend(x.split())
-            function_tokens = set(function_tokens)
-            
-            def is_function_in_feature(feature, function_tokens):
-                if 'function' not in feature:
-                    return False
-                
-                tokens = feature['function'].split()            
-                
-                for t in tokens:
-                    if t in function_tokens:
-                        return True
-                
-                return False
-                    
-            function_ids = dict()
-            for function in function_list:
-                function_ids[function] = list()
-                function_tokens = function.split()
-                
-                for f in feature_container_references:
-                    if f not in features:
-                        features[f] = ObjectAPI(self.services, self._token, feature_container_references[f]).get_data()["features"]
-                
-                    for x in features[f]:
-                        if is_function_in_feature(features[f][x], function_tokens):
-                            function_ids[function].append(features[f][x]["feature_id"])
+            function_ids = self.get_feature_ids_by_function(function_list)
                 
         if alias_list is not None:
             if not isinstance(alias_list, list):
@@ -1088,32 +1133,7 @@ class _Prototype(ObjectAPI, GenomeInterface):
             if type_list is None:
                 type_list = self.get_feature_types()
 
-            feature_lookup = data["feature_lookup"]
-            
-            feature_containers = dict()
-            
-            out_ids = dict()            
-            for alias in alias_list:                    
-                if alias in feature_lookup:
-                    ref = feature_lookup[alias][0]
-                    
-                    if ref not in feature_containers:
-                        feature_containers[ref] = list()
-                        for type_key in feature_container_references:
-                            if ref in feature_container_references[type_key]:
-                                out_ids[type_key] = list()
-                    
-                    feature_containers[ref].append(feature_lookup[alias][1])                                                
-            
-            for ref in feature_containers:
-                for type_key in feature_container_references:
-                    for alias in alias_list:
-                        if alias in feature_container_references[type_key]:
-                            out_ids[type_key] = feature_containers[ref]
-                                        
-                            if type_key in type_list:
-                                out_ids[alias] = feature_containers[ref]
-            alias_ids = out_ids
+            alias_ids = self.resolve_aliases(alias_list)
         
         # collect the results and find the intersection
         intersecting_ids = dict()
@@ -1161,6 +1181,70 @@ class _Prototype(ObjectAPI, GenomeInterface):
         
         return intersecting_ids
 
+    def _index_key(self):
+        return (self.services["workspace_service_url"],
+                self._info["object_reference_versioned"])
+
+    def _get_interval_index(self):
+        """Interval index of the feature locations, built once per genome
+        from only the ids and locations of the features.
+        """
+        def build():
+            refs = self._get_header()["feature_container_references"].values()
+            containers = self._get_container_features(
+                refs, fields=["feature_id", "locations"])
+            locations = list()
+            for features in containers.values():
+                for x in features.values():
+                    locations.extend(feature_index.feature_locations(x["feature_id"], x))
+            return feature_index.IntervalIndex(locations)
+        return feature_index.index_cache.get(self._index_key(), "intervals", build)
+
+    def _get_function_index(self):
+        """Inverted index of the feature functions, built once per genome
+        from only the ids and functions of the features.
+        """
+        def build():
+            refs = self._get_header()["feature_container_references"].values()
+            containers = self._get_container_features(
+                refs, fields=["feature_id", "function"])
+            functions = list()
+            for features in containers.values():
+                for x in features.values():
+                    functions.append((x["feature_id"], x.get("function", None)))
+            return feature_index.FunctionIndex(functions)
+        return feature_index.index_cache.get(self._index_key(), "functions", build)
+
+    def get_feature_ids_by_function(self, function_list, match_all=False,
+                                    ignore_case=False, prefix=False):
+        if not isinstance(function_list, list):
+            raise TypeError("A list of feature function strings is required.")
+        elif len(function_list) == 0:
+            raise TypeError("A list of feature function strings is required, recieved an empty list.")
+
+        index = self._get_function_index()
+        function_ids = dict()
+        for function in function_list:
+            function_ids[function] = index.search(function, match_all=match_all,
+                                                  ignore_case=ignore_case, prefix=prefix)
+        return function_ids
+
+    def resolve_aliases(self, alias_list):
+        """Feature ids are also keys of the feature lookup, so each
+        resolves to itself.
+        """
+        if not isinstance(alias_list, list):
+            raise TypeError("A list of feature alias strings is required.")
+
+        feature_lookup = self._get_feature_lookup()
+        out_ids = dict()
+        for alias in alias_list:
+            out_ids[alias] = list()
+            for feature_ref in feature_lookup.get(alias, []):
+                if feature_ref[1] not in out_ids[alias]:
+                    out_ids[alias].append(feature_ref[1])
+        return out_ids
+
     def get_feature_type_counts(self, type_list=None):
         return self.get_data_subset(path_list=["counts_map"])["counts_map"]
 
@@ -1180,14 +1264,18 @@ class _Prototype(ObjectAPI, GenomeInterface):
                                 "identifiers is required, " +
                                 "received an empty list.")
 
+        if feature_id_list is None:
+            container_features = self._get_container_features(feature_containers)
+        else:
+            container_features = self._get_container_features(
+                feature_containers.keys(), feature_containers)
+
         for ref in feature_containers:
+            features = container_features[ref]
             if feature_id_list is None:
-                features = ObjectAPI(self.services, self._token, ref).get_data()["features"]
                 working_list = features
             else:
-                container = ObjectAPI(self.services, self._token, ref)
-                features = container.get_data_subset(path_list=feature_refs)["features"]
-                working_list = feature_id_list
+                working_list = feature_containers[ref]
 
             if data == "aliases":
                 for feature_id in working_list:
@@ -1242,14 +1330,17 @@ class _Prototype(ObjectAPI, GenomeInterface):
         out_features = dict()
         feature_containers = self._get_feature_containers(feature_id_list)
 
+        if feature_id_list is None:
+            container_features = self._get_container_features(feature_containers)
+        else:
+            container_features = self._get_container_features(
+                feature_containers.keys(), feature_containers)
+
         for ref in feature_containers:
-            container = ObjectAPI(self.services, self._token, ref)
+            features = container_features[ref]
             if feature_id_list is None:
-                features = container.get_data()["features"]
                 working_list = features
             else:
-                features = container.get_data_subset(
-                    path_list=["features/" + x for x in feature_containers[ref]])["features"]
                 working_list = feature_containers[ref]
             
             for x in working_list:
@@ -1305,8 +1396,7 @@ class _Prototype(ObjectAPI, GenomeInterface):
     def _get_by_mrna(self, feature_type=None, mrna_feature_id_list=None):
         out = dict()
 
-        feature_container_references = self.get_data_subset(
-            path_list=["feature_container_references"])["feature_container_references"]
+        feature_container_references = self._get_header()["feature_container_references"]
 
         if "mRNA" in feature_container_references:
             try:
@@ -1321,10 +1411,8 @@ class _Prototype(ObjectAPI, GenomeInterface):
                                 "received an empty list.")
 
             mrna_feature_container_ref = feature_container_references["mRNA"]
-            mrna_feature_container = ObjectAPI(self.services,
-                                               self._token,
-                                               mrna_feature_container_ref)
-            mrna_features = mrna_feature_container.get_data_subset(path_list=mrna_refs)["features"]
+            mrna_features = self._get_container_features(
+                [mrna_feature_container_ref], {mrna_feature_container_ref: mrna_feature_id_list})[mrna_feature_container_ref]
 
             for mrna_feature_key in mrna_features:
                 mrna_id = mrna_features[mrna_feature_key]["feature_id"]
@@ -1349,8 +1437,7 @@ class _Prototype(ObjectAPI, GenomeInterface):
     def _get_by_cds(self, feature_type=None, cds_feature_id_list=None):
         out = dict()
 
-        feature_container_references = self.get_data_subset(
-            path_list=["feature_container_references"])["feature_container_references"]
+        feature_container_references = self._get_header()["feature_container_references"]
 
         if "CDS" in feature_container_references:
             try:
@@ -1365,10 +1452,8 @@ class _Prototype(ObjectAPI, GenomeInterface):
                                 "received an empty list.")
 
             cds_feature_container_ref = feature_container_references["CDS"]
-            cds_feature_container = ObjectAPI(self.services,
-                                              self._token,
-                                              cds_feature_container_ref)
-            cds_features = cds_feature_container.get_data_subset(path_list=cds_refs)["features"]
+            cds_features = self._get_container_features(
+                [cds_feature_container_ref], {cds_feature_container_ref: cds_feature_id_list})[cds_feature_container_ref]
 
             for cds_feature_key in cds_features:
                 cds_id = cds_features[cds_feature_key]["feature_id"]
@@ -1393,8 +1478,7 @@ class _Prototype(ObjectAPI, GenomeInterface):
     def _get_by_gene(self, feature_type=None, gene_feature_id_list=None):
         out = dict()
 
-        feature_container_references = self.get_data_subset(
-            path_list=["feature_container_references"])["feature_container_references"]
+        feature_container_references = self._get_header()["feature_container_references"]
 
         if "gene" in feature_container_references:
             try:
@@ -1408,10 +1492,10 @@ class _Prototype(ObjectAPI, GenomeInterface):
                                 "identifiers is required, " +
                                 "received an empty list.")
 
-            gene_feature_container = ObjectAPI(self.services,
-                                               self._token,
-                                               feature_container_references["gene"])
-            gene_features = gene_feature_container.get_data_subset(path_list=gene_refs)["features"]
+            gene_feature_container_ref = feature_container_references["gene"]
+            gene_features = self._get_container_features(
+                [gene_feature_container_ref],
+                {gene_feature_container_ref: gene_feature_id_list})[gene_feature_container_ref]
 
             for gene_feature_key in gene_features:
                 gene_id = gene_features[gene_feature_key]["feature_id"]
@@ -66,6 +66,33 @@ struct Provenance {
  */
 typedef binary RawData
 
+/**
+ * Serialization format of encoded object data.
+ */
+enum DataEncoding {
+    JSON = 1,
+    MSGPACK = 2
+}
+
+/**
+ * Compression of encoded object data.
+ */
+enum DataCompression {
+    NONE = 0,
+    ZLIB = 1,
+    ZSTD = 2
+}
+
+/**
+ * Object data, serialized and compressed as negotiated
+ * by get_encoded_data.
+ */
+struct EncodedData {
+    1: DataEncoding encoding
+    2: DataCompression compression
+    3: binary data
+}
+
 /**
  * Authorization info
  */
@@ -121,6 +148,18 @@ service thrift_service {
     *
     * @param path_list. List of pths to the data elements.
     */
-    RawData get_data_subset(1: list<string> path_list)
+    RawData get_data_subset(1: list<string> path_list),
+
+   /**
+    * Retrieve the object data in a binary encoding.
+    *
+    * @param encodings. Acceptable encodings, most preferred first.
+    * @param compressions. Acceptable compressions, most preferred first.
+    *
+    * The server uses the first of each it supports, falling
+    * back to JSON and no compression.
+    */
+    EncodedData get_encoded_data(1: list<DataEncoding> encodings,
+                                 2: list<DataCompression> compressions)
 
 }
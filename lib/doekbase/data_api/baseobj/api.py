@@ -5,14 +5,18 @@ Module for base class for Data API objects.
 # Imports
 
 # Stdlib
-import json
 import logging
 import re
+# Third-party
+from thrift.Thrift import TApplicationException
 # Local
 from doekbase.data_api.util import get_logger
 from doekbase.data_api.util import log_start, log_end
 from doekbase.data_api.util import get_auth_token
+from doekbase.workspace.codec import get_codec
 from . import thrift_service, ttypes
+from .encoding import decode_data, supported_encodings, \
+    supported_compressions
 
 # Logging
 
@@ -32,17 +36,20 @@ class ObjectAPI(object):
     This can handle both local and remote modes by use of alternate
     implementations of the `client` parameter.
     """
-    def __init__(self, client, ref):
+    def __init__(self, client, ref, json_codec=None):
         """Create API instance with an object reference and client
 
         Args:
           client (object):  Implementation of thrift_service.Iface
           ref (str): Object reference
+          json_codec (str): Name of JSON codec used to decode the data,
+            see :mod:`doekbase.workspace.codec`
         """
         assert isinstance(client, thrift_service.Iface)
         if not REF_PATTERN.match(ref):
             raise ValueError('Format error for "{}"'.format(ref))
         self._client, self._ref = client, ref
+        self._codec = get_codec(json_codec)
 
         # Set up client
         t0 = log_start(_log, 'client.init')
@@ -79,8 +86,15 @@ class ObjectAPI(object):
 
     @property
     def data(self):
-        data_dict = json.loads(self._client.get_data())
-        return data_dict
+        try:
+            encoded = self._client.get_encoded_data(supported_encodings(),
+                                                    supported_compressions())
+        except TApplicationException as err:
+            # older server, without get_encoded_data
+            if err.type != TApplicationException.UNKNOWN_METHOD:
+                raise
+            return self._codec.loads(self._client.get_data())
+        return decode_data(encoded, self._codec)
 
     def data_subset(self, path_list=None):
         return self._client.get_data_subset(path_list)
@@ -0,0 +1,121 @@
+"""
+Binary encoding of object data for the Thrift object service.
+
+The server encodes object data with :func:`encode_data`, choosing the
+first encoding and compression, in the client's order of preference,
+that it supports. The client decodes it with :func:`decode_data`.
+"""
+
+# Imports
+
+# Stdlib
+import zlib
+# Third-party
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+# Local
+from .ttypes import DataEncoding, DataCompression, EncodedData
+
+# Constants
+
+#: zlib level; favor speed, the data is usually sent over a fast network
+ZLIB_LEVEL = 1
+
+# Functions
+
+def supported_encodings():
+    """Encodings supported here, most preferred first.
+    """
+    result = [DataEncoding.JSON]
+    if msgpack is not None:
+        result.insert(0, DataEncoding.MSGPACK)
+    return result
+
+def supported_compressions():
+    """Compressions supported here, most preferred first.
+    """
+    result = [DataCompression.ZLIB, DataCompression.NONE]
+    if zstandard is not None:
+        result.insert(0, DataCompression.ZSTD)
+    return result
+
+def _choose(wanted, supported, default):
+    for value in wanted or []:
+        if value in supported:
+            return value
+    return default
+
+def _msgpack_default(obj):
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(repr(obj) + ' is not serializable')
+
+def _unpack(data):
+    try:
+        return msgpack.unpackb(data, raw=False)
+    except TypeError:  # msgpack < 0.5.2
+        return msgpack.unpackb(data, encoding='utf-8')
+
+def encode_data(obj, encodings, compressions, codec):
+    """Encode object data.
+
+    Args:
+      obj: Object data
+      encodings (list<DataEncoding>): Acceptable encodings,
+         most preferred first.
+      compressions (list<DataCompression>): Acceptable compressions,
+         most preferred first.
+      codec (doekbase.workspace.codec.Codec): Codec for JSON encoding.
+    Returns:
+      EncodedData: The encoded data. If none of the encodings or
+         compressions are supported, JSON and no compression are used.
+    """
+    encoding = _choose(encodings, supported_encodings(), DataEncoding.JSON)
+    compression = _choose(compressions, supported_compressions(),
+                          DataCompression.NONE)
+    if encoding == DataEncoding.MSGPACK:
+        data = msgpack.packb(obj, use_bin_type=True, default=_msgpack_default)
+    else:
+        data = codec.dumps(obj)
+    if compression == DataCompression.ZLIB:
+        data = zlib.compress(data, ZLIB_LEVEL)
+    elif compression == DataCompression.ZSTD:
+        data = zstandard.ZstdCompressor().compress(data)
+    return EncodedData(encoding=encoding, compression=compression, data=data)
+
+def decode_data(encoded, codec):
+    """Decode object data.
+
+    Args:
+      encoded (EncodedData): Data from :func:`encode_data`.
+      codec (doekbase.workspace.codec.Codec): Codec for JSON decoding.
+    Returns:
+      The object data.
+    Raises:
+      ValueError: if the encoding or compression is not supported
+    """
+    data = encoded.data
+    if encoded.compression == DataCompression.ZLIB:
+        data = zlib.decompress(data)
+    elif encoded.compression == DataCompression.ZSTD:
+        if zstandard is None:
+            raise ValueError('Cannot decompress ZSTD data: '
+                             'zstandard is not installed')
+        data = zstandard.ZstdDecompressor().decompress(data)
+    elif encoded.compression != DataCompression.NONE:
+        raise ValueError('Unknown compression: {}'.format(
+            encoded.compression))
+    if encoded.encoding == DataEncoding.MSGPACK:
+        if msgpack is None:
+            raise ValueError('Cannot decode MSGPACK data: '
+                             'msgpack is not installed')
+        return _unpack(data)
+    elif encoded.encoding == DataEncoding.JSON:
+        return codec.loads(data)
+    raise ValueError('Unknown encoding: {}'.format(encoded.encoding))
@@ -5,16 +5,18 @@ Module for base class for Data API objects.
 # Imports
 
 # Stdlib
-import json
 try:
     import cStringIO as StringIO
 except ImportError:
     import StringIO as StringIO
 # Local
 import doekbase.workspace.client
+from doekbase.workspace.codec import get_codec, CODEC_SERVICE_KEY
 from . import thrift_service, ttypes
+from .encoding import encode_data
 from doekbase.data_api.util import get_logger, log_start, log_end
 from doekbase.data_api.rpc_util import thrift_validate
+from doekbase.data_api.core import md5_type_cache
 
 _log = get_logger('baseobj.impl')
 
@@ -28,13 +30,15 @@ class ObjectImpl(thrift_service.Iface):
             raise KeyError("Expecting workspace_service_url key!")
         
         self.services = services
+        self.codec = get_codec(services.get(CODEC_SERVICE_KEY, None))
         self.ws_client = None
         self.ref = None
 
     def init(self, auth):
         token = auth.token
         self.ws_client = doekbase.workspace.client.Workspace(
-            self.services["workspace_service_url"], token=token)
+            self.services["workspace_service_url"], token=token,
+            json_codec=self.codec.name)
 
     def get_info(self, ref):
         self.ref = ref
@@ -45,7 +49,9 @@ class ObjectImpl(thrift_service.Iface):
                 "ignoreErrors": 0})[0]
         except Exception as err:
             raise # XXX
-        md5_typestr = self.ws_client.translate_to_MD5_types([info_values[2]]).values()[0]
+        md5_typestr = md5_type_cache.translate(
+            self.services["workspace_service_url"], self.ws_client,
+            [info_values[2]])[info_values[2]]
         info = ttypes.Metadata(
                 object_id=str(info_values[0]),
                 object_name=info_values[1],
@@ -83,13 +89,20 @@ class ObjectImpl(thrift_service.Iface):
                 {"ref": self.ref}])[0]["data"]
             log_end(_log, t1, 'get_data.query')
             t1 = log_start(_log, 'get_data.dump')
-            s = json.dumps(data_dict)
+            s = self.codec.dumps(data_dict)
             log_end(_log, t1, 'get_data.dump')
         except Exception as err:
             print("@@ died in .dumps: {}".format(err))
         log_end(_log, t0, 'get_data')
         return s
 
+    def get_encoded_data(self, encodings, compressions):
+        t0 = log_start(_log, 'get_encoded_data')
+        data_dict = self.ws_client.get_objects_data([{"ref": self.ref}])[0]
+        result = encode_data(data_dict, encodings, compressions, self.codec)
+        log_end(_log, t0, 'get_encoded_data')
+        return result
+
     def get_data_subset(self, path_list=None):
         return self.ws_client.get_object_subset([{"ref": self.ref,
                         "included": path_list}])[0]["data"]
@@ -97,10 +110,12 @@ class ObjectImpl(thrift_service.Iface):
     def get_referrers(self):
         referrers = self.ws_client.list_referencing_objects(
             [{"ref": self.ref}])[0]
+        md5_types = md5_type_cache.translate(
+            self.services["workspace_service_url"], self.ws_client,
+            [x[2] for x in referrers])
         object_refs_by_type = dict()        
         for x in referrers:
-            typestring = self.ws_client.translate_to_MD5_types(
-                [x[2]]).values()[0]
+            typestring = md5_types[x[2]]
             if typestring not in object_refs_by_type:
                 object_refs_by_type[typestring] = list()
             object_refs_by_type[typestring].append(str(x[6]) + "/" +
@@ -80,6 +80,22 @@ class Iface:
     """
     pass
 
+  def get_encoded_data(self, encodings, compressions):
+    """
+    Retrieve the object data in a binary encoding.
+
+    @param encodings. Acceptable encodings, most preferred first.
+    @param compressions. Acceptable compressions, most preferred first.
+
+    The server uses the first of each it supports, falling
+    back to JSON and no compression.
+
+    Parameters:
+     - encodings
+     - compressions
+    """
+    pass
+
 
 class Client(Iface):
   def __init__(self, iprot, oprot=None):
@@ -335,6 +351,47 @@ class Client(Iface):
       return result.success
     raise TApplicationException(TApplicationException.MISSING_RESULT, "get_data_subset failed: unknown result");
 
+  def get_encoded_data(self, encodings, compressions):
+    """
+    Retrieve the object data in a binary encoding.
+
+    @param encodings. Acceptable encodings, most preferred first.
+    @param compressions. Acceptable compressions, most preferred first.
+
+    The server uses the first of each it supports, falling
+    back to JSON and no compression.
+
+    Parameters:
+     - encodings
+     - compressions
+    """
+    self.send_get_encoded_data(encodings, compressions)
+    return self.recv_get_encoded_data()
+
+  def send_get_encoded_data(self, encodings, compressions):
+    self._oprot.writeMessageBegin('get_encoded_data', TMessageType.CALL, self._seqid)
+    args = get_encoded_data_args()
+    args.encodings = encodings
+    args.compressions = compressions
+    args.write(self._oprot)
+    self._oprot.writeMessageEnd()
+    self._oprot.trans.flush()
+
+  def recv_get_encoded_data(self):
+    iprot = self._iprot
+    (fname, mtype, rseqid) = iprot.readMessageBegin()
+    if mtype == TMessageType.EXCEPTION:
+      x = TApplicationException()
+      x.read(iprot)
+      iprot.readMessageEnd()
+      raise x
+    result = get_encoded_data_result()
+    result.read(iprot)
+    iprot.readMessageEnd()
+    if result.success is not None:
+      return result.success
+    raise TApplicationException(TApplicationException.MISSING_RESULT, "get_encoded_data failed: unknown result");
+
 
 class Processor(Iface, TProcessor):
   def __init__(self, handler):
@@ -348,6 +405,7 @@ class Processor(Iface, TProcessor):
     self._processMap["get_referrers"] = Processor.process_get_referrers
     self._processMap["get_data"] = Processor.process_get_data
     self._processMap["get_data_subset"] = Processor.process_get_data_subset
+    self._processMap["get_encoded_data"] = Processor.process_get_encoded_data
 
   def process(self, iprot, oprot):
     (name, type, seqid) = iprot.readMessageBegin()
@@ -452,6 +510,17 @@ class Processor(Iface, TProcessor):
     oprot.writeMessageEnd()
     oprot.trans.flush()
 
+  def process_get_encoded_data(self, seqid, iprot, oprot):
+    args = get_encoded_data_args()
+    args.read(iprot)
+    iprot.readMessageEnd()
+    result = get_encoded_data_result()
+    result.success = self._handler.get_encoded_data(args.encodings, args.compressions)
+    oprot.writeMessageBegin("get_encoded_data", TMessageType.REPLY, seqid)
+    result.write(oprot)
+    oprot.writeMessageEnd()
+    oprot.trans.flush()
+
 
 # HELPER FUNCTIONS AND STRUCTURES
 
@@ -1388,6 +1457,165 @@ class get_data_subset_result:
     return
 
 
+  def __hash__(self):
+    value = 17
+    value = (value * 31) ^ hash(self.success)
+    return value
+
+  def __repr__(self):
+    L = ['%s=%r' % (key, value)
+      for key, value in self.__dict__.iteritems()]
+    return '%s(%s)' % (self.__class__.__name__, ', '.join(L))
+
+  def __eq__(self, other):
+    return isinstance(other, self.__class__) and self.__dict__ == other.__dict__
+
+  def __ne__(self, other):
+    return not (self == other)
+
+class get_encoded_data_args:
+  """
+  Attributes:
+   - encodings
+   - compressions
+  """
+
+  thrift_spec = (
+    None, # 0
+    (1, TType.LIST, 'encodings', (TType.I32,None), None, ), # 1
+    (2, TType.LIST, 'compressions', (TType.I32,None), None, ), # 2
+  )
+
+  def __init__(self, encodings=None, compressions=None,):
+    self.encodings = encodings
+    self.compressions = compressions
+
+  def read(self, iprot):
+    if iprot.__class__ == TBinaryProtocol.TBinaryProtocolAccelerated and isinstance(iprot.trans, TTransport.CReadableTransport) and self.thrift_spec is not None and fastbinary is not None:
+      fastbinary.decode_binary(self, iprot.trans, (self.__class__, self.thrift_spec))
+      return
+    iprot.readStructBegin()
+    while True:
+      (fname, ftype, fid) = iprot.readFieldBegin()
+      if ftype == TType.STOP:
+        break
+      if fid == 1:
+        if ftype == TType.LIST:
+          self.encodings = []
+          (_etype33, _size30) = iprot.readListBegin()
+          for _i34 in xrange(_size30):
+            _elem35 = iprot.readI32();
+            self.encodings.append(_elem35)
+          iprot.readListEnd()
+        else:
+          iprot.skip(ftype)
+      elif fid == 2:
+        if ftype == TType.LIST:
+          self.compressions = []
+          (_etype39, _size36) = iprot.readListBegin()
+          for _i40 in xrange(_size36):
+            _elem41 = iprot.readI32();
+            self.compressions.append(_elem41)
+          iprot.readListEnd()
+        else:
+          iprot.skip(ftype)
+      else:
+        iprot.skip(ftype)
+      iprot.readFieldEnd()
+    iprot.readStructEnd()
+
+  def write(self, oprot):
+    if oprot.__class__ == TBinaryProtocol.TBinaryProtocolAccelerated and self.thrift_spec is not None and fastbinary is not None:
+      oprot.trans.write(fastbinary.encode_binary(self, (self.__class__, self.thrift_spec)))
+      return
+    oprot.writeStructBegin('get_encoded_data_args')
+    if self.encodings is not None:
+      oprot.writeFieldBegin('encodings', TType.LIST, 1)
+      oprot.writeListBegin(TType.I32, len(self.encodings))
+      for iter42 in self.encodings:
+        oprot.writeI32(iter42)
+      oprot.writeListEnd()
+      oprot.writeFieldEnd()
+    if self.compressions is not None:
+      oprot.writeFieldBegin('compressions', TType.LIST, 2)
+      oprot.writeListBegin(TType.I32, len(self.compressions))
+      for iter43 in self.compressions:
+        oprot.writeI32(iter43)
+      oprot.writeListEnd()
+      oprot.writeFieldEnd()
+    oprot.writeFieldStop()
+    oprot.writeStructEnd()
+
+  def validate(self):
+    return
+
+
+  def __hash__(self):
+    value = 17
+    value = (value * 31) ^ hash(self.encodings)
+    value = (value * 31) ^ hash(self.compressions)
+    return value
+
+  def __repr__(self):
+    L = ['%s=%r' % (key, value)
+      for key, value in self.__dict__.iteritems()]
+    return '%s(%s)' % (self.__class__.__name__, ', '.join(L))
+
+  def __eq__(self, other):
+    return isinstance(other, self.__class__) and self.__dict__ == other.__dict__
+
+  def __ne__(self, other):
+    return not (self == other)
+
+class get_encoded_data_result:
+  """
+  Attributes:
+   - success
+  """
+
+  thrift_spec = (
+    (0, TType.STRUCT, 'success', (EncodedData, EncodedData.thrift_spec), None, ), # 0
+  )
+
+  def __init__(self, success=None,):
+    self.success = success
+
+  def read(self, iprot):
+    if iprot.__class__ == TBinaryProtocol.TBinaryProtocolAccelerated and isinstance(iprot.trans, TTransport.CReadableTransport) and self.thrift_spec is not None and fastbinary is not None:
+      fastbinary.decode_binary(self, iprot.trans, (self.__class__, self.thrift_spec))
+      return
+    iprot.readStructBegin()
+    while True:
+      (fname, ftype, fid) = iprot.readFieldBegin()
+      if ftype == TType.STOP:
+        break
+      if fid == 0:
+        if ftype == TType.STRUCT:
+          self.success = EncodedData()
+          self.success.read(iprot)
+        else:
+          iprot.skip(ftype)
+      else:
+        iprot.skip(ftype)
+      iprot.readFieldEnd()
+    iprot.readStructEnd()
+
+  def write(self, oprot):
+    if oprot.__class__ == TBinaryProtocol.TBinaryProtocolAccelerated and self.thrift_spec is not None and fastbinary is not None:
+      oprot.trans.write(fastbinary.encode_binary(self, (self.__class__, self.thrift_spec)))
+      return
+    oprot.writeStructBegin('get_encoded_data_result')
+    if self.success is not None:
+      oprot.writeFieldBegin('success', TType.STRUCT, 0)
+      self.success.write(oprot)
+      oprot.writeFieldEnd()
+    oprot.writeFieldStop()
+    oprot.writeStructEnd()
+
+  def validate(self):
+    return
+
+
   def __hash__(self):
     value = 17
     value = (value * 31) ^ hash(self.success)
@@ -17,6 +17,44 @@ except:
 
 
 
+class DataEncoding:
+  """
+  Serialization format of encoded object data.
+  """
+  JSON = 1
+  MSGPACK = 2
+
+  _VALUES_TO_NAMES = {
+    1: "JSON",
+    2: "MSGPACK",
+  }
+
+  _NAMES_TO_VALUES = {
+    "JSON": 1,
+    "MSGPACK": 2,
+  }
+
+class DataCompression:
+  """
+  Compression of encoded object data.
+  """
+  NONE = 0
+  ZLIB = 1
+  ZSTD = 2
+
+  _VALUES_TO_NAMES = {
+    0: "NONE",
+    1: "ZLIB",
+    2: "ZSTD",
+  }
+
+  _NAMES_TO_VALUES = {
+    "NONE": 0,
+    "ZLIB": 1,
+    "ZSTD": 2,
+  }
+
+
 class Metadata:
   """
   Default metadata for an object.
@@ -397,6 +435,100 @@ class Provenance:
   def __ne__(self, other):
     return not (self == other)
 
+class EncodedData:
+  """
+  Object data, serialized and compressed as negotiated
+  by get_encoded_data.
+
+  Attributes:
+   - encoding
+   - compression
+   - data
+  """
+
+  thrift_spec = (
+    None, # 0
+    (1, TType.I32, 'encoding', None, None, ), # 1
+    (2, TType.I32, 'compression', None, None, ), # 2
+    (3, TType.STRING, 'data', None, None, ), # 3
+  )
+
+  def __init__(self, encoding=None, compression=None, data=None,):
+    self.encoding = encoding
+    self.compression = compression
+    self.data = data
+
+  def read(self, iprot):
+    if iprot.__class__ == TBinaryProtocol.TBinaryProtocolAccelerated and isinstance(iprot.trans, TTransport.CReadableTransport) and self.thrift_spec is not None and fastbinary is not None:
+      fastbinary.decode_binary(self, iprot.trans, (self.__class__, self.thrift_spec))
+      return
+    iprot.readStructBegin()
+    while True:
+      (fname, ftype, fid) = iprot.readFieldBegin()
+      if ftype == TType.STOP:
+        break
+      if fid == 1:
+        if ftype == TType.I32:
+          self.encoding = iprot.readI32();
+        else:
+          iprot.skip(ftype)
+      elif fid == 2:
+        if ftype == TType.I32:
+          self.compression = iprot.readI32();
+        else:
+          iprot.skip(ftype)
+      elif fid == 3:
+        if ftype == TType.STRING:
+          self.data = iprot.readString();
+        else:
+          iprot.skip(ftype)
+      else:
+        iprot.skip(ftype)
+      iprot.readFieldEnd()
+    iprot.readStructEnd()
+
+  def write(self, oprot):
+    if oprot.__class__ == TBinaryProtocol.TBinaryProtocolAccelerated and self.thrift_spec is not None and fastbinary is not None:
+      oprot.trans.write(fastbinary.encode_binary(self, (self.__class__, self.thrift_spec)))
+      return
+    oprot.writeStructBegin('EncodedData')
+    if self.encoding is not None:
+      oprot.writeFieldBegin('encoding', TType.I32, 1)
+      oprot.writeI32(self.encoding)
+      oprot.writeFieldEnd()
+    if self.compression is not None:
+      oprot.writeFieldBegin('compression', TType.I32, 2)
+      oprot.writeI32(self.compression)
+      oprot.writeFieldEnd()
+    if self.data is not None:
+      oprot.writeFieldBegin('data', TType.STRING, 3)
+      oprot.writeString(self.data)
+      oprot.writeFieldEnd()
+    oprot.writeFieldStop()
+    oprot.writeStructEnd()
+
+  def validate(self):
+    return
+
+
+  def __hash__(self):
+    value = 17
+    value = (value * 31) ^ hash(self.encoding)
+    value = (value * 31) ^ hash(self.compression)
+    value = (value * 31) ^ hash(self.data)
+    return value
+
+  def __repr__(self):
+    L = ['%s=%r' % (key, value)
+      for key, value in self.__dict__.iteritems()]
+    return '%s(%s)' % (self.__class__.__name__, ', '.join(L))
+
+  def __eq__(self, other):
+    return isinstance(other, self.__class__) and self.__dict__ == other.__dict__
+
+  def __ne__(self, other):
+    return not (self == other)
+
 class AuthInfo:
   """
   Authorization info
@@ -5,9 +5,12 @@ Module for base class for Data API objects.
 # Imports
 
 # Stdlib
+from contextlib import contextmanager
+import json
 import logging
 import os
 import re
+import threading
 try:
     import cStringIO as StringIO
 except ImportError:
@@ -15,6 +18,7 @@ except ImportError:
 # Local
 from doekbase.data_api.util import get_logger, log_start, log_end
 from doekbase.workspace.client import Workspace
+from doekbase.workspace.codec import CODEC_SERVICE_KEY
 from doekbase.data_api.wsfile import WorkspaceFile
 
 # Logging
@@ -37,6 +41,140 @@ def get_token():
         raise Exception(
             "Missing authentication token!  Set KB_AUTH_TOKEN environment variable.")
 
+def _check_services(services):
+    if services is None or type(services) != type({}):
+        raise TypeError("You must provide a service configuration dictionary! Found {0}".format(type(services)))
+    elif not services.has_key("workspace_service_url"):
+        raise KeyError("Expecting workspace_service_url key!")
+
+def _check_ref(ref):
+    if ref is None:
+        raise TypeError("Missing object reference!")
+    elif type(ref) != type("") and type(ref) != type(unicode()):
+        raise TypeError("Invalid reference given, expected string! Found {0}".format(type(ref)))
+    elif re.match(REF_PATTERN, ref) is None:
+        raise TypeError("Invalid workspace reference string! Found {0}".format(ref))
+
+# Object info, MD5 type strings and (optionally) data that were already
+# fetched in bulk by `ObjectAPI.from_refs`, keyed by (workspace URL,
+# reference), and the Workspace clients used, keyed by (URL, token).
+_resolved = threading.local()
+
+@contextmanager
+def _resolved_objects(ws_url, resolved, token=None, ws_client=None):
+    """Make pre-fetched (info, typestring, data) tuples for the given
+    references, and the client they were fetched with, visible to objects
+    constructed in this thread, within the context.
+    """
+    previous = getattr(_resolved, 'objects', None)
+    previous_clients = getattr(_resolved, 'clients', None)
+    objects = dict(previous or {})
+    for ref, value in resolved.items():
+        objects[(ws_url, ref)] = value
+    clients = dict(previous_clients or {})
+    if ws_client is not None:
+        clients[(ws_url, token)] = ws_client
+    _resolved.objects, _resolved.clients = objects, clients
+    try:
+        yield
+    finally:
+        _resolved.objects, _resolved.clients = previous, previous_clients
+
+def _get_resolved(ws_url, ref):
+    objects = getattr(_resolved, 'objects', None)
+    if not objects:
+        return None
+    return objects.get((ws_url, ref), None)
+
+def _get_resolved_client(ws_url, token):
+    clients = getattr(_resolved, 'clients', None)
+    if not clients:
+        return None
+    return clients.get((ws_url, token), None)
+
+class MD5TypeCache(object):
+    """Thread-safe cache of translations from semantic type strings,
+    e.g. `KBaseGenomes.Genome-8.0`, to MD5 type strings.
+
+    Translations are kept separately for each Workspace URL, since
+    different Workspace deployments may have different type registries.
+    There are only a few dozen distinct types, so the cache is never
+    pruned.
+
+    If a path is given, the translations are read from that file (if it
+    exists) and the file is re-written whenever new translations are added.
+    """
+    def __init__(self, path=None):
+        self._lock = threading.Lock()
+        self._types = {}
+        self._path = None
+        if path is not None:
+            self.set_path(path)
+
+    def set_path(self, path):
+        """Persist translations to, and load existing ones from, `path`.
+
+        Args:
+          path (str): File path, or None to stop persisting.
+        """
+        with self._lock:
+            self._path = path
+            if path is None or not os.path.exists(path):
+                return
+            try:
+                with open(path) as f:
+                    stored = json.load(f)
+            except (IOError, ValueError) as err:
+                _log.warn('Cannot load MD5 type cache from {}: {}'
+                          .format(path, err))
+                return
+            for ws_url, types in stored.items():
+                self._types.setdefault(ws_url, {}).update(types)
+
+    def translate(self, ws_url, ws_client, types):
+        """Translate semantic type strings to MD5 type strings,
+        asking the Workspace (in one call) only for those not yet cached.
+
+        Args:
+          ws_url (str): Workspace URL, used as the cache key
+          ws_client: Workspace client for `ws_url`
+          types (list<str>): Semantic type strings
+        Returns:
+          dict<str,str>: Mapping of each input type to its MD5 type.
+        """
+        with self._lock:
+            known = self._types.get(ws_url, {})
+            missing = list(set([t for t in types if t not in known]))
+        if missing:
+            found = ws_client.translate_to_MD5_types(missing)
+            with self._lock:
+                self._types.setdefault(ws_url, {}).update(found)
+                known = self._types[ws_url]
+                self._save()
+        return dict([(t, known[t]) for t in types])
+
+    def clear(self):
+        """Forget all translations (this does not remove the file)."""
+        with self._lock:
+            self._types = {}
+
+    def _save(self):
+        # caller must hold the lock
+        if self._path is None:
+            return
+        tmp_path = '{}.{:d}.tmp'.format(self._path, os.getpid())
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(self._types, f)
+            os.rename(tmp_path, self._path)
+        except (IOError, OSError) as err:
+            _log.warn('Cannot save MD5 type cache to {}: {}'
+                      .format(self._path, err))
+
+#: Cache of MD5 type translations shared by all objects. Set the
+#: environment variable KB_MD5_TYPE_CACHE to a file path to persist it.
+md5_type_cache = MD5TypeCache(os.environ.get('KB_MD5_TYPE_CACHE', None))
+
 class ObjectAPI(object):
     """
     Generic Object API for basic properties and actions
@@ -57,48 +195,42 @@ class ObjectAPI(object):
         Args:
           services (dict): Service configuration dictionary. Required keys:
               * workspace_service_url: URL for Workspace, such as `https://ci.kbase.us/services/ws/`
+              Optional keys:
+              * json_codec: Name of the JSON codec for Workspace calls, such as `ujson`
           ref (str): Object reference, which can be the name of the object
              (although this is not unique), or a numeric identifier in the
              format `A/B[/C]` where A is the number of the workspace, B is the
              number identifying the object, and C is the "version" number of
              the object.
         """
-        if services is None or type(services) != type({}):
-            raise TypeError("You must provide a service configuration dictionary! Found {0}".format(type(services)))
-        elif not services.has_key("workspace_service_url"):
-            raise KeyError("Expecting workspace_service_url key!")
-        
-        if ref is None:
-            raise TypeError("Missing object reference!")
-        elif type(ref) != type("") and type(ref) != type(unicode()):
-            raise TypeError("Invalid reference given, expected string! Found {0}".format(type(ref)))
-        elif re.match(REF_PATTERN, ref) is None:
-            raise TypeError("Invalid workspace reference string! Found {0}".format(ref))
+        _check_services(services)
+        _check_ref(ref)
 
         self.services = services
         self.ref = ref
-        self._token = None
 
         ws_url = services["workspace_service_url"]
-        if '://' in ws_url: # assume a real Workspace server
-            if token is None or len(token.strip()) == 0:
-                self._token = get_token()
-            else:
-                self._token = token
-
-            _log.debug('Connect to Workspace service at {}'.format(ws_url))
-            self.ws_client = Workspace(ws_url, token=self._token)
+        ws_client = _get_resolved_client(ws_url, token)
+        if ws_client is None:
+            self._token, self.ws_client = self._connect(
+                ws_url, token, services.get(CODEC_SERVICE_KEY, None))
         else:
-            _log.debug('Load from Workspace file at {}'.format(ws_url))
-            self.ws_client = self._init_ws_from_files(ws_url)
+            self._token, self.ws_client = token, ws_client
 
-        info_values = self.ws_client.get_object_info_new({
-            "objects": [{"ref": self.ref}],
-            "includeMetadata": 0,
-            "ignoreErrors": 0})
-        if not info_values:
-            raise ValueError("Cannot find object: {}".format(self.ref))
-        oi = info_values[0]
+        data = None
+        resolved = _get_resolved(ws_url, ref)
+        if resolved is None:
+            info_values = self.ws_client.get_object_info_new({
+                "objects": [{"ref": self.ref}],
+                "includeMetadata": 0,
+                "ignoreErrors": 0})
+            if not info_values:
+                raise ValueError("Cannot find object: {}".format(self.ref))
+            oi = info_values[0]
+            typestring = md5_type_cache.translate(ws_url, self.ws_client,
+                                                  [oi[2]])[oi[2]]
+        else:
+            oi, typestring, data = resolved
 
         self._info = {
             "object_id": oi[0],
@@ -117,15 +249,98 @@ class ObjectAPI(object):
         }
         self._id = self._info["object_id"]
         self._name = self._info["object_name"]
-        self._typestring = self.ws_client.translate_to_MD5_types(
-            [self._info["type_string"]]).values()[0]
+        self._typestring = typestring
         self._version = self._info["version"]
         self._schema = None
         self._history = None
         self._provenance = None
-        self._data = None
+        self._data = data
+        self._id_indexes = dict()
 
-    def _init_ws_from_files(self, path):
+    @classmethod
+    def from_refs(cls, services=None, token=None, refs=None, data_types=None):
+        """Create one object for each of many references.
+
+        All the references are looked up with a single call to
+        `get_object_info_new`, and their distinct types are translated
+        with at most one call to `translate_to_MD5_types`. The objects
+        (and any objects their constructors create for the same
+        references, e.g. the type-specific proxies) are then built from
+        this shared result, and the same Workspace client, instead of
+        each contacting the Workspace.
+
+        Args:
+          services (dict): Service configuration dictionary, as for the
+             constructor.
+          token (str): Authorization token.
+          refs (list<str>): Object references, as for the constructor.
+          data_types (list<str>): Type names, without version, e.g.
+             `KBaseGenomesCondensedPrototypeV2.Taxon`. The data of all
+             objects of these types is fetched with one more call, so that
+             :meth:`get_data` does not need the Workspace.
+        Returns:
+          list: New instances of this class, in the same order as `refs`.
+        """
+        _check_services(services)
+        if refs is None:
+            raise TypeError("Missing list of object references!")
+        for ref in refs:
+            _check_ref(ref)
+        if len(refs) == 0:
+            return []
+
+        ws_url = services["workspace_service_url"]
+        token, ws_client = cls._connect(
+            ws_url, token, services.get(CODEC_SERVICE_KEY, None))
+
+        info_values = ws_client.get_object_info_new({
+            "objects": [{"ref": ref} for ref in refs],
+            "includeMetadata": 0,
+            "ignoreErrors": 0})
+        if not info_values or len(info_values) != len(refs):
+            raise ValueError("Cannot find all objects: {}".format(refs))
+        md5_types = md5_type_cache.translate(
+            ws_url, ws_client, [oi[2] for oi in info_values])
+
+        data = dict()
+        if data_types:
+            data_refs = [ref for ref, oi in zip(refs, info_values)
+                         if oi[2].split('-')[0] in data_types]
+            if data_refs:
+                values = ws_client.get_objects_data(
+                    [{"ref": ref} for ref in data_refs])
+                data = dict(zip(data_refs, values))
+
+        resolved = dict()
+        for ref, oi in zip(refs, info_values):
+            resolved[ref] = (oi, md5_types[oi[2]], data.get(ref, None))
+
+        with _resolved_objects(ws_url, resolved, token, ws_client):
+            return [cls(services, token, ref) for ref in refs]
+
+    @classmethod
+    def _connect(cls, ws_url, token, json_codec=None):
+        """Get a client for the Workspace at `ws_url`, which
+        may also be a path to a directory of Workspace files.
+        The client encodes and decodes JSON with the codec
+        named `json_codec` (see :mod:`doekbase.workspace.codec`).
+
+        Returns:
+          (str, object): The token actually used, and the client.
+        """
+        if '://' in ws_url: # assume a real Workspace server
+            if token is None or len(token.strip()) == 0:
+                token = get_token()
+
+            _log.debug('Connect to Workspace service at {}'.format(ws_url))
+            return token, Workspace(ws_url, token=token,
+                                    json_codec=json_codec)
+        else:
+            _log.debug('Load from Workspace file at {}'.format(ws_url))
+            return None, cls._init_ws_from_files(ws_url)
+
+    @staticmethod
+    def _init_ws_from_files(path):
         ext = '.msgpack'
         extlen = len(ext)
         WorkspaceFile.use_msgpack = True
@@ -221,10 +436,42 @@ class ObjectAPI(object):
           dict"""
         
         if self._data == None:
-            self._data = self.ws_client.get_objects([{"ref": self.ref}])[0]["data"]
+            self._data = self.ws_client.get_objects_data([{"ref": self.ref}])[0]
         
         return self._data
 
+    def _get_id_index(self, list_key, id_key="id"):
+        """Position of each record in a list in the object data, by id.
+        Built the first time it is needed, and kept with the data.
+
+        Args:
+          list_key (str): Key of the list in the data, e.g. "features"
+          id_key (str): Key of the id in each record
+        Returns:
+          dict: Position in the list, by id. If ids repeat, the last wins.
+        """
+        key = (list_key, id_key)
+        if key not in self._id_indexes:
+            records = self.get_data()[list_key]
+            self._id_indexes[key] = dict([(r[id_key], i)
+                                          for i, r in enumerate(records)])
+        return self._id_indexes[key]
+
+    def _get_records(self, list_key, id_list, id_key="id"):
+        """Records with the given ids, from a list in the object data,
+        found through :meth:`_get_id_index`.
+
+        Args:
+          list_key (str): Key of the list in the data, e.g. "features"
+          id_list (list<str>): Ids. Ids not in the list are skipped.
+          id_key (str): Key of the id in each record
+        Returns:
+          list<dict>: The records, in the order of `id_list`.
+        """
+        index = self._get_id_index(list_key, id_key)
+        records = self.get_data()[list_key]
+        return [records[index[i]] for i in id_list if i in index]
+
     def get_data_subset(self, path_list=None):
         """
         Retrieve a subset of data from this object, given a list of paths to the data elements.
@@ -232,8 +479,8 @@ class ObjectAPI(object):
         Returns:
           dict"""
 
-        return self.ws_client.get_object_subset([{"ref": self.ref, 
-                        "included": path_list}])[0]["data"]
+        return self.ws_client.get_object_subset_data([{"ref": self.ref, 
+                        "included": path_list}])[0]
     
     def get_referrers(self):
         """
@@ -243,10 +490,13 @@ class ObjectAPI(object):
           dict"""
         
         referrers = self.ws_client.list_referencing_objects([{"ref": self.ref}])[0]
+        md5_types = md5_type_cache.translate(
+            self.services["workspace_service_url"], self.ws_client,
+            [x[2] for x in referrers])
         
         object_refs_by_type = dict()        
         for x in referrers:
-            typestring = self.ws_client.translate_to_MD5_types([x[2]]).values()[0]
+            typestring = md5_types[x[2]]
             
             if typestring not in object_refs_by_type:
                 object_refs_by_type[typestring] = list()
@@ -6,25 +6,73 @@ as well as methods for retrieving individual contig sequences and gathering cont
 
 # Stdlib
 import abc
+import itertools
 import requests
-import re
 import string
-import hashlib
-try:
-    import cStringIO as StringIO
-except ImportError:
-    import StringIO as StringIO
 
 # Local
 from doekbase.data_api.core import ObjectAPI
+from doekbase.data_api.sequence import digest
+from doekbase.data_api.sequence import faidx
+from doekbase.data_api.sequence.packed import PackedSequence
+from doekbase.data_api.sequence import shock
+from doekbase.data_api.sequence import shock_cache
 
-CHUNK_SIZE = 2**30
+CHUNK_SIZE = 2**20
 
 _CONTIGSET_TYPES = ['KBaseGenomes.ContigSet']
 _ASSEMBLY_TYPES = ['KBaseGenomesCondensedPrototypeV2.Assembly']
 TYPES = _CONTIGSET_TYPES + _ASSEMBLY_TYPES
 
 
+def _count_gc(sequence):
+    """Count G and C bases, in either case, in `sequence`.
+    Each count is a single pass in C, with no per-base allocation.
+    """
+    return (sequence.count("G") + sequence.count("C") +
+            sequence.count("g") + sequence.count("c"))
+
+
+_COMPLEMENT = string.maketrans("ACGTURYKMSWBDHVNacgturykmswbdhvn",
+                               "TGCAAYRMKSWVHDBNtgcaayrmkswvhdbn")
+
+def _reverse_complement(sequence):
+    return sequence.translate(_COMPLEMENT)[::-1]
+
+def _check_region(region, length):
+    """Check a region against the length of its contig.
+
+    Returns:
+      tuple: 0-based (start, stop) of the region, stop exclusive.
+    Raises:
+      ValueError: if the region is not within the contig, or the
+        strand is not one of '+', '-' or '?'.
+    """
+    start, stop = region["start"], region["stop"]
+    if not 1 <= start <= stop <= length:
+        raise ValueError("Region {0:d}..{1:d} is not within contig {2} "
+                         "of length {3:d}".format(start, stop, region["contig_id"], length))
+    if region.get("strand", "+") not in ("+", "-", "?"):
+        raise ValueError("Invalid strand: {0}".format(region["strand"]))
+    return start - 1, stop
+
+def _check_contig(region, contigs):
+    """Check that the contig of a region is known.
+
+    Args:
+      contigs: Mapping, or other container, of the known contig ids.
+    Raises:
+      ValueError: if it is not.
+    """
+    if region["contig_id"] not in contigs:
+        raise ValueError("Unknown contig {0}".format(region["contig_id"]))
+
+def _strand_sequence(region, sequence):
+    if region.get("strand", "+") == "-":
+        return _reverse_complement(sequence)
+    return sequence
+
+
 class AssemblyInterface(object):
     """API for the assembled sequences associated with a Genome Annotation.
     """
@@ -130,11 +178,14 @@ class AssemblyInterface(object):
         pass
 
     @abc.abstractmethod    
-    def get_contigs(self, contig_id_list=None):
+    def get_contigs(self, contig_id_list=None, packed=False):
         """Retrieve contiguous sequences from this Assembly by id.
         
         Args:
           contig_id_list: list<str>
+          packed (bool): If true, each sequence is a
+            :class:`doekbase.data_api.sequence.packed.PackedSequence`,
+            which takes about a quarter of the memory of a string.
         Returns:
           dict<str,dict>: dictionary of contigs, with contig id as key
           and each value itself a dict with the following key/value pairs:
@@ -158,6 +209,69 @@ class AssemblyInterface(object):
         """
         pass
 
+    @abc.abstractmethod
+    def iter_contigs(self, contig_id_list=None, packed=False):
+        """Iterate over contiguous sequences from this Assembly by id,
+        holding only one sequence in memory at a time.
+
+        Args:
+          contig_id_list: list<str>
+          packed (bool): As for :meth:`get_contigs`.
+        Returns:
+          generator<dict>: one contig at a time, in the order they are
+          stored, as in the values returned by :meth:`get_contigs`.
+        """
+        pass
+
+    @abc.abstractmethod
+    def get_contig_region(self, contig_id, start, stop, strand="+"):
+        """Retrieve part of a contiguous sequence, without retrieving
+        the rest of it.
+
+        Args:
+          contig_id (str): Contig identifier
+          start (int): Position of first base, starting at 1
+          stop (int): Position of last base, inclusive
+          strand (str): "+" or "?" for the stored sequence, "-" for its
+            reverse complement.
+        Returns:
+          str: The sequence of the region.
+        Raises:
+          ValueError: if the contig is unknown, or the region is not
+            within it.
+        """
+        pass
+
+    @abc.abstractmethod
+    def get_regions(self, region_list):
+        """Retrieve parts of contiguous sequences, in one batch.
+
+        Args:
+          region_list (list<dict>): List of region objects, e.g.:
+            [{"contig_id": str, "strand": "+"|"-"|"?", "start": int, "stop": int},...]
+            as for :meth:`get_contig_region`.
+        Returns:
+          list<str>: The sequence of each region, in the same order.
+        Raises:
+          ValueError: if a contig is unknown, or a region is not
+            within its contig.
+        """
+        pass
+
+
+    @abc.abstractmethod
+    def get_fasta_index(self):
+        """Retrieve the index of the FASTA file of this Assembly, as
+        written by `samtools faidx`, for use by tools that read
+        parts of the file directly from Shock.
+
+        Returns:
+          str: Contents of a .fai file, one tab-separated line per contig
+          with its id, length, byte offset, bases per line and bytes per line.
+        Raises:
+          TypeError: if the Assembly has no FASTA file (a ContigSet).
+        """
+        pass
 
 
 class AssemblyAPI(ObjectAPI, AssemblyInterface):
@@ -207,13 +321,27 @@ class AssemblyAPI(ObjectAPI, AssemblyInterface):
     def get_contig_ids(self):
         return self.proxy.get_contig_ids()
 
-    def get_contigs(self, contig_id_list=None):
-        return self.proxy.get_contigs(contig_id_list)
+    def get_contigs(self, contig_id_list=None, packed=False):
+        return self.proxy.get_contigs(contig_id_list, packed)
+
+    def iter_contigs(self, contig_id_list=None, packed=False):
+        return self.proxy.iter_contigs(contig_id_list, packed)
+
+    def get_contig_region(self, contig_id, start, stop, strand="+"):
+        return self.proxy.get_contig_region(contig_id, start, stop, strand)
+
+    def get_regions(self, region_list):
+        return self.proxy.get_regions(region_list)
+
+    def get_fasta_index(self):
+        return self.proxy.get_fasta_index()
 
 
 class _KBaseGenomes_ContigSet(ObjectAPI, AssemblyInterface):
     def __init__(self, services, token, ref):
         super(_KBaseGenomes_ContigSet, self).__init__(services, token, ref)
+        self._contig_stats = None
+        self._contig_index = None
 
     def get_assembly_id(self):
         return self.get_data_subset(path_list=["id"])["id"]
@@ -241,142 +369,164 @@ class _KBaseGenomes_ContigSet(ObjectAPI, AssemblyInterface):
         
         return output
 
-    def get_stats(self):
-        contigs = self.get_data()["contigs"]
-        
-        pattern = re.compile(r'g|G|c|C')
-        
-        total_gc = 0
-        for c in contigs:
-            total_gc += len([s for s in re.finditer(pattern, c["sequence"])])
-        
-        total_length = 0
-        
-        for x in contigs:
-            if "length" in x:
-                total_length += x["length"]
+    def _get_contig_index(self):
+        """Id and length of each contig, in order, fetched without
+        the sequences the first time they are needed (unless the
+        sequences are already loaded).
+
+        Returns:
+          list<tuple>: (id, length) of each contig
+        """
+        if self._contig_index is None:
+            if self._data is None:
+                contigs = self.get_data_subset(
+                    path_list=["contigs/[*]/id", "contigs/[*]/length"])["contigs"]
             else:
-                total_length += len(x["sequence"])
+                contigs = self._data["contigs"]
+            if all(["length" in c for c in contigs]):
+                self._contig_index = [(c["id"], c["length"]) for c in contigs]
+            else:
+                # older ContigSets may lack lengths: count the sequences
+                stats = self._get_contig_stats()
+                self._contig_index = [(c["id"], stats[c["id"]][0]) for c in contigs]
+        return self._contig_index
+
+    def _get_contig_stats(self):
+        """Length, GC count and MD5 of each contig, computed in one pass
+        over the sequences the first time they are needed. The MD5 is
+        only computed for contigs that do not have one.
+
+        Returns:
+          dict<str,tuple>: (length, gc_count, md5), by contig id
+        """
+        if self._contig_stats is None:
+            stats = dict()
+            for c in self.get_data()["contigs"]:
+                if "md5" in c:
+                    gc_count, md5 = _count_gc(c["sequence"]), c["md5"]
+                    length = len(c["sequence"])
+                else:
+                    d = digest.digest_sequence(c["sequence"])
+                    gc_count, md5, length = d.gc_count, d.hexdigest(), d.length
+                if "length" in c:
+                    length = c["length"]
+                stats[c["id"]] = (length, gc_count, md5)
+            self._contig_stats = stats
+        return self._contig_stats
+
+    def get_stats(self):
+        stats = self._get_contig_stats().values()
+        total_length = sum([length for length, _, _ in stats])
+        total_gc = sum([gc for _, gc, _ in stats])
 
         data = dict()
         data["gc_content"] = total_gc/(total_length*1.0)
         data["dna_size"] = total_length
-        data["num_contigs"] = len(contigs)            
+        data["num_contigs"] = len(stats)
         
         return data
 
     def get_number_contigs(self):
-        return len(self.get_data()["contigs"])
+        return len(self._get_contig_index())
 
     def get_gc_content(self):
-        contigs = self.get_data()["contigs"]
-        
-        pattern = re.compile(r'g|G|c|C')
-        
-        total_gc = 0
-        total_length = 0
-        for c in contigs:
-            if "length" in c:
-                total_length += c["length"]
-            else:
-                total_length += len(c["sequence"])
-            
-            total_gc += len([s for s in re.finditer(pattern, c["sequence"])])
-        
-        return total_gc/(total_length*1.0)
+        return self.get_stats()["gc_content"]
 
     def get_dna_size(self):
-        contigs = self.get_data()["contigs"]
-        return sum([c["length"] for c in contigs])
+        return sum([length for _, length in self._get_contig_index()])
 
     def get_contig_lengths(self, contig_id_list=None):
-        contigs = self.get_data()["contigs"]        
+        lengths = dict(self._get_contig_index())
         
         if contig_id_list is None:        
-            contig_id_list = [c["id"] for c in contigs]
+            contig_id_list = lengths.keys()
 
-        contig_lengths = dict()
-        for c in contigs:
-            if c["id"] in contig_id_list:
-                if "length" in c:
-                    contig_lengths[c["id"]] = c["length"]
-                else:
-                    contig_lengths[c["id"]] = len(c["sequence"])
-        
-        return contig_lengths
+        return {c: lengths[c] for c in contig_id_list if c in lengths}
         
     def get_contig_gc_content(self, contig_id_list=None):
-        contigs = self.get_data()["contigs"]
-        
-        pattern = re.compile(r'g|G|c|C')
-        contigs_gc = dict()
-        
+        stats = self._get_contig_stats()
+
         if contig_id_list is None:
-            contig_id_list = [c["id"] for c in contigs]
-                    
-        for c in contigs:
-            if "length" in c:
-                length = c["length"] * 1.0
-            else:
-                length = len(c["sequence"]) * 1.0
-            
-            contigs_gc[c["id"]] = len([s for s in re.finditer(pattern, c["sequence"])])/length
-        
-        return contigs_gc
+            contig_id_list = stats.keys()
+
+        return {c: stats[c][1]/(stats[c][0] * 1.0)
+                for c in contig_id_list if c in stats}
 
     def get_contig_ids(self):
-        contigs = self.get_data()["contigs"]
-        return [c["id"] for c in contigs]
+        return [c for c, _ in self._get_contig_index()]
+
+    def _make_contig(self, c, stats, packed=False):
+        contig = dict()
+        contig["contig_id"] = c["id"]
+        if packed:
+            contig["sequence"] = PackedSequence(c["sequence"])
+        else:
+            contig["sequence"] = c["sequence"]
+                        
+        if "length" in c:
+            contig["length"] = c["length"]
+        else:
+            contig["length"] = len(c["sequence"])
+
+        contig["md5"] = stats[c["id"]][2]
+        
+        if "name" in c:
+            contig["name"] = c["name"]
+        else:
+            contig["name"] = None            
+
+        if "description" in c:
+            contig["description"] = c["description"]
+        else:
+            contig["description"] = None
+                    
+        if "complete" in c:
+            contig["is_complete"] = c["complete"]
+        else:
+            contig["is_complete"] = 0
+        
+        if "replicon_geometry" in c:
+            contig["is_circular"] = c["replicon_geometry"]
+        else:
+            contig["is_circular"] = "Unknown"
+            
+        contig["gc_content"] = stats[c["id"]][1]/(contig["length"] * 1.0)
+        return contig
 
-    def get_contigs(self, contig_id_list=None):
-        pattern = re.compile(r'g|G|c|C')
-        contigs = dict()
+    def get_contigs(self, contig_id_list=None, packed=False):
+        return {c["contig_id"]: c for c in self.iter_contigs(contig_id_list, packed)}
 
+    def iter_contigs(self, contig_id_list=None, packed=False):
+        stats = self._get_contig_stats()
         raw_contigs = self.get_data()["contigs"]
     
         if contig_id_list is None or len(contig_id_list) == 0:
             matches = raw_contigs
         else:
-            matches = [c for c in raw_contigs if c["id"] in contig_id_list]
+            wanted = set(contig_id_list)
+            matches = [c for c in raw_contigs if c["id"] in wanted]
         
         for c in matches:
-            contigs[c["id"]] = dict()
-            contigs[c["id"]]["contig_id"] = c["id"]
-            contigs[c["id"]]["sequence"] = c["sequence"]
-                            
-            if "length" in c:
-                contigs[c["id"]]["length"] = c["length"]
-            else:
-                contigs[c["id"]]["length"] = len(c["sequence"])
+            yield self._make_contig(c, stats, packed)
 
-            if "md5" in c:
-                contigs[c["id"]]["md5"] = c["md5"]
-            else:
-                contigs[c["id"]]["md5"] = hashlib.md5(c["sequence"].upper()).hexdigest()
-            
-            if "name" in c:
-                contigs[c["id"]]["name"] = c["name"]
-            else:
-                contigs[c["id"]]["name"] = None            
+    def get_contig_region(self, contig_id, start, stop, strand="+"):
+        return self.get_regions([{"contig_id": contig_id, "start": start,
+                                  "stop": stop, "strand": strand}])[0]
 
-            if "description" in c:
-                contigs[c["id"]]["description"] = c["description"]
-            else:
-                contigs[c["id"]]["description"] = None
-                        
-            if "complete" in c:
-                contigs[c["id"]]["is_complete"] = c["complete"]
-            else:
-                contigs[c["id"]]["is_complete"] = 0
-            
-            if "replicon_geometry" in c:
-                contigs[c["id"]]["is_circular"] = c["replicon_geometry"]
-            else:
-                contigs[c["id"]]["is_circular"] = "Unknown"
-                
-            contigs[c["id"]]["gc_content"] = len([s for s in re.finditer(pattern, c["sequence"])])/(contigs[c["id"]]["length"] * 1.0)
-        
-        return contigs            
+    def get_regions(self, region_list):
+        # sequences are already in memory; slicing copies only the region
+        contigs = self.get_data()["contigs"]
+        index = self._get_id_index("contigs")
+        result = list()
+        for region in region_list:
+            _check_contig(region, index)
+            sequence = contigs[index[region["contig_id"]]]["sequence"]
+            start, stop = _check_region(region, len(sequence))
+            result.append(_strand_sequence(region, sequence[start:stop]))
+        return result
+
+    def get_fasta_index(self):
+        raise TypeError("ContigSet objects have no FASTA file")
 
 
 class _Prototype(ObjectAPI, AssemblyInterface):
@@ -437,7 +587,118 @@ class _Prototype(ObjectAPI, AssemblyInterface):
         contigs = self.get_data()["contigs"]
         return [contigs[c]["contig_id"] for c in contigs]
 
-    def get_contigs(self, contig_id_list=None):
+    _copy_keys = ["contig_id", "length", "md5", "name", "description", "is_complete", "is_circular"]
+
+    def _make_contig(self, contig, sequence, packed=False):
+        out = dict()
+        for k in self._copy_keys:
+            if k in contig:
+                out[k] = contig[k]
+        if packed:
+            out["sequence"] = PackedSequence(sequence)
+        else:
+            out["sequence"] = sequence
+        return out
+
+    def _stream_sequences(self, node_url, contig_list):
+        """Read the whole FASTA file once, as a stream, and yield
+        the sequence of each contig in `contig_list`, with whitespace
+        removed. Only the current contig and one chunk of the file
+        are held in memory.
+
+        Args:
+          node_url (str): Shock node of the FASTA file
+          contig_list (list<dict>): Contigs, sorted by start_position
+        Returns:
+          generator<str>: sequences, in the order of `contig_list`
+        """
+        header = dict()
+        header["Authorization"] = "Oauth {0}".format(self._token)
+        response = requests.get(node_url + "?download_raw", headers=header,
+                                stream=True)
+        try:
+            response.raise_for_status()
+            chunks = (x for x in response.iter_content(CHUNK_SIZE) if x)
+            offset, buf = 0, ""  # file offset of start of buf, and buf
+            for contig in contig_list:
+                pos = contig["start_position"]
+                end = pos + contig["num_bytes"]
+                if pos < offset:
+                    raise ValueError("Overlapping contig: {0}".format(
+                        contig["contig_id"]))
+                pieces = list()
+                while pos < end:
+                    if pos >= offset + len(buf):
+                        offset += len(buf)
+                        buf = next(chunks, None)
+                        if buf is None:
+                            raise ValueError("FASTA file ended in contig: "
+                                             "{0}".format(contig["contig_id"]))
+                        continue
+                    hi = min(end - offset, len(buf))
+                    pieces.append(buf[pos - offset:hi].translate(None, string.whitespace))
+                    pos = offset + hi
+                yield "".join(pieces)
+        finally:
+            response.close()
+
+    def _cached_sequences(self, cache, node_url, contig_list, fetch_all):
+        """Yield the sequence of each contig in `contig_list` from the
+        local Shock cache, first downloading the whole FASTA file, or
+        only the missing contigs, into it.
+        """
+        ranges = [(c["start_position"], c["num_bytes"]) for c in contig_list]
+        if not fetch_all:
+            fetched = cache.read(node_url, ranges, self._token)
+            for r in ranges:
+                yield fetched[r].translate(None, string.whitespace)
+            return
+        cache.fetch_all(node_url, self._token)
+        data = cache.open(node_url)
+        try:
+            for r in ranges:
+                block = data[r[0]:r[0] + r[1]]
+                if len(block) != r[1]:
+                    # evicted before it was opened: fetch just this part
+                    block = cache.read(node_url, [r], self._token)[r]
+                yield block.translate(None, string.whitespace)
+        finally:
+            data.close()
+
+    def _iter_sequences(self, contig_id_list=None):
+        """Yield (contig_id, sequence) pairs, in start_position order,
+        streaming the whole FASTA file if many contigs are wanted
+        and fetching each one separately otherwise.
+        """
+        data = self.get_data()
+        total_contigs = data["num_contigs"]
+        contigs = data["contigs"]
+        node_url = self.services["shock_service_url"] + "node/" + data["fasta_handle_ref"]
+
+        if not contig_id_list:
+            contig_id_list = contigs.keys()
+
+        sorted_contigs = sorted(set(contig_id_list), key=lambda c: contigs[c]["start_position"])
+
+        cache = shock_cache.get_cache(self.services)
+        if cache is not None:
+            sequences = self._cached_sequences(cache, node_url, [contigs[c] for c in sorted_contigs],
+                                               len(sorted_contigs) > total_contigs/3)
+        elif len(sorted_contigs) > total_contigs/3:
+            sequences = self._stream_sequences(node_url, [contigs[c] for c in sorted_contigs])
+        else:
+            sequences = (shock.fetch_range(node_url, contigs[c]["start_position"],
+                                           contigs[c]["num_bytes"], self._token)
+                         .translate(None, string.whitespace)
+                         for c in sorted_contigs)
+        return itertools.izip(sorted_contigs, sequences)
+
+    def iter_contigs(self, contig_id_list=None, packed=False):
+        contigs = self.get_data()["contigs"]
+        for c, sequence in self._iter_sequences(contig_id_list):
+            yield self._make_contig(contigs[c], sequence, packed)
+
+    def get_contigs(self, contig_id_list=None, packed=False):
         data = self.get_data()
 
         if contig_id_list is None:
@@ -448,70 +709,99 @@ class _Prototype(ObjectAPI, AssemblyInterface):
         fasta_ref = data["fasta_handle_ref"]
         contigs = data["contigs"]
 
-        copy_keys = ["contig_id", "length", "md5", "name", "description", "is_complete", "is_circular"]
-
-        header = dict()
-        header["Authorization"] = "Oauth {0}".format(self._token)
-
         if num_contigs > total_contigs/3 or num_contigs == 0:
-            Retrieve_url = self.services["shock_service_url"] + "node/" + fasta_ref + "?download_raw"
-
-            #Retrieve all sequence
-            data = requests.get(Retrieve_url, headers=header, stream=True)                
-            buffer = StringIO.StringIO()
-            for chunk in data.iter_content(CHUNK_SIZE):
-                if chunk:
-                    buffer.write(chunk)
-            sequence_data = buffer.getvalue()
-            buffer.close()
-
-            if num_contigs == 0:
-                contig_id_list = contigs.keys()
-                num_contigs = total_contigs
-                assert num_contigs == len(contig_id_list)
-
-            outContigs = dict()
-            for i in xrange(num_contigs):
-                c = contig_id_list[i]
-                outContigs[c] = dict()
-                for k in copy_keys:
-                    if k in contigs[c]:
-                        outContigs[c][k] = contigs[c][k]
-
-                outContigs[c]["sequence"] = sequence_data[contigs[c]["start_position"]:contigs[c]["start_position"] + \
-                                            contigs[c]["num_bytes"]].translate(None, string.whitespace)
-        else:                
-            def fetch_contig(start, length):
-                fetch_url = self.services["shock_service_url"] + "node/" + fasta_ref + \
-                            "?download&seek=" + str(start) + \
-                            "&length=" + str(length)
-
-                #Retrieve individual sequences
-                data = requests.get(fetch_url, headers=header, stream=True)                
-                buffer = StringIO.StringIO()
-                try:
-                    for chunk in data.iter_content(CHUNK_SIZE):
-                        if chunk:
-                            buffer.write(chunk)
-
-                    sequence = buffer.getvalue().translate(None, string.whitespace)
-                except:
-                    raise
-                finally:
-                    buffer.close()
-                
-                return sequence
-                            
-            outContigs = dict()
-            sorted_contigs = sorted(contig_id_list,
+            #Retrieve all sequence, one contig at a time
+            return {c: self._make_contig(contigs[c], sequence, packed)
+                    for c, sequence in self._iter_sequences(contig_id_list)}
+        else:
+            sorted_contigs = sorted(set(contig_id_list),
                              cmp=lambda a,b: cmp(contigs[a]["start_position"], contigs[b]["start_position"]))
 
-            for c in sorted_contigs:
-                outContigs[c] = dict()
-                for k in copy_keys:
-                    if k in contigs[c]:
-                        outContigs[c][k] = contigs[c][k]
+            #Retrieve individual sequences, nearby ones together, in parallel
+            node_url = self.services["shock_service_url"] + "node/" + fasta_ref
+            ranges = [(contigs[c]["start_position"], contigs[c]["num_bytes"])
+                      for c in sorted_contigs]
+            fetched = self._read_ranges(node_url, ranges)
 
-                outContigs[c]["sequence"] = fetch_contig(contigs[c]["start_position"],contigs[c]["num_bytes"])
+            outContigs = dict()
+            for c, r in zip(sorted_contigs, ranges):
+                # pop, so each raw sequence can be freed once it is packed
+                outContigs[c] = self._make_contig(
+                    contigs[c], fetched.pop(r).translate(None, string.whitespace), packed)
 
         return outContigs
+
+    def _node_url(self):
+        data = self.get_data()
+        return self.services["shock_service_url"] + "node/" + data["fasta_handle_ref"]
+
+    def _read_ranges(self, node_url, ranges):
+        """Fetch byte ranges of the FASTA file, through the local
+        Shock cache if there is one.
+        """
+        cache = shock_cache.get_cache(self.services)
+        if cache is not None:
+            return cache.read(node_url, ranges, token=self._token)
+        return shock.fetch_ranges(node_url, ranges, token=self._token)
+
+    def _get_fasta_index(self, contig_id_list=None):
+        """Get the .fai index entries of some contigs, building those
+        not yet indexed from the first line of each, fetched together.
+
+        Returns:
+          dict<str,FastaIndexEntry>: Index entries, by contig id
+        Raises:
+          ValueError: if a contig's bytes do not match its length
+        """
+        contigs = self.get_data()["contigs"]
+        if contig_id_list is None:
+            contig_id_list = contigs.keys()
+        node_url = self._node_url()
+        index = faidx.get_index(node_url, self.services)
+        missing = [c for c in set(contig_id_list) if c not in index]
+        probe_size = 4096
+        while missing:
+            ranges = dict([(c, (contigs[c]["start_position"],
+                                min(probe_size, contigs[c]["num_bytes"])))
+                           for c in missing])
+            fetched = self._read_ranges(node_url, ranges.values())
+            entries = list()
+            for c in missing:
+                entry = faidx.entry_from_head(c, contigs[c]["length"],
+                                              contigs[c]["start_position"],
+                                              fetched[ranges[c]])
+                if entry is not None:
+                    entries.append(entry)
+                elif ranges[c][1] >= contigs[c]["num_bytes"]:
+                    # the whole contig was read, and did not fit its length
+                    raise ValueError("Cannot index contig {0}: its {1:d} bytes hold "
+                                     "no line ending and fewer than {2:d} bases"
+                                     .format(c, contigs[c]["num_bytes"],
+                                             contigs[c]["length"]))
+            faidx.add_entries(node_url, self.services, entries)
+            index.update([(e.name, e) for e in entries])
+            missing = [c for c in missing if c not in index]
+            probe_size *= 16
+        return index
+
+    def get_fasta_index(self):
+        index = self._get_fasta_index()
+        return faidx.format_index(sorted(index.values(), key=lambda e: e.offset))
+
+    def get_contig_region(self, contig_id, start, stop, strand="+"):
+        return self.get_regions([{"contig_id": contig_id, "start": start,
+                                  "stop": stop, "strand": strand}])[0]
+
+    def get_regions(self, region_list):
+        contigs = self.get_data()["contigs"]
+        for r in region_list:
+            _check_contig(r, contigs)
+        bounds = [_check_region(r, contigs[r["contig_id"]]["length"])
+                  for r in region_list]
+        index = self._get_fasta_index([r["contig_id"] for r in region_list])
+        ranges = [index[r["contig_id"]].byte_range(start, stop)
+                  for r, (start, stop) in zip(region_list, bounds)]
+
+        fetched = self._read_ranges(self._node_url(), ranges)
+        return [_strand_sequence(region, fetched[r].translate(None, string.whitespace))
+                for region, r in zip(region_list, ranges)]
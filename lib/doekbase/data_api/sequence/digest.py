@@ -0,0 +1,115 @@
+"""
+Checksums and base counts of DNA sequences, in one pass.
+
+The MD5 of a contig is that of its upper-cased sequence, and the MD5
+of an assembly is that of the sorted contig MD5s joined by commas.
+These are the checksums written by the Assembly uploader
+(`data_loading/genome_loading/upload_assemblies.py`) and computed for
+ContigSets that lack them, so uploads and reads agree.
+
+Sequences are processed in chunks: only one chunk at a time is
+upper-cased, and its MD5, length and GC count are all updated from it.
+"""
+
+# Imports
+
+# Stdlib
+import hashlib
+import string
+
+# Constants
+
+#: Bases processed per chunk
+CHUNK_SIZE = 2**20
+
+_UPPER = string.maketrans(string.ascii_lowercase, string.ascii_uppercase)
+
+# Classes and functions
+
+class SequenceDigest(object):
+    """MD5, length and GC count of one sequence, fed in chunks.
+
+    Args:
+      sequence (str): Initial part of the sequence, if any.
+    """
+    def __init__(self, sequence=None):
+        self._md5 = hashlib.md5()
+        self.length = 0
+        self.gc_count = 0
+        if sequence:
+            self.update(sequence)
+
+    def update(self, chunk):
+        """Add the next part of the sequence, which must have
+        no whitespace.
+        """
+        if isinstance(chunk, unicode):
+            chunk = chunk.encode("utf-8")
+        upper = chunk.translate(_UPPER)
+        self._md5.update(upper)
+        self.length += len(upper)
+        self.gc_count += upper.count("G") + upper.count("C")
+
+    def hexdigest(self):
+        """MD5 of the upper-cased sequence, as hex."""
+        return self._md5.hexdigest()
+
+    @property
+    def gc_content(self):
+        """Fraction of bases that are G or C, 0 for an empty sequence."""
+        if self.length == 0:
+            return 0.0
+        return self.gc_count / (self.length * 1.0)
+
+
+def digest_sequence(sequence, chunk_size=CHUNK_SIZE):
+    """Compute the MD5, length and GC count of a sequence in one pass.
+
+    Args:
+      sequence (str): The sequence, with no whitespace.
+      chunk_size (int): Bases to upper-case and hash at a time.
+    Returns:
+      SequenceDigest: The result.
+    """
+    result = SequenceDigest()
+    for i in xrange(0, len(sequence), chunk_size):
+        result.update(sequence[i:i + chunk_size])
+    return result
+
+
+class AssemblyDigest(object):
+    """MD5, total length and GC count of an assembly, from the
+    digests of its contigs.
+    """
+    def __init__(self):
+        self._md5s = []
+        self.length = 0
+        self.gc_count = 0
+
+    def add(self, contig_md5, length, gc_count):
+        """Add one contig.
+
+        Args:
+          contig_md5 (str): Hex MD5 of the contig, as from
+            :meth:`SequenceDigest.hexdigest`
+          length (int): Number of bases
+          gc_count (int): Number of G and C bases
+        """
+        self._md5s.append(contig_md5)
+        self.length += length
+        self.gc_count += gc_count
+
+    def add_digest(self, digest):
+        """Add one contig from its :class:`SequenceDigest`."""
+        self.add(digest.hexdigest(), digest.length, digest.gc_count)
+
+    def hexdigest(self):
+        """MD5 of the sorted contig MD5s, joined by commas."""
+        return hashlib.md5(",".join(sorted(self._md5s))).hexdigest()
+
+    @property
+    def gc_content(self):
+        """Fraction of bases that are G or C, 0 for an empty assembly."""
+        if self.length == 0:
+            return 0.0
+        return self.gc_count / (self.length * 1.0)
@@ -0,0 +1,162 @@
+"""
+FASTA line-offset indexes, in the `.fai` format of samtools faidx.
+
+Each entry gives, for one sequence, its length, the byte offset of its
+first base, and how its lines are wrapped. From these the byte range
+of any part of the sequence can be computed, so that it can be read
+with one ranged request.
+
+The index of a FASTA file in Shock never changes, so each one is kept
+for the life of the process, and also saved beside the local Shock
+cache when there is one.
+"""
+
+# Imports
+
+# Stdlib
+import collections
+import threading
+# Local
+from doekbase.data_api.sequence import shock_cache
+
+# Classes and functions
+
+class FastaIndexEntry(collections.namedtuple(
+        'FastaIndexEntry', 'name length offset line_bases line_width')):
+    """One line of a `.fai` index.
+
+    Attributes:
+      name (str): Sequence name
+      length (int): Number of bases
+      offset (int): Byte offset of the first base in the file
+      line_bases (int): Bases on each line, except perhaps the last
+      line_width (int): Bytes in each line, with its line ending
+    """
+    __slots__ = ()
+
+    def byte_range(self, start, stop):
+        """Byte range in the file of some bases.
+
+        Args:
+          start (int): 0-based position of the first base
+          stop (int): 0-based position after the last base
+        Returns:
+          tuple: (offset, length) of the bytes holding the bases,
+            including any line endings between them.
+        """
+        first = self._byte_offset(start)
+        last = self._byte_offset(stop - 1)
+        return first, last + 1 - first
+
+    def _byte_offset(self, pos):
+        return (self.offset + (pos // self.line_bases) * self.line_width +
+                pos % self.line_bases)
+
+
+def entry_from_head(name, length, offset, head):
+    """Create an index entry from the first bytes of a sequence.
+
+    Args:
+      name (str): Sequence name
+      length (int): Number of bases
+      offset (int): Byte offset of the first base
+      head (str): Bytes from `offset`, up to and including the first
+        line ending or, for a sequence on one line, to its end.
+    Returns:
+      FastaIndexEntry: The entry, or None if `head` has no line ending
+        and is shorter than the sequence.
+    """
+    newline = head.find("\n")
+    if newline >= 0:
+        bases = len(head[:newline].rstrip("\r"))
+        return FastaIndexEntry(name, length, offset, bases, newline + 1)
+    if len(head) >= length:
+        return FastaIndexEntry(name, length, offset, length, length + 1)
+    return None
+
+
+def format_index(entries):
+    """Format index entries as the text of a `.fai` file.
+
+    Args:
+      entries (list<FastaIndexEntry>): Entries, in file order.
+    Returns:
+      str: One tab-separated line per entry.
+    """
+    return "".join(["{0}\t{1:d}\t{2:d}\t{3:d}\t{4:d}\n".format(*e)
+                    for e in entries])
+
+
+def parse_index(text):
+    """Parse the text of a `.fai` file.
+
+    Args:
+      text (str): Contents of the file
+    Returns:
+      collections.OrderedDict: FastaIndexEntry, by name, in file order.
+    Raises:
+      ValueError: for a badly formatted line
+    """
+    result = collections.OrderedDict()
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        fields = line.split("\t")
+        if len(fields) < 5:
+            raise ValueError("Bad .fai line: {0}".format(line))
+        result[fields[0]] = FastaIndexEntry(fields[0],
+                                            *[int(f) for f in fields[1:5]])
+    return result
+
+
+_indexes = dict()
+_indexes_lock = threading.Lock()
+
+
+def get_index(node_url, services):
+    """Get the known part of the index of a FASTA file in Shock.
+
+    Args:
+      node_url (str): URL of the Shock node of the FASTA file
+      services (dict): Service configuration, for the Shock cache
+    Returns:
+      dict: FastaIndexEntry, by name, for the sequences indexed so far.
+        This is a copy; add entries with :func:`add_entries`.
+    """
+    cache = shock_cache.get_cache(services)
+    key = (node_url, cache and cache.path)
+    with _indexes_lock:
+        index = _indexes.get(key, None)
+        if index is None:
+            index = dict()
+            if cache is not None:
+                text = cache.read_extra(node_url, ".fai")
+                if text:
+                    try:
+                        index.update(parse_index(text))
+                    except ValueError:
+                        pass  # rebuild it
+            _indexes[key] = index
+        return dict(index)
+
+
+def add_entries(node_url, services, entries):
+    """Add entries to the index of a FASTA file in Shock, saving it
+    to the Shock cache if there is one.
+
+    Args:
+      node_url (str): URL of the Shock node of the FASTA file
+      services (dict): Service configuration, for the Shock cache
+      entries (list<FastaIndexEntry>): New entries
+    """
+    if not entries:
+        return
+    get_index(node_url, services)  # load any saved entries first
+    cache = shock_cache.get_cache(services)
+    with _indexes_lock:
+        index = _indexes[(node_url, cache and cache.path)]
+        for e in entries:
+            index[e.name] = e
+        if cache is not None:
+            ordered = sorted(index.values(), key=lambda e: e.offset)
+            cache.write_extra(node_url, ".fai", format_index(ordered))
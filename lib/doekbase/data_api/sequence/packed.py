@@ -0,0 +1,205 @@
+"""
+Compact in-memory DNA sequences, with 2 bits per base.
+
+A, C, G and T are packed four to a byte. Any other characters, such as
+N or other ambiguity codes, are kept as runs in a side table, as are
+runs of lower-case (soft-masked) bases, so the original string is
+restored exactly. Slicing, reverse complement and GC counting work on
+the packed bytes, and only the bases asked for are ever unpacked.
+
+Packing and unpacking loop over bytes in C (`str.translate`,
+`re.findall`, `map`), never over bases in Python.
+"""
+
+# Imports
+
+# Stdlib
+import itertools
+import re
+import string
+
+# Constants
+
+_BASES = "ACGT"
+#: Bases packed per chunk, to bound the memory used while packing
+_CHUNK_BASES = 2**20
+
+# all 4-base words, and the byte each packs to (first base in high bits)
+_WORDS = ["".join(w) for w in itertools.product(_BASES, repeat=4)]
+_PACK = dict([(w, i) for i, w in enumerate(_WORDS)])
+# pairs of words, packed to 2 bytes, to halve the lookups when packing
+_PACK_PAIR = dict([(w1 + w2, chr(i) + chr(j)) for i, w1 in enumerate(_WORDS)
+                   for j, w2 in enumerate(_WORDS)])
+# any character other than ACGT packs as A; it is restored from the table
+_TO_ACGT = string.maketrans(
+    "".join([chr(i) for i in range(256)]),
+    "".join([chr(i) if chr(i) in _BASES else "A" for i in range(256)]))
+# reverse complement of the 4 bases in each byte
+_REVCOMP_BYTE = "".join([
+    chr(_PACK[w.translate(string.maketrans("ACGT", "TGCA"))[::-1]])
+    for w in _WORDS])
+# number of G and C bases in each byte, as a character
+_GC_BYTE = "".join([chr(w.count("G") + w.count("C")) for w in _WORDS])
+_COMPLEMENT = string.maketrans("ACGTURYKMSWBDHVNacgturykmswbdhvn",
+                               "TGCAAYRMKSWVHDBNtgcaayrmkswvhdbn")
+
+_EXCEPTION_RUN = re.compile(r"([^ACGT])\1*")
+_LOWER_RUN = re.compile(r"[a-z]+")
+_WORD_PAIR = re.compile(r".{8}", re.DOTALL)
+
+# Classes and functions
+
+def _pack(sequence):
+    """Pack A, C, G and T, four bases to a byte, padding the end with A."""
+    packed = []
+    for i in xrange(0, len(sequence), _CHUNK_BASES):
+        chunk = sequence[i:i + _CHUNK_BASES].translate(_TO_ACGT)
+        if len(chunk) % 8:
+            chunk += "A" * (8 - len(chunk) % 8)
+        packed.append("".join(map(_PACK_PAIR.__getitem__,
+                                  _WORD_PAIR.findall(chunk))))
+    data = bytearray("".join(packed))
+    del data[(len(sequence) + 3) // 4:]
+    return data
+
+
+def _clip_runs(runs, start, stop):
+    """Runs within [start, stop), clipped and shifted to start at 0."""
+    result = []
+    for run in runs:
+        s, e = max(run[0], start), min(run[1], stop)
+        if s < e:
+            result.append((s - start, e - start) + tuple(run[2:]))
+    return tuple(result)
+
+
+class PackedSequence(object):
+    """DNA sequence stored with 2 bits per base.
+
+    Behaves like a read-only string for `len`, indexing, slicing (which
+    returns another PackedSequence), comparison and `str`.
+
+    Args:
+      sequence (str): The bases. Case and any characters other than
+        A, C, G and T are kept.
+    """
+    __slots__ = ("_data", "_offset", "_length", "_exceptions", "_lower")
+
+    def __init__(self, sequence=""):
+        if isinstance(sequence, unicode):
+            sequence = sequence.encode("ascii")
+        upper = sequence.upper()
+        self._data = _pack(upper)
+        self._offset = 0
+        self._length = len(sequence)
+        #: runs of other characters, as (start, stop, char)
+        self._exceptions = tuple([(m.start(), m.end(), m.group(1))
+                                  for m in _EXCEPTION_RUN.finditer(upper)])
+        #: runs of lower-case characters, as (start, stop)
+        self._lower = tuple([m.span() for m in _LOWER_RUN.finditer(sequence)])
+
+    @classmethod
+    def _from_parts(cls, data, offset, length, exceptions, lower):
+        obj = cls.__new__(cls)
+        obj._data = data
+        obj._offset = offset
+        obj._length = length
+        obj._exceptions = exceptions
+        obj._lower = lower
+        return obj
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self._length)
+            if step != 1:
+                return str(self)[key]
+            return self.subsequence(start, max(start, stop))
+        if key < 0:
+            key += self._length
+        if not 0 <= key < self._length:
+            raise IndexError("PackedSequence index out of range")
+        return str(self.subsequence(key, key + 1))
+
+    def subsequence(self, start, stop):
+        """Get bases [start, stop), 0-based, without unpacking them.
+
+        Returns:
+          PackedSequence: The bases, sharing no storage with this one.
+        """
+        first = (self._offset + start) // 4
+        last = (self._offset + stop + 3) // 4
+        return self._from_parts(self._data[first:last],
+                                (self._offset + start) % 4, stop - start,
+                                _clip_runs(self._exceptions, start, stop),
+                                _clip_runs(self._lower, start, stop))
+
+    def reverse_complement(self):
+        """Get the reverse complement, without unpacking.
+
+        Returns:
+          PackedSequence: The reverse complement.
+        """
+        data = self._data.translate(_REVCOMP_BYTE)
+        data.reverse()
+        n = self._length
+        exceptions = tuple([(n - e, n - s, c.translate(_COMPLEMENT))
+                            for s, e, c in reversed(self._exceptions)])
+        lower = tuple([(n - e, n - s) for s, e in reversed(self._lower)])
+        offset = len(data) * 4 - self._offset - n
+        return self._from_parts(data, offset, n, exceptions, lower)
+
+    def gc_count(self):
+        """Count G and C bases, in either case, without unpacking
+        more than the two partly used bytes at the ends.
+        """
+        if self._length == 0:
+            return 0
+        end = self._offset + self._length
+        # whole bytes, then correct for bases outside the sequence
+        counts = self._data.translate(_GC_BYTE)
+        total = (counts.count("\x01") + 2 * counts.count("\x02") +
+                 3 * counts.count("\x03") + 4 * counts.count("\x04"))
+        head = _WORDS[self._data[0]][:self._offset]
+        tail = _WORDS[self._data[-1]][end - (len(self._data) - 1) * 4:]
+        total -= (head.count("G") + head.count("C") +
+                  tail.count("G") + tail.count("C"))
+        # other characters are packed as A, so they are never counted
+        return total
+
+    def nbytes(self):
+        """Bytes used by the packed bases and the side tables."""
+        return len(self._data) + 24 * (len(self._exceptions) +
+                                       len(self._lower))
+
+    def __str__(self):
+        text = "".join(map(_WORDS.__getitem__, self._data))
+        buf = bytearray(text[self._offset:self._offset + self._length])
+        for s, e, c in self._exceptions:
+            buf[s:e] = c * (e - s)
+        for s, e in self._lower:
+            buf[s:e] = buf[s:e].lower()
+        return str(buf)
+
+    def __repr__(self):
+        if self._length > 20:
+            return "PackedSequence('{0}...', length={1:d})".format(
+                str(self.subsequence(0, 17)), self._length)
+        return "PackedSequence('{0}')".format(str(self))
+
+    def __eq__(self, other):
+        if isinstance(other, PackedSequence):
+            other = str(other)
+        if isinstance(other, basestring):
+            return len(other) == self._length and str(self) == other
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    __hash__ = None
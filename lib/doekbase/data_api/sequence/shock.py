@@ -0,0 +1,125 @@
+"""
+Fetch byte ranges of Shock nodes, such as the FASTA file
+behind an Assembly, concurrently.
+
+Nearby ranges are coalesced into one request, and the requests are
+sent from a bounded pool of threads sharing one keep-alive HTTP session.
+"""
+
+# Stdlib
+from multiprocessing.pool import ThreadPool
+import threading
+# Third-party
+import requests
+
+#: Ranges separated by at most this many bytes are fetched together
+MAX_GAP = 2**20
+#: Ranges are not coalesced into requests larger than this
+MAX_REQUEST_BYTES = 2**26
+#: Most requests in flight at once
+MAX_WORKERS = 8
+
+CHUNK_SIZE = 2**20
+
+_session = None
+_session_lock = threading.Lock()
+
+def _get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=MAX_WORKERS)
+            _session.mount('http://', adapter)
+            _session.mount('https://', adapter)
+        return _session
+
+def coalesce_ranges(ranges, max_gap=MAX_GAP,
+                    max_request_bytes=MAX_REQUEST_BYTES):
+    """Group byte ranges into fewer, larger ranges.
+
+    Args:
+      ranges (list<tuple>): (start, length) pairs, in any order.
+      max_gap (int): Ranges separated by at most this many bytes are
+        merged.
+      max_request_bytes (int): Ranges are not merged into a range
+        longer than this. A single longer range is kept as it is.
+    Returns:
+      list<tuple>: (start, length, members) for each merged range, in
+      order of start, where `members` are the input ranges it covers.
+    """
+    merged = []
+    for start, length in sorted(set(ranges)):
+        end = start + length
+        if merged:
+            m_start, m_end, members = merged[-1]
+            if (start - m_end <= max_gap and
+                    max(end, m_end) - m_start <= max_request_bytes):
+                merged[-1] = (m_start, max(end, m_end), members)
+                members.append((start, length))
+                continue
+        merged.append((start, end, [(start, length)]))
+    return [(start, end - start, members) for start, end, members in merged]
+
+def fetch_range(node_url, start, length, token=None):
+    """Fetch `length` bytes at offset `start` of a Shock node.
+
+    Args:
+      node_url (str): URL of the node, e.g. `<shock_service_url>node/<id>`
+      start (int): Offset of first byte
+      length (int): Number of bytes
+      token (str): Authorization token
+    Returns:
+      str: The bytes.
+    """
+    headers = {}
+    if token is not None:
+        headers["Authorization"] = "Oauth {0}".format(token)
+    url = "{0}?download&seek={1:d}&length={2:d}".format(node_url, start,
+                                                         length)
+    response = _get_session().get(url, headers=headers, stream=True)
+    try:
+        response.raise_for_status()
+        return "".join([chunk for chunk in
+                        response.iter_content(CHUNK_SIZE) if chunk])
+    finally:
+        response.close()
+
+def fetch_ranges(node_url, ranges, token=None, max_gap=MAX_GAP,
+                 max_request_bytes=MAX_REQUEST_BYTES,
+                 max_workers=MAX_WORKERS):
+    """Fetch many byte ranges of a Shock node, coalescing nearby
+    ranges and sending the requests concurrently.
+
+    Args:
+      node_url (str): URL of the node, e.g. `<shock_service_url>node/<id>`
+      ranges (list<tuple>): (start, length) pairs
+      token (str): Authorization token
+      max_gap (int): See :func:`coalesce_ranges`
+      max_request_bytes (int): See :func:`coalesce_ranges`
+      max_workers (int): Most requests in flight at once
+    Returns:
+      dict: Bytes for each (start, length) pair.
+    """
+    merged = coalesce_ranges(ranges, max_gap, max_request_bytes)
+    if not merged:
+        return {}
+
+    def fetch(request):
+        return fetch_range(node_url, request[0], request[1], token)
+
+    if len(merged) == 1 or max_workers <= 1:
+        blocks = [fetch(r) for r in merged]
+    else:
+        pool = ThreadPool(min(max_workers, len(merged)))
+        try:
+            blocks = pool.map(fetch, merged)
+        finally:
+            pool.close()
+
+    result = dict()
+    for (start, _, members), block in zip(merged, blocks):
+        for m_start, m_length in members:
+            offset = m_start - start
+            result[(m_start, m_length)] = block[offset:offset + m_length]
+    return result
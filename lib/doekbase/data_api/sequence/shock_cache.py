@@ -0,0 +1,362 @@
+"""
+Local on-disk cache of Shock node files, such as the FASTA file
+behind an Assembly.
+
+Each node is stored in a sparse file that is filled in as byte ranges
+of it are fetched, or all at once when the whole file is downloaded.
+Cached bytes are read back through `mmap`. Small files derived from
+a node, such as a FASTA index, can be kept with it. Shock nodes never
+change, so cached data never goes stale. The total size of the cache
+is capped, and the least recently used nodes are removed to stay under
+the cap.
+
+Anyone who can read the cache directory can read the cached data,
+whatever token was used to fetch it.
+
+Several processes can share a cache directory: changes to it, and
+reads of cached bytes, are serialized with a lock file (`fcntl.flock`,
+so on a local file system; where `fcntl` is missing, the directory
+must be used by one process only).
+
+The cache is used when the services dictionary has a directory under
+`CACHE_SERVICE_KEY`, or the environment variable named by `CACHE_ENV`
+is set.
+"""
+
+# Imports
+
+# Stdlib
+import contextlib
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+import hashlib
+import json
+import mmap
+import os
+import threading
+# Local
+from doekbase.data_api.sequence import shock
+from doekbase.data_api.util import get_logger
+
+# Constants
+
+#: Environment variable with the cache directory
+CACHE_ENV = 'KB_SHOCK_CACHE'
+#: Key in the services dictionary with the cache directory
+CACHE_SERVICE_KEY = 'shock_cache_dir'
+#: Environment variable with the size cap, in bytes
+CACHE_MAX_BYTES_ENV = 'KB_SHOCK_CACHE_MAX_BYTES'
+#: Default size cap, in bytes
+DEFAULT_MAX_BYTES = 10 * 2**30
+
+_DATA_EXT = '.data'
+_INDEX_EXT = '.json'
+_LOCK_FILE = '.lock'
+#: Times to fetch missing bytes before giving up, should other
+#: processes keep evicting them
+_READ_ATTEMPTS = 3
+
+# Logging
+
+_log = get_logger('shock_cache')
+
+# Functions and classes
+
+def _add_interval(intervals, start, end):
+    """Add [start, end) to sorted, disjoint intervals, merging
+    any it overlaps or touches.
+    """
+    result = []
+    for s, e in intervals:
+        if e < start or s > end:
+            result.append([s, e])
+        else:
+            start, end = min(s, start), max(e, end)
+    result.append([start, end])
+    result.sort()
+    return result
+
+def _missing(intervals, start, end):
+    """Parts of [start, end) not covered by the intervals, as
+    (start, length) pairs.
+    """
+    result = []
+    pos = start
+    for s, e in intervals:
+        if e <= pos:
+            continue
+        if s >= end:
+            break
+        if s > pos:
+            result.append((pos, s - pos))
+        pos = max(pos, e)
+    if pos < end:
+        result.append((pos, end - pos))
+    return result
+
+
+class ShockCache(object):
+    """Cache of Shock node files in a directory.
+
+    Args:
+      path (str): Cache directory, created if it does not exist.
+      max_bytes (int): Most bytes of node data to keep.
+    """
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        if not os.path.isdir(path):
+            os.makedirs(path)
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """Hold the lock of this object, and of the directory for
+        other processes.
+        """
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(self.path, _LOCK_FILE), 'a') as f:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                yield  # released when the file is closed
+
+    def _key(self, node_url):
+        return hashlib.sha1(node_url).hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self.path, key)
+        return base + _DATA_EXT, base + _INDEX_EXT
+
+    def _load_index(self, key):
+        index_path = self._paths(key)[1]
+        try:
+            with open(index_path) as f:
+                index = json.load(f)
+        except (IOError, ValueError):
+            return {'ranges': [], 'complete': False}
+        os.utime(index_path, None)  # mark as recently used
+        return index
+
+    def _save_index(self, key, index):
+        index_path = self._paths(key)[1]
+        tmp_path = '{}.{:d}.tmp'.format(index_path, os.getpid())
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f)
+        os.rename(tmp_path, index_path)
+
+    def _write(self, key, blocks):
+        # caller must hold the lock
+        data_path = self._paths(key)[0]
+        mode = 'r+b' if os.path.exists(data_path) else 'w+b'
+        with open(data_path, mode) as f:
+            for start, block in blocks:
+                f.seek(start)
+                f.write(block)
+
+    def _cached_bytes(self, index):
+        return sum([e - s for s, e in index['ranges']])
+
+    def _evict(self, keep):
+        """Remove least recently used nodes, other than `keep`,
+        until the cache is under its size cap.
+        """
+        entries, total = [], 0
+        for name in os.listdir(self.path):
+            if not name.endswith(_INDEX_EXT):
+                continue
+            key = name[:-len(_INDEX_EXT)]
+            index_path = self._paths(key)[1]
+            try:
+                with open(index_path) as f:
+                    size = self._cached_bytes(json.load(f))
+                used = os.path.getmtime(index_path)
+            except (IOError, OSError, ValueError):
+                continue
+            total += size
+            if key != keep:
+                entries.append((used, key, size))
+        entries.sort()
+        while total > self.max_bytes and entries:
+            _, key, size = entries.pop(0)
+            for path in self._paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+            _log.debug('Evicted {} ({:d} bytes) from Shock cache'
+                       .format(key, size))
+
+    def read(self, node_url, ranges, token=None):
+        """Read byte ranges of a Shock node, fetching those parts
+        that are not cached. Same arguments and result as
+        :func:`doekbase.data_api.sequence.shock.fetch_ranges`.
+
+        Raises:
+          IOError: if the bytes cannot be kept in the cache, for example
+            because other processes keep evicting them.
+        """
+        key = self._key(node_url)
+        fetched = None
+        for _ in xrange(_READ_ATTEMPTS):
+            with self._locked():
+                index = self._load_index(key)
+                if fetched:
+                    self._write(key, sorted(
+                        [(r[0], block) for r, block in fetched.items()]))
+                    for start, length in fetched:
+                        index['ranges'] = _add_interval(
+                            index['ranges'], start, start + length)
+                    self._save_index(key, index)
+                    self._evict(key)
+                wanted = set()
+                if not index['complete']:
+                    for start, length in ranges:
+                        wanted.update(_missing(index['ranges'],
+                                               start, start + length))
+                if not wanted:
+                    # read while locked, so the node cannot be evicted
+                    return self._slices(node_url, ranges)
+            fetched = shock.fetch_ranges(node_url, list(wanted), token)
+        raise IOError('Could not keep bytes of {} in the Shock cache at {}'
+                      .format(node_url, self.path))
+
+    def _slices(self, node_url, ranges):
+        # caller must hold the lock
+        data = self.open(node_url)
+        try:
+            result = dict()
+            for start, length in ranges:
+                block = data[start:start + length]
+                if len(block) != length:
+                    raise IOError('Shock cache file for {} is truncated'
+                                  .format(node_url))
+                result[(start, length)] = block
+            return result
+        finally:
+            data.close()
+
+    def fetch_all(self, node_url, token=None):
+        """Download the whole node file into the cache, unless it is
+        already there. The download is streamed to disk.
+
+        Args:
+          node_url (str): URL of the node, e.g. `<shock_service_url>node/<id>`
+          token (str): Authorization token
+        """
+        key = self._key(node_url)
+        with self._locked():
+            if self._load_index(key)['complete']:
+                return
+        headers = {}
+        if token is not None:
+            headers["Authorization"] = "Oauth {0}".format(token)
+        response = shock._get_session().get(node_url + "?download_raw",
+                                            headers=headers, stream=True)
+        tmp_path = '{}.{:d}.{:d}.tmp'.format(
+            self._paths(key)[0], os.getpid(), threading.current_thread().ident)
+        try:
+            response.raise_for_status()
+            size = 0
+            with open(tmp_path, 'wb') as f:
+                for chunk in response.iter_content(shock.CHUNK_SIZE):
+                    f.write(chunk)
+                    size += len(chunk)
+            with self._locked():
+                os.rename(tmp_path, self._paths(key)[0])
+                self._save_index(key, {'ranges': [[0, size]] if size else [],
+                                       'complete': True, 'size': size})
+                self._evict(key)
+        finally:
+            response.close()
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def read_extra(self, node_url, suffix):
+        """Read a small file kept with a node, such as its index.
+        These files are never evicted.
+
+        Args:
+          node_url (str): URL of the node
+          suffix (str): File name suffix, e.g. '.fai'
+        Returns:
+          str: Contents of the file, or None if there is none.
+        """
+        path = os.path.join(self.path, self._key(node_url) + suffix)
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except IOError:
+            return None
+
+    def write_extra(self, node_url, suffix, contents):
+        """Write a small file kept with a node, see :meth:`read_extra`.
+        """
+        path = os.path.join(self.path, self._key(node_url) + suffix)
+        tmp_path = '{}.{:d}.tmp'.format(path, os.getpid())
+        with self._locked():
+            with open(tmp_path, 'wb') as f:
+                f.write(contents)
+            os.rename(tmp_path, path)
+
+    def open(self, node_url):
+        """Map the cached node file into memory. Only the parts that
+        have been fetched are meaningful, the rest reads as zeros.
+        The map stays valid if the node is then evicted, but the node
+        may be evicted before it is opened, so check the lengths of
+        the slices taken.
+
+        Args:
+          node_url (str): URL of the node
+        Returns:
+          mmap.mmap: Read-only map of the file, to slice and then close.
+            For an empty or uncached node, an empty string.
+        """
+        data_path = self._paths(self._key(node_url))[0]
+        try:
+            f = open(data_path, 'rb')
+        except IOError:
+            return _Empty()
+        try:
+            if os.fstat(f.fileno()).st_size == 0:
+                return _Empty()
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        finally:
+            f.close()  # the map stays valid
+
+
+class _Empty(str):
+    """Stands in for the map of an empty file."""
+    def close(self):
+        pass
+
+
+_caches = dict()
+_caches_lock = threading.Lock()
+
+def get_cache(services):
+    """Get the Shock cache configured for some services.
+
+    Args:
+      services (dict): Service configuration. The cache directory is
+        taken from the `CACHE_SERVICE_KEY` entry, or the environment
+        variable `KB_SHOCK_CACHE`.
+    Returns:
+      ShockCache: The cache, shared by all callers with the same
+        directory, or None if no directory is configured.
+    """
+    path = services.get(CACHE_SERVICE_KEY, None) or \
+        os.environ.get(CACHE_ENV, None)
+    if not path:
+        return None
+    path = os.path.abspath(path)
+    with _caches_lock:
+        if path not in _caches:
+            max_bytes = int(os.environ.get(CACHE_MAX_BYTES_ENV,
+                                           DEFAULT_MAX_BYTES))
+            _caches[path] = ShockCache(path, max_bytes)
+        return _caches[path]
@@ -267,6 +267,17 @@ class TaxonAPI(ObjectAPI, TaxonInterface):
         else:
             self.proxy = _KBaseGenomes_Genome(services, token, ref)
 
+    @classmethod
+    def from_refs(cls, services=None, token=None, refs=None, data_types=None):
+        """Create one TaxonAPI for each of many references, with
+        the data of all Taxon objects fetched in one call.
+        See :meth:`ObjectAPI.from_refs`.
+        """
+        if data_types is None:
+            data_types = _TAXON_TYPES
+        return super(TaxonAPI, cls).from_refs(services, token, refs,
+                                              data_types)
+
     def get_parent(self, ref_only=False):
         return self.proxy.get_parent(ref_only)
 
@@ -300,24 +311,19 @@ class TaxonAPI(ObjectAPI, TaxonInterface):
 
 class TaxonClientAPI(TaxonInterface):
     def __init__(self, host='localhost', port=9090, token=None, ref=None):
-        from doekbase.data_api.taxonomy.taxon.service.interface import TaxonClientConnection
+        from doekbase.data_api.taxonomy.taxon.service.interface import TaxonClientPool
 
         self.host = host
         self.port = port
-        self.transport, self.client = TaxonClientConnection(host, port).get_client()
+        self._pool = TaxonClientPool.get(host, port)
         self.ref = ref
         self._token = token
 
-    def get_parent(self, ref_only=False):
-        if not self.transport.isOpen():
-            self.transport.open()
+    def _call(self, method):
+        return self._pool.call(method, self._token, self.ref)
 
-        try:
-            parent_ref = self.client.get_parent(self._token, self.ref)
-        except Exception, e:
-            raise
-        finally:
-            self.transport.close()
+    def get_parent(self, ref_only=False):
+        parent_ref = self._call('get_parent')
 
         if ref_only:
             return parent_ref
@@ -328,15 +334,7 @@ class TaxonClientAPI(TaxonInterface):
                 return None
 
     def get_children(self, ref_only=False):
-        if not self.transport.isOpen():
-            self.transport.open()
-
-        try:
-            children_refs = self.client.get_children(self._token, self.ref)
-        except Exception, e:
-            raise
-        finally:
-            self.transport.close()
+        children_refs = self._call('get_children')
 
         if ref_only:
             return children_refs
@@ -347,90 +345,25 @@ class TaxonClientAPI(TaxonInterface):
             return children
 
     def get_genome_annotations(self, ref_only=False):
-        if not self.transport.isOpen():
-            self.transport.open()
-
-        try:
-            annotation_refs = self.client.get_genome_annotations(self._token, self.ref)
-            return annotation_refs
-        except Exception, e:
-            raise
-        finally:
-            self.transport.close()
+        return self._call('get_genome_annotations')
 
     def get_scientific_lineage(self):
-        if not self.transport.isOpen():
-            self.transport.open()
-
-        try:
-            return self.client.get_scientific_lineage(self._token, self.ref)
-        except Exception, e:
-            raise
-        finally:
-            self.transport.close()
+        return self._call('get_scientific_lineage')
 
     def get_scientific_name(self):
-        if not self.transport.isOpen():
-            self.transport.open()
-
-        try:
-            return self.client.get_scientific_name(self._token, self.ref)
-        except Exception, e:
-            raise
-        finally:
-            self.transport.close()
+        return self._call('get_scientific_name')
 
     def get_taxonomic_id(self):
-        if not self.transport.isOpen():
-            self.transport.open()
-
-        try:
-            return self.client.get_taxonomic_id(self._token, self.ref)
-        except Exception, e:
-            raise
-        finally:
-            self.transport.close()
+        return self._call('get_taxonomic_id')
 
     def get_kingdom(self):
-        if not self.transport.isOpen():
-            self.transport.open()
-
-        try:
-            return self.client.get_kingdom(self._token, self.ref)
-        except Exception, e:
-            raise
-        finally:
-            self.transport.close()
+        return self._call('get_kingdom')
 
     def get_domain(self):
-        if not self.transport.isOpen():
-            self.transport.open()
-
-        try:
-            return self.client.get_domain(self._token, self.ref)
-        except Exception, e:
-            raise
-        finally:
-            self.transport.close()
+        return self._call('get_domain')
 
     def get_aliases(self):
-        if not self.transport.isOpen():
-            self.transport.open()
-
-        try:
-            return self.client.get_aliases(self._token, self.ref)
-        except Exception, e:
-            raise
-        finally:
-            self.transport.close()
+        return self._call('get_aliases')
 
     def get_genetic_code(self):
-        if not self.transport.isOpen():
-            self.transport.open()
-
-        try:
-            return self.client.get_genetic_code(self._token, self.ref)
-        except Exception, e:
-            raise
-        finally:
-            self.transport.close()
+        return self._call('get_genetic_code')
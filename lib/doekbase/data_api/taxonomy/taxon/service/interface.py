@@ -1,4 +1,8 @@
 # Stdlib
+import select
+import socket
+import threading
+import time
 import traceback
 
 # Third-party
@@ -22,13 +26,14 @@ class TaxonClientConnection(object):
 
         try:
             # Make socket
-            socket = TSocket.TSocket(host, port)
+            tsocket = TSocket.TSocket(host, port)
             # Buffering is critical. Raw sockets are very slow
-            self.transport = TTransport.TBufferedTransport(socket)
+            self.transport = TTransport.TBufferedTransport(tsocket)
             # Wrap in a protocol
             protocol = TBinaryProtocol.TBinaryProtocol(self.transport)
             # Create a client to use the protocol encoder
             self.client = thrift_service.Client(protocol)
+            self.socket = tsocket
         except Thrift.TException as err:
             print('{}'.format(err.message))
             raise RuntimeError('Cannot connect to remote Thrift service at {}:{:d}'
@@ -37,6 +42,137 @@ class TaxonClientConnection(object):
     def get_client(self):
         return self.transport, self.client
 
+    def is_healthy(self):
+        """Check, without a round trip, that an idle connection is still
+        usable: it is open and the server has not closed it (an idle
+        socket should have nothing to read).
+        """
+        if not self.transport.isOpen() or self.socket.handle is None:
+            return False
+        try:
+            readable = select.select([self.socket.handle], [], [], 0)[0]
+        except (select.error, socket.error, ValueError):
+            return False
+        return not readable
+
+
+class TaxonClientPool(object):
+    """
+    Pool of open connections to one Taxon API service, shared by all
+    the TaxonClientAPI instances for the same host and port.
+
+    Use :meth:`get` to get the pool for a host and port.
+    """
+    _pools = dict()
+    _pools_lock = threading.Lock()
+
+    def __init__(self, host, port, max_idle=8, idle_timeout=60):
+        """
+        Args:
+          host (str): Service host
+          port (int): Service port
+          max_idle (int): Most idle connections to keep open
+          idle_timeout (float): Seconds after which an idle connection is
+            closed instead of reused
+        """
+        self.host, self.port = host, port
+        self.max_idle, self.idle_timeout = max_idle, idle_timeout
+        self.connects = 0
+        self._idle = []  # (connection, time it was returned)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get(cls, host, port):
+        """Get the shared pool for `host` and `port`, creating it
+        the first time.
+        """
+        key = (host, port)
+        with cls._pools_lock:
+            if key not in cls._pools:
+                cls._pools[key] = cls(host, port)
+            return cls._pools[key]
+
+    def call(self, method, *args):
+        """Call `method` of the Thrift client with `args` on a pooled
+        connection.
+
+        If a reused connection fails at the transport level, the idle
+        connections are dropped and the call is retried once on a new
+        connection. All Taxon API methods are read-only, so this is safe.
+        The connection is returned to the pool only after a result or a
+        ServiceException reply; after any other error it is closed.
+        """
+        for attempt in (0, 1):
+            conn, reused = self._checkout()
+            try:
+                result = getattr(conn.client, method)(*args)
+            except (TTransport.TTransportException, socket.error):
+                conn.transport.close()
+                if reused and attempt == 0:
+                    self.close()
+                    continue
+                raise
+            except ttypes.ServiceException:
+                # a complete error reply leaves the connection usable
+                self._checkin(conn)
+                raise
+            except Exception:
+                # e.g. a protocol error partway through a reply, after
+                # which the stream cannot be trusted
+                conn.transport.close()
+                raise
+            self._checkin(conn)
+            return result
+
+    def close(self):
+        """Close all idle connections.
+        """
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            conn.transport.close()
+
+    def _checkout(self):
+        now = time.time()
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                conn, returned = self._idle.pop()
+            if now - returned < self.idle_timeout and conn.is_healthy():
+                return conn, True
+            conn.transport.close()
+        conn = self._connect()
+        with self._lock:
+            self.connects += 1
+        return conn, False
+
+    def _connect(self):
+        """Open a new connection to the service."""
+        conn = TaxonClientConnection(self.host, self.port)
+        conn.transport.open()
+        return conn
+
+    def _checkin(self, conn):
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append((conn, time.time()))
+                return
+        conn.transport.close()
+
+
+# Fields that `TaxonService.get_taxa` can return, and how to get each
+_TAXA_FIELDS = {
+    'parent': lambda t: t.get_parent(ref_only=True),
+    'scientific_name': lambda t: t.get_scientific_name(),
+    'scientific_lineage': lambda t: t.get_scientific_lineage(),
+    'taxonomic_id': lambda t: t.get_taxonomic_id(),
+    'kingdom': lambda t: t.get_kingdom(),
+    'domain': lambda t: t.get_domain(),
+    'genetic_code': lambda t: t.get_genetic_code(),
+    'aliases': lambda t: t.get_aliases(),
+}
+
 
 class TaxonService(thrift_service.Iface):
     def __init__(self, services=None):
@@ -118,3 +254,20 @@ class TaxonService(thrift_service.Iface):
         except Exception, e:
             raise ttypes.ServiceException(e.message, traceback.print_exc(), "get_genetic_code", {"ref": str(ref)})
 
+    def get_taxa(self, token=None, refs=None, fields=None):
+        try:
+            if not fields:
+                fields = sorted(_TAXA_FIELDS.keys())
+            for field in fields:
+                if field not in _TAXA_FIELDS:
+                    raise ValueError("Unknown field: {0}".format(field))
+            taxa = TaxonAPI.from_refs(self.services, token, refs)
+            result = list()
+            for ref, taxon_api in zip(refs, taxa):
+                info = ttypes.TaxonInfo(ref=ref)
+                for field in fields:
+                    setattr(info, field, _TAXA_FIELDS[field](taxon_api))
+                result.append(info)
+            return result
+        except Exception, e:
+            raise ttypes.ServiceException(e.message, traceback.print_exc(), "get_taxa", {"refs": str(refs)})
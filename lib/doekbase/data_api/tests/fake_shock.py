@@ -0,0 +1,63 @@
+"""
+Minimal local Shock server for tests: serves node contents,
+whole (`?download_raw`) or in ranges (`?download&seek=N&length=M`).
+"""
+
+# Stdlib
+import BaseHTTPServer
+import SocketServer
+import threading
+import urlparse
+
+
+class _Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        parts = urlparse.urlparse(self.path)
+        node = parts.path.rstrip('/').split('/')[-1]
+        query = urlparse.parse_qs(parts.query, keep_blank_values=True)
+        data = self.server.nodes.get(node, None)
+        if data is None:
+            self.send_error(404)
+            return
+        if 'seek' in query:
+            start, length = int(query['seek'][0]), int(query['length'][0])
+        else:
+            start, length = 0, len(data)
+        self.server.requests.append((node, start, length))
+        body = data[start:start + length]
+        self.send_response(200)
+        self.send_header('content-length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeShock(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """Serve `nodes`, a dict of node id to contents, on a free port.
+    Every request is recorded as (node, start, length) in `requests`.
+    """
+    daemon_threads = True
+
+    def __init__(self, nodes):
+        BaseHTTPServer.HTTPServer.__init__(self, ('127.0.0.1', 0), _Handler)
+        self.nodes = nodes
+        self.requests = []
+
+    @property
+    def url(self):
+        """Base URL, like `shock_service_url` in the services dict."""
+        return 'http://127.0.0.1:{:d}/'.format(self.server_port)
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever)
+        thread.daemon = True
+        thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,58 @@
+"""
+Compare the speed of the JSON codecs on a synthetic genome.
+
+Usage: python bench_codec.py [number-of-features]
+"""
+import random
+import sys
+
+from doekbase.workspace import codec
+from doekbase.data_api.tests.performance import WallClockTimer
+
+MB = 2**20 * 1.0
+
+def make_genome(num_features, seed=1):
+    """Make a synthetic genome with `num_features` features, in the
+    shape of a KBaseGenomes.Genome object.
+    """
+    rnd = random.Random(seed)
+    features = []
+    for i in xrange(num_features):
+        start = rnd.randint(1, 5000000)
+        length = rnd.randint(90, 3000)
+        features.append({
+            'id': 'kb|g.1.peg.{:d}'.format(i),
+            'type': 'CDS',
+            'function': 'hypothetical protein {:d}'.format(rnd.randint(1, 1000)),
+            'location': [['kb|g.1.c.0', start, rnd.choice('+-'), length]],
+            'aliases': ['gene{:d}'.format(i), 'locus_{:d}'.format(i)],
+            'md5': '{:032x}'.format(rnd.getrandbits(128)),
+            'protein_translation_length': length // 3,
+            'protein_translation': ''.join(rnd.choice('ACDEFGHIKLMNPQRSTVWY')
+                                           for _ in xrange(length // 30)),
+            'quality': {'weighted_hit_count': rnd.random(),
+                        'hit_count': rnd.random()},
+            'subsystems': set(['ss{:d}'.format(rnd.randint(1, 50))]),
+        })
+    return {'id': 'kb|g.1', 'scientific_name': 'Synthetic organism',
+            'domain': 'Bacteria', 'genetic_code': 11,
+            'num_contigs': 1, 'contig_ids': ['kb|g.1.c.0'],
+            'features': features}
+
+def run(num_features=100000):
+    genome = make_genome(num_features)
+    print "{:<12s} {:>8s} {:>10s} {:>10s}".format(
+        'codec', 'MB', 'dumps(s)', 'loads(s)')
+    for name in codec.available():
+        c = codec.get_codec(name)
+        with WallClockTimer() as enc:
+            s = c.dumps(genome)
+        with WallClockTimer() as dec:
+            c.loads(s)
+        print "{:<12s} {:8.1f} {:10.3f} {:10.3f}".format(
+            name, len(s) / MB, enc.elapsed.total_seconds(),
+            dec.elapsed.total_seconds())
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(run(*[int(a) for a in sys.argv[1:]]))
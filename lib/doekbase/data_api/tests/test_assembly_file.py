@@ -0,0 +1,238 @@
+"""
+Unit tests for the Assembly API, using a file-based workspace.
+"""
+
+# Imports
+
+# stdlib
+import hashlib
+import os
+import shutil
+import tempfile
+# third-party
+import msgpack
+# local
+from doekbase.data_api.sequence import shock
+from doekbase.data_api.sequence.assembly import AssemblyAPI
+from doekbase.data_api.sequence.packed import PackedSequence
+from doekbase.data_api.tests.fake_shock import FakeShock
+
+CONTIGSET_TYPE = 'KBaseGenomes.ContigSet-3.0'
+ASSEMBLY_TYPE = 'KBaseGenomesCondensedPrototypeV2.Assembly-1.0'
+
+CONTIGS = [
+    {'id': 'c1', 'sequence': 'ACGTacgtNNGG'},
+    {'id': 'c2', 'sequence': 'AAAATTTT'},
+    {'id': 'c3', 'sequence': 'gcgcgcAT'},
+]
+
+def contigset_datum():
+    contigs = []
+    for c in CONTIGS:
+        contig = dict(c)
+        contig['length'] = len(c['sequence'])
+        contig['md5'] = hashlib.md5(c['sequence'].upper()).hexdigest()
+        contigs.append(contig)
+    return {'id': 'kb|contigset.1', 'source': 'test', 'source_id': '1',
+            'contigs': contigs}
+
+def assembly_datum():
+    """Assembly of CONTIGS, and its FASTA file with 5-base lines.
+    """
+    contigs, fasta = {}, ''
+    for c in CONTIGS:
+        fasta += '>{}\n'.format(c['id'])
+        seq = c['sequence']
+        lines = '\n'.join([seq[i:i + 5] for i in xrange(0, len(seq), 5)])
+        contigs[c['id']] = {'contig_id': c['id'], 'length': len(seq),
+                            'start_position': len(fasta),
+                            'num_bytes': len(lines)}
+        fasta += lines + '\n'
+    datum = {'assembly_id': 'assembly.1', 'num_contigs': len(contigs),
+             'contigs': contigs, 'fasta_handle_ref': 'fasta1'}
+    return datum, fasta
+
+def gc_count(seq):
+    return len([b for b in seq if b in 'GCgc'])
+
+_tempdir = None
+_services = None
+_shock = None
+
+def write_object(ref, typestring, name, data):
+    datum = {'ref': ref, 'type': typestring, 'name': name,
+             'data': data, 'links': [], 'metadata': {}}
+    filename = ref.replace('/', '_') + '.msgpack'
+    with open(os.path.join(_tempdir, filename), 'wb') as ofile:
+        msgpack.dump(datum, ofile)
+
+def setup():
+    global _tempdir, _services, _shock
+    _tempdir = tempfile.mkdtemp()
+    write_object('30/1', CONTIGSET_TYPE, 'contigset1', contigset_datum())
+    assembly, fasta = assembly_datum()
+    write_object('30/2', ASSEMBLY_TYPE, 'assembly1', assembly)
+    # the same FASTA file, with the wrong number of bytes for c1
+    assembly['fasta_handle_ref'] = 'fasta2'
+    assembly['contigs']['c1']['num_bytes'] = 3
+    write_object('30/3', ASSEMBLY_TYPE, 'assembly2', assembly)
+    _shock = FakeShock({'fasta1': fasta, 'fasta2': fasta}).start()
+    _services = {'workspace_service_url': _tempdir,
+                 'shock_service_url': _shock.url}
+
+def teardown():
+    shock._get_session().close()
+    _shock.stop()
+    shutil.rmtree(_tempdir)
+
+def test_stats():
+    api = AssemblyAPI(_services, None, '30/1')
+    total_len = sum([len(c['sequence']) for c in CONTIGS])
+    total_gc = sum([gc_count(c['sequence']) for c in CONTIGS])
+    stats = api.get_stats()
+    assert stats['num_contigs'] == len(CONTIGS)
+    assert stats['dna_size'] == total_len
+    assert abs(stats['gc_content'] - total_gc / (total_len * 1.0)) < 1e-9
+    assert api.get_gc_content() == stats['gc_content']
+
+def test_contig_gc_content():
+    api = AssemblyAPI(_services, None, '30/1')
+    gc = api.get_contig_gc_content()
+    assert sorted(gc.keys()) == ['c1', 'c2', 'c3']
+    for c in CONTIGS:
+        expected = gc_count(c['sequence']) / (len(c['sequence']) * 1.0)
+        assert abs(gc[c['id']] - expected) < 1e-9
+    assert api.get_contig_gc_content(['c2']).keys() == ['c2']
+    assert api.get_contig_lengths(['c1', 'c3']) == {'c1': 12, 'c3': 8}
+
+def test_contigs():
+    api = AssemblyAPI(_services, None, '30/1')
+    contigs = api.get_contigs(['c3'])
+    assert contigs.keys() == ['c3']
+    assert contigs['c3']['sequence'] == 'gcgcgcAT'
+    assert abs(contigs['c3']['gc_content'] - 0.75) < 1e-9
+
+def test_iter_contigs():
+    for ref in '30/1', '30/2':
+        api = AssemblyAPI(_services, None, ref)
+        contigs = list(api.iter_contigs())
+        assert [c['contig_id'] for c in contigs] == ['c1', 'c2', 'c3']
+        for c, expected in zip(contigs, CONTIGS):
+            assert c['sequence'] == expected['sequence']
+            assert c['length'] == len(expected['sequence'])
+        contigs = list(api.iter_contigs(['c3', 'c1']))
+        assert [c['contig_id'] for c in contigs] == ['c1', 'c3']
+
+def test_assembly_contigs():
+    api = AssemblyAPI(_services, None, '30/2')
+    # many contigs: one streamed download of the whole file
+    del _shock.requests[:]
+    contigs = api.get_contigs()
+    assert len(_shock.requests) == 1
+    for c in CONTIGS:
+        assert contigs[c['id']]['sequence'] == c['sequence']
+    # few contigs: ranges of the file
+    del _shock.requests[:]
+    contigs = api.get_contigs(['c2'])
+    assert contigs.keys() == ['c2']
+    assert contigs['c2']['sequence'] == 'AAAATTTT'
+    assert _shock.requests[0][1:] == (
+        api.get_data()['contigs']['c2']['start_position'], 9)
+
+def test_assembly_cache():
+    services = dict(_services)
+    services['shock_cache_dir'] = os.path.join(_tempdir, 'shock')
+    api = AssemblyAPI(services, None, '30/2')
+    assert api.get_contigs(['c2'])['c2']['sequence'] == 'AAAATTTT'
+    for c in CONTIGS:
+        assert api.get_contigs()[c['id']]['sequence'] == c['sequence']
+    del _shock.requests[:]
+    contigs = list(api.iter_contigs(['c1']))
+    assert contigs[0]['sequence'] == CONTIGS[0]['sequence']
+    assert _shock.requests == []
+
+def test_repeated_contig_ids():
+    cached = dict(_services)
+    cached['shock_cache_dir'] = os.path.join(_tempdir, 'shock-repeated')
+    # streamed, or whole file cached; then ranges, or ranges cached
+    for services in _services, cached:
+        api = AssemblyAPI(services, None, '30/2')
+        contigs = api.get_contigs(['c1', 'c1', 'c2'])
+        assert sorted(contigs) == ['c1', 'c2']
+        assert contigs['c1']['sequence'] == CONTIGS[0]['sequence']
+        contigs = list(api.iter_contigs(['c2', 'c2']))
+        assert [c['contig_id'] for c in contigs] == ['c2']
+        assert contigs[0]['sequence'] == 'AAAATTTT'
+
+def test_regions():
+    for ref in '30/1', '30/2':
+        api = AssemblyAPI(_services, None, ref)
+        assert api.get_contig_region('c1', 1, 12) == 'ACGTacgtNNGG'
+        # spans line breaks in the FASTA file
+        assert api.get_contig_region('c1', 4, 11) == 'TacgtNNG'
+        assert api.get_contig_region('c1', 4, 11, '-') == 'CNNacgtA'
+        regions = [{'contig_id': 'c3', 'start': 6, 'stop': 6, 'strand': '+'},
+                   {'contig_id': 'c2', 'start': 3, 'stop': 6, 'strand': '-'},
+                   {'contig_id': 'c3', 'start': 5, 'stop': 8, 'strand': '?'}]
+        assert api.get_regions(regions) == ['c', 'AATT', 'gcAT']
+        for start, stop in (0, 3), (5, 4), (3, 13):
+            try:
+                api.get_contig_region('c1', start, stop)
+                assert False, 'expected ValueError for {}..{}'.format(
+                    start, stop)
+            except ValueError:
+                pass
+        try:
+            api.get_contig_region('c9', 1, 2)
+            assert False, 'expected ValueError for an unknown contig'
+        except ValueError as err:
+            assert 'c9' in str(err)
+
+def test_fasta_index():
+    services = dict(_services)
+    services['shock_cache_dir'] = os.path.join(_tempdir, 'shock')
+    api = AssemblyAPI(services, None, '30/2')
+    assert api.get_fasta_index() == ('c1\t12\t4\t5\t6\n'
+                                     'c2\t8\t23\t5\t6\n'
+                                     'c3\t8\t37\t5\t6\n')
+    assert [f for f in os.listdir(services['shock_cache_dir'])
+            if f.endswith('.fai')]
+    try:
+        AssemblyAPI(_services, None, '30/1').get_fasta_index()
+        assert False, 'expected TypeError'
+    except TypeError:
+        pass
+    try:
+        AssemblyAPI(_services, None, '30/3').get_fasta_index()
+        assert False, 'expected ValueError'
+    except ValueError as err:
+        assert 'c1' in str(err)
+
+def test_packed_contigs():
+    for ref in '30/1', '30/2':
+        api = AssemblyAPI(_services, None, ref)
+        for contigs in (api.get_contigs(packed=True),
+                        api.get_contigs(['c3'], packed=True)):
+            for c in CONTIGS:
+                if c['id'] not in contigs:
+                    continue
+                seq = contigs[c['id']]['sequence']
+                assert isinstance(seq, PackedSequence)
+                assert seq == c['sequence']
+                assert seq.gc_count() == gc_count(c['sequence'])
+        contig = next(api.iter_contigs(['c1'], packed=True))
+        assert contig['sequence'][4:8] == 'acgt'
+
+def test_metadata_without_sequences():
+    api = AssemblyAPI(_services, None, '30/1')
+    subset = api.ws_client.get_object_subset_data([{
+        'ref': '30/1', 'included': ['contigs/[*]/id', 'contigs/[*]/length']}])
+    assert subset[0]['contigs'] == [{'id': 'c1', 'length': 12},
+                                    {'id': 'c2', 'length': 8},
+                                    {'id': 'c3', 'length': 8}]
+    assert api.get_contig_ids() == ['c1', 'c2', 'c3']
+    assert api.get_number_contigs() == 3
+    assert api.get_dna_size() == 28
+    assert api.get_contig_lengths(['c2']) == {'c2': 8}
+    # the contig sequences were never loaded
+    assert api.proxy._data is None
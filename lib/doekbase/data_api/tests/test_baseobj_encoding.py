@@ -0,0 +1,59 @@
+"""
+Unit tests for binary encoding of object data in the object service.
+"""
+
+# Imports
+
+# third-party
+from thrift.transport import TTransport
+from thrift.protocol import TBinaryProtocol
+# local
+from doekbase.data_api.baseobj import encoding, thrift_service
+from doekbase.data_api.baseobj.ttypes import DataEncoding, DataCompression, \
+    EncodedData
+from doekbase.workspace.codec import get_codec
+
+DATUM = {u'id': u'kb|g.1', u'name': u'contig\u00e9', u'length': 1234,
+         u'gc': 0.5, u'features': [{u'id': u'f1', u'loc': [1, 10]}],
+         u'flags': {u'circular': False, u'empty': None}}
+
+_codec = get_codec('json')
+
+def test_roundtrip():
+    for enc in encoding.supported_encodings():
+        for comp in encoding.supported_compressions():
+            encoded = encoding.encode_data(DATUM, [enc], [comp], _codec)
+            assert encoded.encoding == enc
+            assert encoded.compression == comp
+            assert encoding.decode_data(encoded, _codec) == DATUM
+
+def test_negotiate():
+    # unknown choices fall back to JSON, uncompressed
+    encoded = encoding.encode_data(DATUM, [99], [99], _codec)
+    assert encoded.encoding == DataEncoding.JSON
+    assert encoded.compression == DataCompression.NONE
+    encoded = encoding.encode_data(DATUM, None, None, _codec)
+    assert encoded.encoding == DataEncoding.JSON
+    # first supported one wins
+    encoded = encoding.encode_data(
+        DATUM, [99, DataEncoding.MSGPACK, DataEncoding.JSON],
+        [DataCompression.ZLIB], _codec)
+    assert encoded.encoding == DataEncoding.MSGPACK
+    assert encoded.compression == DataCompression.ZLIB
+
+def test_sets():
+    for enc in encoding.supported_encodings():
+        encoded = encoding.encode_data({'a': set([1])}, [enc], [], _codec)
+        assert encoding.decode_data(encoded, _codec) == {'a': [1]}
+
+def test_thrift():
+    encoded = encoding.encode_data(DATUM, [DataEncoding.MSGPACK],
+                                   [DataCompression.ZLIB], _codec)
+    result = thrift_service.get_encoded_data_result(success=encoded)
+    buf = TTransport.TMemoryBuffer()
+    result.write(TBinaryProtocol.TBinaryProtocol(buf))
+    buf = TTransport.TMemoryBuffer(buf.getvalue())
+    result2 = thrift_service.get_encoded_data_result()
+    result2.read(TBinaryProtocol.TBinaryProtocol(buf))
+    assert result2.success == encoded
+    assert encoding.decode_data(result2.success, _codec) == DATUM
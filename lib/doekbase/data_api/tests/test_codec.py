@@ -0,0 +1,63 @@
+"""
+Unit tests for the JSON codec registry.
+"""
+
+# Imports
+
+# stdlib
+import os
+import random
+# local
+from doekbase.workspace import codec
+
+DATUM = {'name': u'contig\u00e9', 'length': 1234, 'gc': 0.5,
+         'ids': [1, 2, 3], 'nested': {'flag': True, 'none': None}}
+
+def test_available():
+    names = codec.available()
+    assert 'json' in names
+    assert names[-1] == 'json'
+
+def test_roundtrip():
+    for name in codec.available():
+        c = codec.get_codec(name)
+        s = c.dumps(DATUM)
+        assert isinstance(s, str), name
+        assert c.loads(s) == DATUM, name
+
+def test_sets():
+    for name in codec.available():
+        c = codec.get_codec(name)
+        value = c.loads(c.dumps({'a': set([1, 2]), 'b': frozenset([3])}))
+        assert sorted(value['a']) == [1, 2], name
+        assert value['b'] == [3], name
+
+def test_env():
+    os.environ[codec.CODEC_ENV] = 'json'
+    try:
+        assert codec.get_codec().name == 'json'
+    finally:
+        del os.environ[codec.CODEC_ENV]
+    auto = [n for n in codec.available() if n not in codec.OPT_IN]
+    assert codec.get_codec().name == auto[0]
+
+def test_numbers():
+    rnd = random.Random(1)
+    floats = [rnd.uniform(-1e6, 1e6) for _ in xrange(1000)] + \
+             [rnd.random() * 10 ** rnd.randint(-300, 300) for _ in xrange(1000)]
+    ints = [2**63 - 1, -2**63, 2**64, 2**70, -2**70]
+    std = codec.get_codec('json')
+    for name in codec.available():
+        c = codec.get_codec(name)
+        assert c.loads(c.dumps(floats)) == floats, name
+        assert c.loads(std.dumps(floats)) == floats, name
+        assert c.loads(c.dumps(ints)) == ints, name
+        assert c.loads(std.dumps(ints)) == ints, name
+
+def test_unknown():
+    try:
+        codec.get_codec('no-such-codec')
+    except ValueError:
+        pass
+    else:
+        assert False, 'Expected ValueError for unknown codec'
@@ -0,0 +1,192 @@
+"""
+Unit tests for core, using a file-based workspace.
+"""
+
+# Imports
+
+# stdlib
+import os
+import shutil
+import tempfile
+# third-party
+import msgpack
+# local
+from doekbase.data_api import wsfile
+from doekbase.data_api.core import ObjectAPI, MD5TypeCache, md5_type_cache
+from doekbase.data_api.taxonomy.taxon.api import TaxonAPI
+
+TAXON_TYPE = 'KBaseGenomesCondensedPrototypeV2.Taxon-1.0'
+
+def taxon_datum(n):
+    return {'scientific_name': 'Taxon {:d}'.format(n),
+            'scientific_lineage': 'Top;Middle;Taxon {:d}'.format(n),
+            'taxonomy_id': n,
+            'domain': 'Bacteria',
+            'genetic_code': 11}
+
+TEST_DATA = [
+    {'ref': '20/{:d}'.format(n), 'type': TAXON_TYPE,
+     'name': 'taxon{:d}'.format(n), 'data': taxon_datum(n),
+     'links': [] if n == 1 else ['20/1'], 'metadata': {}}
+    for n in range(1, 4)
+]
+
+_tempdir = None
+_services = None
+
+class CallCounter(object):
+    """Count calls to a WorkspaceFile method."""
+    def __init__(self, name):
+        self.name, self.count = name, 0
+
+    def __enter__(self):
+        self._orig = getattr(wsfile.WorkspaceFile, self.name)
+        orig = self._orig
+        def counted(client, *args):
+            self.count += 1
+            return orig(client, *args)
+        setattr(wsfile.WorkspaceFile, self.name, counted)
+        return self
+
+    def __exit__(self, *args):
+        setattr(wsfile.WorkspaceFile, self.name, self._orig)
+
+def setup():
+    global _tempdir, _services
+    _tempdir = tempfile.mkdtemp()
+    for datum in TEST_DATA:
+        filename = datum['ref'].replace('/', '_')
+        path = os.path.join(_tempdir, filename) + '.msgpack'
+        with open(path, 'wb') as ofile:
+            msgpack.dump(datum, ofile)
+    _services = {'workspace_service_url': _tempdir}
+
+def teardown():
+    shutil.rmtree(_tempdir)
+
+def test_from_refs():
+    md5_type_cache.clear()
+    refs = [d['ref'] for d in TEST_DATA]
+    with CallCounter('get_object_info_new') as info_calls:
+        with CallCounter('translate_to_MD5_types') as type_calls:
+            objects = ObjectAPI.from_refs(_services, None, refs)
+    assert len(objects) == len(refs)
+    assert info_calls.count == 1
+    assert type_calls.count == 1
+    for obj, datum in zip(objects, TEST_DATA):
+        assert obj.ref == datum['ref']
+        assert obj.get_info()['type_string'] == TAXON_TYPE
+        assert obj.get_typestring() == wsfile.MD5_TYPES[TAXON_TYPE]
+
+def test_from_refs_typed():
+    refs = [d['ref'] for d in TEST_DATA]
+    with CallCounter('get_object_info_new') as info_calls:
+        taxa = TaxonAPI.from_refs(_services, None, refs)
+    assert info_calls.count == 1
+    names = [t.get_scientific_name() for t in taxa]
+    assert names == [d['data']['scientific_name'] for d in TEST_DATA]
+
+def test_from_refs_empty():
+    assert ObjectAPI.from_refs(_services, None, []) == []
+
+def test_from_refs_bad_ref():
+    try:
+        ObjectAPI.from_refs(_services, None, ['20/1', None])
+    except TypeError:
+        pass
+    else:
+        assert False, 'Expected TypeError for missing reference'
+
+def test_md5_type_cache():
+    md5_type_cache.clear()
+    with CallCounter('translate_to_MD5_types') as type_calls:
+        ObjectAPI(_services, None, '20/1')
+        ObjectAPI(_services, None, '20/2')
+        ObjectAPI.from_refs(_services, None, ['20/2', '20/3'])
+    assert type_calls.count == 1
+
+def test_md5_type_cache_file():
+    path = os.path.join(_tempdir, 'md5types.json')
+    cache = MD5TypeCache(path)
+    client = wsfile.WorkspaceFile(_tempdir)
+    result = cache.translate('a', client, [TAXON_TYPE])
+    assert result[TAXON_TYPE] == wsfile.MD5_TYPES[TAXON_TYPE]
+    assert os.path.exists(path)
+    # a new cache should not need the workspace
+    cache2 = MD5TypeCache(path)
+    result2 = cache2.translate('a', None, [TAXON_TYPE])
+    assert result2 == result
+
+def test_get_referrers():
+    md5_type_cache.clear()
+    obj = ObjectAPI(_services, None, '20/1')
+    with CallCounter('translate_to_MD5_types') as type_calls:
+        referrers = obj.get_referrers()
+    assert type_calls.count == 0  # already known from the constructor
+    assert len(referrers) == 1
+    refs = referrers[wsfile.MD5_TYPES[TAXON_TYPE]]
+    assert len(refs) == 2
+
+def test_batch():
+    client = wsfile.WorkspaceFile(_tempdir)
+    with CallCounter('get_objects') as calls:
+        with client.batch() as batch:
+            results = [batch.get_objects([{'ref': d['ref']}])
+                       for d in TEST_DATA]
+            info = batch.get_object_info_new({'objects': [{'ref': '20/1'}]})
+    assert calls.count == 1
+    for result, datum in zip(results, TEST_DATA):
+        assert result.done()
+        value = result.result()
+        assert len(value) == 1
+        assert value[0]['data'] == datum['data']
+    assert info.result()[0][2] == TAXON_TYPE
+
+def test_batch_options():
+    client = wsfile.WorkspaceFile(_tempdir)
+    options = {'includeMetadata': 1, 'extra': ['a', {'b': 1}]}
+    with CallCounter('get_object_info_new') as calls:
+        with client.batch() as batch:
+            infos = [batch.get_object_info_new(
+                dict(options, objects=[{'ref': d['ref']}]))
+                     for d in TEST_DATA]
+    # list and dict option values are merged on their JSON encoding
+    assert calls.count == 1
+    assert [i.result()[0][2] for i in infos] == [TAXON_TYPE] * len(TEST_DATA)
+    with CallCounter('get_object_info_new') as calls:
+        with client.batch() as batch:
+            missing = batch.get_object_info_new({'includeMetadata': 1})
+            odd = [batch.get_object_info_new({'objects': [{'ref': '20/1'}],
+                                              'extra': object()})
+                   for _ in range(2)]
+            info = batch.get_object_info_new({'objects': [{'ref': '20/1'}],
+                                              'includeMetadata': 1})
+    # calls that cannot be keyed are sent on their own
+    assert calls.count == 4
+    try:
+        missing.result()
+        assert False, 'expected KeyError'
+    except KeyError:
+        pass
+    assert [o.result()[0][2] for o in odd] == [TAXON_TYPE] * 2
+    assert info.result()[0][2] == TAXON_TYPE
+
+def test_from_refs_data():
+    refs = [d['ref'] for d in TEST_DATA]
+    with CallCounter('get_objects') as data_calls:
+        taxa = TaxonAPI.from_refs(_services, None, refs)
+        names = [t.get_scientific_name() for t in taxa]
+        parents = [t.get_parent(ref_only=True) for t in taxa]
+    assert data_calls.count == 1
+    assert names == [d['data']['scientific_name'] for d in TEST_DATA]
+    assert parents == [None, None, None]
+
+def test_id_index():
+    obj = ObjectAPI(_services, None, '20/1')
+    obj._data = {'items': [{'id': 'a', 'v': 1}, {'id': 'b', 'v': 2},
+                           {'id': 'c', 'v': 3}]}
+    assert obj._get_id_index('items') == {'a': 0, 'b': 1, 'c': 2}
+    records = obj._get_records('items', ['c', 'x', 'a'])
+    assert [r['v'] for r in records] == [3, 1]
+    # built once
+    assert obj._get_id_index('items') is obj._get_id_index('items')
@@ -0,0 +1,34 @@
+"""
+Unit tests for one-pass sequence checksums.
+"""
+
+# Imports
+
+# stdlib
+import hashlib
+# local
+from doekbase.data_api.sequence import digest
+
+SEQUENCES = ['ACGTacgtNNGG', 'AAAATTTT', 'gcgcgcAT' * 1000]
+
+def test_sequence_digest():
+    for seq in SEQUENCES:
+        for chunk_size in 1, 5, len(seq), digest.CHUNK_SIZE:
+            d = digest.digest_sequence(seq, chunk_size=chunk_size)
+            assert d.hexdigest() == hashlib.md5(seq.upper()).hexdigest()
+            assert d.length == len(seq)
+            assert d.gc_count == len([b for b in seq if b in 'GCgc'])
+    assert digest.digest_sequence(u'acgt').hexdigest() == \
+        hashlib.md5('ACGT').hexdigest()
+    assert digest.SequenceDigest().gc_content == 0.0
+
+def test_assembly_digest():
+    assembly = digest.AssemblyDigest()
+    md5s = []
+    for seq in SEQUENCES:
+        d = digest.digest_sequence(seq)
+        assembly.add_digest(d)
+        md5s.append(hashlib.md5(seq.upper()).hexdigest())
+    assert assembly.hexdigest() == \
+        hashlib.md5(','.join(sorted(md5s))).hexdigest()
+    assert assembly.length == sum([len(s) for s in SEQUENCES])
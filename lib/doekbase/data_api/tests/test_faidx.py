@@ -0,0 +1,43 @@
+"""
+Unit tests for FASTA line-offset indexes.
+"""
+
+# Imports
+
+# local
+from doekbase.data_api.sequence import faidx
+
+FASTA = '>a\nACGTA\nCGTAC\nGT\n>b desc\r\nAAAA\r\nCC\r\n>c\nTTT'
+
+def test_entry_from_head():
+    e = faidx.entry_from_head('a', 12, 3, 'ACGTA\n')
+    assert e == ('a', 12, 3, 5, 6)
+    e = faidx.entry_from_head('b', 6, 27, 'AAAA\r\nCC')
+    assert e == ('b', 6, 27, 4, 6)
+    e = faidx.entry_from_head('c', 3, 36, 'TTT')
+    assert e == ('c', 3, 36, 3, 4)
+    assert faidx.entry_from_head('c', 3, 36, 'TT') is None
+
+def test_byte_range():
+    index = [faidx.FastaIndexEntry('a', 12, 3, 5, 6),
+             faidx.FastaIndexEntry('b', 6, 27, 4, 6)]
+    for e in index:
+        seq = ''.join([c for c in FASTA[e.offset:] if c.isalpha()])[:e.length]
+        for start in range(e.length):
+            for stop in range(start + 1, e.length + 1):
+                offset, length = e.byte_range(start, stop)
+                block = FASTA[offset:offset + length]
+                assert block.replace('\r', '').replace('\n', '') == \
+                    seq[start:stop]
+
+def test_format_parse():
+    entries = [faidx.FastaIndexEntry('a', 12, 3, 5, 6),
+               faidx.FastaIndexEntry('b', 6, 27, 4, 6)]
+    text = faidx.format_index(entries)
+    assert text == 'a\t12\t3\t5\t6\nb\t6\t27\t4\t6\n'
+    assert faidx.parse_index(text).values() == entries
+    try:
+        faidx.parse_index('a\t12\n')
+        assert False, 'expected ValueError'
+    except ValueError:
+        pass
@@ -0,0 +1,93 @@
+"""
+Unit tests for Genome Annotation feature indexes.
+"""
+
+# Imports
+
+# stdlib
+import random
+# local
+from doekbase.data_api.annotation import feature_index
+
+def random_locations(n, seed=7):
+    rnd = random.Random(seed)
+    locations = []
+    for i in xrange(n):
+        fid = 'f{:d}'.format(i)
+        for _ in xrange(rnd.choice([1, 1, 2])):
+            locations.append((fid, rnd.choice(['c1', 'c2']),
+                              rnd.randint(0, 10000), rnd.choice('+-'),
+                              rnd.choice([10, 100, 1000, 5000])))
+    return locations
+
+def brute_force(locations, contig, strand, start, stop):
+    return set([f for f, c, s, st, n in locations
+                if c == contig and (strand == '?' or st == strand) and
+                s <= stop and start <= s + n])
+
+def test_overlapping():
+    locations = random_locations(500)
+    index = feature_index.IntervalIndex(locations)
+    rnd = random.Random(3)
+    for _ in xrange(300):
+        contig, strand = rnd.choice(['c1', 'c2', 'c3']), rnd.choice('+-?')
+        start = rnd.randint(-100, 11000)
+        stop = start + rnd.choice([0, 1, 50, 2000])
+        found = index.overlapping(contig, strand, start, stop)
+        assert len(found) == len(set(found))
+        assert set(found) == brute_force(locations, contig, strand,
+                                         start, stop)
+
+def test_feature_locations():
+    assert feature_index.feature_locations(
+        'a', {'location': [['c1', 5, '+', 10]]}) == [('a', 'c1', 5, '+', 10)]
+    assert feature_index.feature_locations(
+        'a', {'locations': [['c1', 5, '-', 10]]}) == [('a', 'c1', 5, '-', 10)]
+    assert feature_index.feature_locations('a', {}) == []
+
+def test_alias_lookup():
+    lookup = feature_index.alias_lookup([
+        ('a', ['x', 'y', 'x']), ('b', None), ('c', ['y'])])
+    assert lookup == {'x': ['a'], 'y': ['a', 'c']}
+
+def test_index_cache():
+    cache = feature_index._IndexCache(max_genomes=2)
+    builds = []
+    def build():
+        builds.append(1)
+        return len(builds)
+    assert cache.get(('ws', '1/1/1'), 'intervals', build) == 1
+    assert cache.get(('ws', '1/1/1'), 'intervals', build) == 1
+    cache.get(('ws', '1/2/1'), 'intervals', build)
+    cache.get(('ws', '1/3/1'), 'intervals', build)
+    # the first genome was dropped
+    assert cache.get(('ws', '1/1/1'), 'intervals', build) == 4
+
+def test_function_search():
+    index = feature_index.FunctionIndex([
+        ('a', 'Alanyl-tRNA synthetase'),
+        ('b', 'hypothetical protein'),
+        ('c', 'Protein kinase'),
+        ('d', None),
+        ('e', 'serine/threonine protein kinases')])
+    assert index.search('protein') == ['b', 'e']
+    assert index.search('protein kinase') == ['b', 'c', 'e']
+    assert index.search('protein kinase', match_all=True) == []
+    assert index.search('protein kinase', match_all=True,
+                        ignore_case=True) == ['c']
+    assert index.search('PROT kin', match_all=True, ignore_case=True,
+                        prefix=True) == ['c', 'e']
+    assert index.search('synth', prefix=True) == ['a']
+    assert index.search('') == []
+    assert index.search('nothing') == []
+
+def test_overlapping_long_location():
+    # a whole-contig feature must not make queries scan every location
+    locations = [('whole', 'c1', 0, '+', 10**6)] + \
+        [('f{:d}'.format(i), 'c1', i * 100, '+', 50) for i in xrange(10000)]
+    index = feature_index.IntervalIndex(locations)
+    assert index.overlapping('c1', '+', 500020, 500060) == ['whole', 'f5000']
+    starts, ends, max_length, ids = [t for t in index._tables[('c1', '+')]
+                                     if t[2] == 50][0]
+    assert feature_index.bisect.bisect_left(starts, 500020 - max_length) \
+        == 5000
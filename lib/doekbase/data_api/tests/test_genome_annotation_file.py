@@ -0,0 +1,239 @@
+"""
+Unit tests for the Genome Annotation API, using a file-based workspace.
+"""
+
+# Imports
+
+# stdlib
+import os
+import shutil
+import tempfile
+import threading
+# third-party
+import msgpack
+# local
+from doekbase.data_api.annotation.genome_annotation import GenomeAnnotationAPI
+
+GENOME_TYPE = 'KBaseGenomes.Genome-8.0'
+ANNOTATION_TYPE = 'KBaseGenomesCondensedPrototypeV2.GenomeAnnotation-3.1'
+CONTAINER_TYPE = 'KBaseGenomesCondensedPrototypeV2.FeatureContainer-6.0'
+CONTAINER_REFS = {'CDS': '40/3', 'rna': '40/4'}
+
+def feature(n, ftype='CDS', function=None, contig='c1'):
+    return {'id': 'kb|g.1.{}.{:d}'.format(ftype.lower(), n),
+            'type': ftype,
+            'function': function or 'hypothetical protein {:d}'.format(n),
+            'location': [[contig, n * 100, '+', 90]],
+            'aliases': ['alias{:d}'.format(n)],
+            'dna_sequence': 'ATG' * 30,
+            'dna_sequence_length': 90}
+
+FEATURES = ([feature(n) for n in range(1, 6)] +
+            [feature(n, 'rna', 'tRNA-Ala', 'c2') for n in range(1, 3)])
+
+def genome_datum():
+    return {'id': 'kb|g.1', 'scientific_name': 'Test organism',
+            'domain': 'Bacteria', 'genetic_code': 11, 'source': 'test',
+            'source_id': '1', 'contigset_ref': '40/2',
+            'features': FEATURES}
+
+def annotation_datum():
+    lookup = {}
+    for f in FEATURES:
+        for key in [f['id']] + f['aliases']:
+            lookup.setdefault(key, []).append(
+                [CONTAINER_REFS[f['type']], f['id']])
+    return {'feature_container_references': CONTAINER_REFS,
+            'feature_lookup': lookup, 'taxon_ref': '40/5',
+            'assembly_ref': '40/6'}
+
+def container_datum(ftype):
+    features = {}
+    for f in FEATURES:
+        if f['type'] == ftype:
+            features[f['id']] = {'feature_id': f['id'], 'type': ftype,
+                                 'function': f['function'],
+                                 'locations': f['location'],
+                                 'aliases': dict([(a, ['test'])
+                                                  for a in f['aliases']])}
+    return {'type': ftype, 'features': features}
+
+_tempdir = None
+_services = None
+
+def write_object(ref, typestring, data, links=()):
+    datum = {'ref': ref, 'type': typestring,
+             'name': 'object' + ref.replace('/', '_'),
+             'data': data, 'links': list(links), 'metadata': {}}
+    filename = ref.replace('/', '_') + '.msgpack'
+    with open(os.path.join(_tempdir, filename), 'wb') as ofile:
+        msgpack.dump(datum, ofile)
+
+def setup():
+    global _tempdir, _services
+    _tempdir = tempfile.mkdtemp()
+    write_object('40/1', GENOME_TYPE, genome_datum())
+    write_object('40/2', ANNOTATION_TYPE, annotation_datum(),
+                 CONTAINER_REFS.values())
+    for ftype, ref in CONTAINER_REFS.items():
+        write_object(ref, CONTAINER_TYPE, container_datum(ftype))
+    _services = {'workspace_service_url': _tempdir}
+
+def teardown():
+    shutil.rmtree(_tempdir)
+
+def test_features_by_id():
+    api = GenomeAnnotationAPI(_services, None, '40/1')
+    wanted = ['kb|g.1.cds.4', 'kb|g.1.rna.2', 'kb|g.1.missing']
+    functions = api.get_feature_functions(wanted)
+    assert functions == {'kb|g.1.cds.4': 'hypothetical protein 4',
+                         'kb|g.1.rna.2': 'tRNA-Ala'}
+    assert api.get_feature_locations(wanted)['kb|g.1.rna.2'] == [
+        {'contig_id': 'c2', 'strand': '+', 'start': 200, 'length': 90}]
+    assert api.get_feature_aliases(wanted)['kb|g.1.cds.4'] == ['alias4']
+    assert sorted(api.get_features(wanted).keys()) == sorted(wanted[:2])
+    assert len(api.get_feature_functions()) == len(FEATURES)
+
+def test_region_ids():
+    regions = [{'contig_id': 'c1', 'strand': '+', 'start': 150, 'stop': 310},
+               {'contig_id': 'c2', 'strand': '?', 'start': 0, 'stop': 100}]
+    for ref in '40/1', '40/2':
+        api = GenomeAnnotationAPI(_services, None, ref)
+        ids = api.get_feature_ids(region_list=regions)['region']
+        # [n*100, n*100 + 90] overlaps [150, 310] for n = 1, 2, 3
+        assert sorted(ids['c1']) == ['kb|g.1.cds.1', 'kb|g.1.cds.2',
+                                     'kb|g.1.cds.3']
+        assert ids['c2'] == ['kb|g.1.rna.1']
+        minus = [{'contig_id': 'c1', 'strand': '-', 'start': 0, 'stop': 1000}]
+        assert api.get_feature_ids(region_list=minus)['region']['c1'] == []
+
+def test_function_ids():
+    for ref in '40/1', '40/2':
+        api = GenomeAnnotationAPI(_services, None, ref)
+        ids = api.get_feature_ids(function_list=['tRNA-Ala', 'nothing'])
+        assert sorted(ids['function']['tRNA-Ala']) == ['kb|g.1.rna.1',
+                                                       'kb|g.1.rna.2']
+        assert ids['function']['nothing'] == []
+        ids = api.get_feature_ids_by_function(['trna'], ignore_case=True,
+                                              prefix=True)
+        assert sorted(ids['trna']) == ['kb|g.1.rna.1', 'kb|g.1.rna.2']
+
+def test_resolve_aliases():
+    for ref in '40/1', '40/2':
+        api = GenomeAnnotationAPI(_services, None, ref)
+        # both alias1 features: kb|g.1.cds.1 and kb|g.1.rna.1
+        ids = api.resolve_aliases(['alias1', 'alias5', 'unknown'])
+        assert sorted(ids['alias1']) == ['kb|g.1.cds.1', 'kb|g.1.rna.1']
+        assert ids['alias5'] == ['kb|g.1.cds.5']
+        assert ids['unknown'] == []
+        ids = api.get_feature_ids(alias_list=['alias2'])
+        assert sorted(ids['alias']['alias2']) == ['kb|g.1.cds.2',
+                                                  'kb|g.1.rna.2']
+
+def count_container_fetches(api):
+    """Record the container references fetched through the API's client."""
+    fetched = []
+    ws = api.proxy.ws_client
+    for name in 'get_objects', 'get_object_subset':
+        def wrapper(prm, method=getattr(ws, name)):
+            fetched.extend([p['ref'] for p in prm
+                            if p['ref'] in CONTAINER_REFS.values()])
+            return method(prm)
+        setattr(ws, name, wrapper)
+    return fetched
+
+def test_containers_fetched_once():
+    api = GenomeAnnotationAPI(_services, None, '40/2')
+    fetched = count_container_fetches(api)
+    all_ids = sorted([f['id'] for f in FEATURES])
+    assert sorted(api.get_feature_locations()) == all_ids
+    assert sorted(fetched) == sorted(CONTAINER_REFS.values())
+    assert sorted(api.get_feature_functions()) == all_ids
+    functions = api.get_feature_functions(['kb|g.1.cds.2'])
+    assert functions == {'kb|g.1.cds.2': 'hypothetical protein 2'}
+    assert len(fetched) == 2
+    assert api.get_cds_by_mrna(['kb|g.1.cds.1']) == {}
+
+def test_containers_evicted():
+    api = GenomeAnnotationAPI(_services, None, '40/2')
+    fetched = count_container_fetches(api)
+    cache = api.proxy._containers
+    cache.max_bytes = 1
+    api.get_feature_functions(['kb|g.1.cds.1', 'kb|g.1.cds.2'])
+    assert cache.nbytes > 0
+    api.get_feature_functions(['kb|g.1.cds.3'])
+    assert fetched == ['40/3', '40/3']
+    api.get_feature_functions(['kb|g.1.rna.1'])
+    api.get_feature_functions(['kb|g.1.cds.1'])
+    # only the newest container is kept when over the cap
+    assert fetched == ['40/3', '40/3', '40/4', '40/3']
+    cache.max_bytes = 10**9
+    api.get_feature_functions(['kb|g.1.rna.1'])
+    api.get_feature_functions(['kb|g.1.cds.1'])
+    assert fetched == ['40/3', '40/3', '40/4', '40/3', '40/4']
+
+def test_containers_fetched_concurrently():
+    api = GenomeAnnotationAPI(_services, None, '40/2')
+    ws = api.proxy.ws_client
+    threads, calls = set(), []
+    def get_objects(prm, method=ws.get_objects):
+        threads.add(threading.current_thread().ident)
+        calls.append(sorted([p['ref'] for p in prm]))
+        return method(prm)
+    ws.get_objects = get_objects
+    api.get_feature_functions()
+    assert sorted(calls) == [['40/3'], ['40/4']]
+    assert threading.current_thread().ident not in threads
+    # with one worker, all containers in one batched call
+    services = dict(_services, feature_container_workers=1)
+    api = GenomeAnnotationAPI(services, None, '40/2')
+    api.proxy.ws_client.get_objects = get_objects
+    del calls[:]
+    api.get_feature_functions()
+    assert calls == [['40/3', '40/4']]
+
+def test_feature_lookup_fetched_once():
+    api = GenomeAnnotationAPI(_services, None, '40/2')
+    ws = api.proxy.ws_client
+    lookups = []
+    def get_object_subset(prm, method=ws.get_object_subset):
+        lookups.extend([p for p in prm if 'feature_lookup' in p['included']])
+        return method(prm)
+    ws.get_object_subset = get_object_subset
+    ids = ['kb|g.1.cds.1', 'kb|g.1.rna.2']
+    assert sorted(api.get_feature_locations(ids)) == ids
+    assert sorted(api.get_feature_functions(ids)) == ids
+    assert api.resolve_aliases(['alias3'])['alias3'] == ['kb|g.1.cds.3']
+    assert len(lookups) == 1
+
+def test_filtered_ids_skip_annotation_data():
+    api = GenomeAnnotationAPI(_services, None, '40/2')
+    ws = api.proxy.ws_client
+    fetched = []
+    def get_objects(prm, method=ws.get_objects):
+        fetched.extend([p['ref'] for p in prm])
+        return method(prm)
+    ws.get_objects = get_objects
+    ids = api.get_feature_ids(type_list=['CDS'])['type']['CDS']
+    assert len(ids) == 5
+    # only the CDS container is fetched whole, not the annotation
+    assert fetched == [CONTAINER_REFS['CDS']]
+
+def test_container_threads_reused():
+    api = GenomeAnnotationAPI(_services, None, '40/2')
+    ws, cache = api.proxy.ws_client, api.proxy._containers
+    threads = []
+    def get_objects(prm, method=ws.get_objects):
+        threads.append(threading.current_thread())
+        return method(prm)
+    ws.get_objects = get_objects
+    api.get_feature_functions()
+    cache.clear()
+    api.get_feature_functions()
+    assert len(threads) == 4
+    # both fetches ran on the threads of one pool
+    pool = cache._pool
+    assert set(threads) <= set(pool._pool)
+    cache.close()
+    assert cache._pool is None
+    assert not [t for t in pool._pool if t.is_alive()]
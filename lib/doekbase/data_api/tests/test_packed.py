@@ -0,0 +1,60 @@
+"""
+Unit tests for 2-bit packed sequences.
+"""
+
+# Imports
+
+# stdlib
+import random
+import string
+# local
+from doekbase.data_api.sequence.packed import PackedSequence
+
+COMPLEMENT = string.maketrans('ACGTNRYacgtnry', 'TGCANYRtgcanyr')
+
+def reverse_complement(s):
+    return s.translate(COMPLEMENT)[::-1]
+
+def gc_count(s):
+    return len([b for b in s if b in 'GCgc'])
+
+def random_sequences(count=40, alphabet='ACGTACGTACGTacgtNNnRY'):
+    rnd = random.Random(42)
+    for n in xrange(count):
+        yield ''.join([rnd.choice(alphabet) for _ in xrange(n)])
+
+def test_round_trip():
+    for s in random_sequences():
+        p = PackedSequence(s)
+        assert str(p) == s
+        assert len(p) == len(s)
+        assert p == s and not p != s
+    assert PackedSequence(u'ACGTN') == 'ACGTN'
+
+def test_slices():
+    for s in random_sequences(20):
+        p = PackedSequence(s)
+        for start in xrange(len(s) + 1):
+            for stop in xrange(start, len(s) + 1):
+                sub = p[start:stop]
+                assert isinstance(sub, PackedSequence)
+                assert sub == s[start:stop]
+                assert sub.gc_count() == gc_count(s[start:stop])
+        if s:
+            assert p[-1] == s[-1] and p[0] == s[0]
+            assert p[::2] == s[::2]
+
+def test_reverse_complement():
+    for s in random_sequences():
+        p = PackedSequence(s)
+        rc = p.reverse_complement()
+        assert rc == reverse_complement(s)
+        assert rc.gc_count() == gc_count(s)
+        assert rc[1:-1] == reverse_complement(s)[1:-1]
+        assert p[3:].reverse_complement() == reverse_complement(s[3:])
+
+def test_size():
+    s = 'ACGT' * 1000 + 'N' * 100
+    p = PackedSequence(s)
+    assert p.gc_count() == 2000
+    assert p.nbytes() < len(s) / 3
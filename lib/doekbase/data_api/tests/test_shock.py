@@ -0,0 +1,41 @@
+"""
+Unit tests for ranged, concurrent fetches from Shock,
+against a local HTTP server.
+"""
+
+# Imports
+
+# local
+from doekbase.data_api.sequence import shock
+from doekbase.data_api.tests.fake_shock import FakeShock
+
+DATA = ''.join([chr(ord('A') + i % 26) for i in xrange(100000)])
+
+_server = None
+
+def setup():
+    global _server
+    _server = FakeShock({'abc': DATA}).start()
+
+def teardown():
+    shock._get_session().close()  # end keep-alive handler threads
+    _server.stop()
+
+def test_coalesce():
+    ranges = [(500, 10), (0, 100), (120, 30), (10000, 5)]
+    merged = shock.coalesce_ranges(ranges, max_gap=50)
+    assert merged == [(0, 150, [(0, 100), (120, 30)]),
+                      (500, 10, [(500, 10)]),
+                      (10000, 5, [(10000, 5)])]
+    merged = shock.coalesce_ranges(ranges, max_gap=10000,
+                                   max_request_bytes=1000)
+    assert [m[:2] for m in merged] == [(0, 510), (10000, 5)]
+    assert shock.coalesce_ranges([]) == []
+
+def test_fetch_ranges():
+    ranges = [(90000, 100), (5, 10), (30, 40), (50000, 1000), (35, 5)]
+    del _server.requests[:]
+    result = shock.fetch_ranges(_server.url + 'node/abc', ranges, max_gap=100)
+    assert len(_server.requests) == 3
+    for start, length in ranges:
+        assert result[(start, length)] == DATA[start:start + length]
@@ -0,0 +1,103 @@
+"""
+Unit tests for the local Shock cache, against a local Shock server.
+"""
+
+# Imports
+
+# stdlib
+import os
+import shutil
+import tempfile
+# local
+from doekbase.data_api.sequence import shock
+from doekbase.data_api.sequence import shock_cache
+from doekbase.data_api.tests.fake_shock import FakeShock
+
+DATA = ''.join([chr(ord('a') + i % 26) for i in xrange(10000)])
+
+_server = None
+_tempdir = None
+
+def setup():
+    global _server, _tempdir
+    _server = FakeShock({'n1': DATA, 'n2': DATA[:3000],
+                         'empty': ''}).start()
+    _tempdir = tempfile.mkdtemp()
+
+def teardown():
+    shock._get_session().close()
+    _server.stop()
+    shutil.rmtree(_tempdir)
+
+def node_url(node):
+    return _server.url + 'node/' + node
+
+def test_intervals():
+    iv = shock_cache._add_interval([], 10, 20)
+    iv = shock_cache._add_interval(iv, 30, 40)
+    assert iv == [[10, 20], [30, 40]]
+    assert shock_cache._missing(iv, 0, 50) == [(0, 10), (20, 10), (40, 10)]
+    assert shock_cache._missing(iv, 12, 18) == []
+    iv = shock_cache._add_interval(iv, 15, 30)
+    assert iv == [[10, 40]]
+
+def test_read():
+    cache = shock_cache.ShockCache(os.path.join(_tempdir, 'read'))
+    del _server.requests[:]
+    result = cache.read(node_url('n1'), [(100, 50), (5000, 10)])
+    assert result[(100, 50)] == DATA[100:150]
+    assert result[(5000, 10)] == DATA[5000:5010]
+    num_requests = len(_server.requests)
+    # cached: no requests
+    result = cache.read(node_url('n1'), [(110, 20)])
+    assert result[(110, 20)] == DATA[110:130]
+    assert len(_server.requests) == num_requests
+    # partly cached: only the gap is fetched
+    result = cache.read(node_url('n1'), [(120, 60)])
+    assert result[(120, 60)] == DATA[120:180]
+    assert _server.requests[num_requests:] == [('n1', 150, 30)]
+
+def test_fetch_all():
+    cache = shock_cache.ShockCache(os.path.join(_tempdir, 'all'))
+    cache.fetch_all(node_url('n1'))
+    del _server.requests[:]
+    cache.fetch_all(node_url('n1'))
+    result = cache.read(node_url('n1'), [(0, 10), (9990, 10)])
+    assert _server.requests == []
+    assert result[(9990, 10)] == DATA[-10:]
+    data = cache.open(node_url('n1'))
+    assert data[:] == DATA
+    data.close()
+    cache.fetch_all(node_url('empty'))
+    assert cache.read(node_url('empty'), [(0, 0)]) == {(0, 0): ''}
+
+def test_evict():
+    cache = shock_cache.ShockCache(os.path.join(_tempdir, 'evict'),
+                                   max_bytes=12000)
+    cache.fetch_all(node_url('n1'))
+    os.utime(cache._paths(cache._key(node_url('n1')))[1], (0, 0))
+    cache.fetch_all(node_url('n2'))
+    del _server.requests[:]
+    # n1 was least recently used, and removed to make room for n2
+    cache.read(node_url('n2'), [(0, 100)])
+    assert _server.requests == []
+    cache.read(node_url('n1'), [(0, 100)])
+    assert _server.requests == [('n1', 0, 100)]
+
+def test_read_evicted():
+    cache = shock_cache.ShockCache(os.path.join(_tempdir, 'evicted'))
+    cache.read(node_url('n1'), [(0, 100)])
+    # another process evicts the node, or truncates its file
+    data_path, index_path = cache._paths(cache._key(node_url('n1')))
+    with open(data_path, 'r+b') as f:
+        f.truncate(50)
+    try:
+        cache.read(node_url('n1'), [(0, 100)])
+    except IOError:
+        pass
+    else:
+        assert False, 'Expected IOError for a truncated cache file'
+    os.remove(data_path)
+    os.remove(index_path)
+    result = cache.read(node_url('n1'), [(0, 100)])
+    assert result[(0, 100)] == DATA[:100]
@@ -0,0 +1,244 @@
+"""
+Unit tests for the Taxon Thrift service and its client connection pool.
+"""
+
+# Imports
+
+# stdlib
+import os
+import shutil
+import socket
+import tempfile
+import time
+# third-party
+import msgpack
+from thrift.protocol.TProtocol import TProtocolException
+from thrift.transport.TTransport import TTransportException
+# local
+from doekbase.data_api.taxonomy.taxon.service import interface, ttypes
+from doekbase.data_api.wsfile import WorkspaceFile
+
+TAXON_TYPE = 'KBaseGenomesCondensedPrototypeV2.Taxon-1.0'
+
+def taxon_datum(n):
+    return {'taxonomy_id': 1000 + n,
+            'scientific_name': 'Species {:d}'.format(n),
+            'scientific_lineage': 'Bacteria; Genus{:d}'.format(n),
+            'domain': 'Bacteria', 'kingdom': 'Kingdom{:d}'.format(n),
+            'genetic_code': 11, 'aliases': ['alias{:d}'.format(n)],
+            'parent_taxon_ref': '50/{:d}'.format(n + 10)}
+
+TAXON_REFS = ['50/3', '50/1', '50/2']
+
+_tempdir = None
+_services = None
+
+def setup():
+    global _tempdir, _services
+    _tempdir = tempfile.mkdtemp()
+    for ref in TAXON_REFS:
+        datum = {'ref': ref, 'type': TAXON_TYPE, 'name': 'taxon' + ref[3:],
+                 'data': taxon_datum(int(ref[3:])), 'links': [],
+                 'metadata': {}}
+        filename = ref.replace('/', '_') + '.msgpack'
+        with open(os.path.join(_tempdir, filename), 'wb') as ofile:
+            msgpack.dump(datum, ofile)
+    _services = {'workspace_service_url': _tempdir}
+
+def teardown():
+    shutil.rmtree(_tempdir)
+
+class FakeTransport(object):
+    def __init__(self):
+        self.open = True
+
+    def isOpen(self):
+        return self.open
+
+    def close(self):
+        self.open = False
+
+class FakeClient(object):
+    """Answers every method with the next of the pool's replies,
+    raising it if it is an exception.
+    """
+    def __init__(self, replies):
+        self._replies = replies
+
+    def __getattr__(self, name):
+        def method(*args):
+            reply = self._replies.pop(0)
+            if isinstance(reply, Exception):
+                raise reply
+            return reply
+        return method
+
+class FakeConnection(object):
+    def __init__(self, replies):
+        self.transport = FakeTransport()
+        self.client = FakeClient(replies)
+        self.healthy = True
+
+    def is_healthy(self):
+        return self.healthy and self.transport.isOpen()
+
+class FakePool(interface.TaxonClientPool):
+    """Pool of fake connections, all answering from `replies`."""
+    def __init__(self, replies, **kwargs):
+        interface.TaxonClientPool.__init__(self, 'localhost', 0, **kwargs)
+        self.replies = replies
+        self.opened = []
+
+    def _connect(self):
+        conn = FakeConnection(self.replies)
+        self.opened.append(conn)
+        return conn
+
+def test_pool_reuse():
+    pool = FakePool(['a', 'b', 'c'])
+    assert [pool.call('get_scientific_name', 't', '1/1/1')
+            for _ in range(3)] == ['a', 'b', 'c']
+    assert pool.connects == 1
+    assert pool.opened[0].transport.isOpen()
+
+def test_pool_drops_unhealthy():
+    pool = FakePool(['a', 'b', 'c'])
+    pool.call('get_domain', 't', '1/1/1')
+    # e.g. closed by the server: readable EOF
+    pool.opened[0].healthy = False
+    assert pool.call('get_domain', 't', '1/1/1') == 'b'
+    assert pool.connects == 2
+    assert not pool.opened[0].transport.isOpen()
+    # idle for too long
+    pool.idle_timeout = 0
+    pool.call('get_domain', 't', '1/1/1')
+    assert pool.connects == 3
+    assert not pool.opened[1].transport.isOpen()
+
+def test_pool_retry():
+    pool = FakePool(['a', TTransportException(message='reset'), 'b'])
+    pool.call('get_kingdom', 't', '1/1/1')
+    # the reused connection fails, the call is retried on a new one
+    assert pool.call('get_kingdom', 't', '1/1/1') == 'b'
+    assert pool.connects == 2
+    assert not pool.opened[0].transport.isOpen()
+    assert pool.opened[1].transport.isOpen()
+    # a new connection failing is not retried
+    pool = FakePool([TTransportException(message='refused'), 'a'])
+    try:
+        pool.call('get_kingdom', 't', '1/1/1')
+        assert False, 'expected TTransportException'
+    except TTransportException:
+        pass
+    assert pool.connects == 1
+    assert pool.replies == ['a']
+
+def test_pool_errors():
+    error = ttypes.ServiceException('failed', '', 'get_kingdom', {})
+    pool = FakePool([error, TProtocolException(message='bad'), 'a'])
+    # a service error reply leaves the connection in the pool
+    try:
+        pool.call('get_kingdom', 't', '1/1/1')
+        assert False, 'expected ServiceException'
+    except ttypes.ServiceException:
+        pass
+    # a protocol error closes it
+    try:
+        pool.call('get_kingdom', 't', '1/1/1')
+        assert False, 'expected TProtocolException'
+    except TProtocolException:
+        pass
+    assert pool.connects == 1
+    assert not pool.opened[0].transport.isOpen()
+    assert pool.call('get_kingdom', 't', '1/1/1') == 'a'
+    assert pool.connects == 2
+
+def test_pool_size():
+    pool = FakePool([], max_idle=2)
+    conns = [pool._checkout()[0] for _ in range(3)]
+    for conn in conns:
+        pool._checkin(conn)
+    assert len(pool._idle) == 2
+    assert [c.transport.isOpen() for c in conns] == [True, True, False]
+    pool.close()
+    assert pool._idle == []
+    assert not [c for c in conns if c.transport.isOpen()]
+
+def test_is_healthy():
+    server = socket.socket()
+    server.bind(('127.0.0.1', 0))
+    server.listen(1)
+    conn = interface.TaxonClientConnection('127.0.0.1',
+                                           server.getsockname()[1])
+    conn.transport.open()
+    peer, _ = server.accept()
+    try:
+        assert conn.is_healthy()
+        # the server closes the connection: the socket reads EOF
+        peer.close()
+        for _ in range(50):
+            if not conn.is_healthy():
+                break
+            time.sleep(0.01)
+        assert not conn.is_healthy()
+        conn.transport.close()
+        assert not conn.is_healthy()
+    finally:
+        peer.close()
+        server.close()
+
+def count_workspace_calls(names):
+    """Count calls of some WorkspaceFile methods, by every client."""
+    calls = dict([(name, 0) for name in names])
+    originals = dict([(name, getattr(WorkspaceFile, name)) for name in names])
+    def counted(name):
+        def method(self, *args):
+            calls[name] += 1
+            return originals[name](self, *args)
+        return method
+    for name in names:
+        setattr(WorkspaceFile, name, counted(name))
+    def restore():
+        for name in names:
+            setattr(WorkspaceFile, name, originals[name])
+    return calls, restore
+
+def test_get_taxa():
+    service = interface.TaxonService(_services)
+    calls, restore = count_workspace_calls(
+        ['get_object_info_new', 'get_objects', 'get_objects_data',
+         'get_object_subset'])
+    try:
+        taxa = service.get_taxa(None, TAXON_REFS,
+                                ['scientific_name', 'parent', 'taxonomic_id'])
+    finally:
+        restore()
+    # one lookup and one data fetch for the whole batch (the file-backed
+    # get_objects_data goes through get_objects)
+    assert calls == {'get_object_info_new': 1, 'get_objects': 1,
+                     'get_objects_data': 1, 'get_object_subset': 0}
+    assert [t.ref for t in taxa] == TAXON_REFS
+    for ref, taxon in zip(TAXON_REFS, taxa):
+        n = int(ref[3:])
+        assert taxon.scientific_name == 'Species {:d}'.format(n)
+        assert taxon.parent == '50/{:d}'.format(n + 10)
+        assert taxon.taxonomic_id == 1000 + n
+        # only the requested fields are set
+        assert taxon.domain is None and taxon.aliases is None
+        assert taxon.kingdom is None and taxon.genetic_code is None
+        assert taxon.scientific_lineage is None
+
+def test_get_taxa_all_fields():
+    service = interface.TaxonService(_services)
+    taxon = service.get_taxa(None, ['50/2'], None)[0]
+    assert taxon.ref == '50/2'
+    assert taxon.scientific_lineage == 'Bacteria; Genus2'
+    assert taxon.kingdom == 'Kingdom2'
+    assert taxon.domain == 'Bacteria'
+    assert taxon.genetic_code == 11
+    assert taxon.aliases == ['alias2']
+    try:
+        service.get_taxa(None, ['50/2'], ['no_such_field'])
+        assert False, 'expected ServiceException'
+    except ttypes.ServiceException:
+        pass
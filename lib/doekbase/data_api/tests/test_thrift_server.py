@@ -0,0 +1,86 @@
+"""
+Unit tests for the multi-client Thrift servers.
+"""
+
+# Imports
+
+# stdlib
+import socket
+import threading
+import time
+# third-party
+from thrift.transport import TSocket, TTransport
+from thrift.protocol import TBinaryProtocol
+# local
+from doekbase.data_api import thrift_server
+from doekbase.data_api.baseobj import thrift_service, ttypes
+
+class StatefulHandler(thrift_service.Iface):
+    """Remembers the token from `init`, like ObjectImpl."""
+    def __init__(self):
+        self.token = None
+
+    def init(self, auth):
+        self.token = auth.token
+
+    def get_info(self, ref):
+        return ttypes.Metadata(object_id=self.token, object_reference=ref)
+
+def factory():
+    return thrift_service.Processor(StatefulHandler())
+
+def free_port():
+    s = socket.socket()
+    s.bind(('127.0.0.1', 0))
+    port = s.getsockname()[1]
+    s.close()
+    return port
+
+def connect(port, framed):
+    sock = TSocket.TSocket('127.0.0.1', port)
+    if framed:
+        transport = TTransport.TFramedTransport(sock)
+    else:
+        transport = TTransport.TBufferedTransport(sock)
+    client = thrift_service.Client(TBinaryProtocol.TBinaryProtocol(transport))
+    for _ in range(50):
+        try:
+            transport.open()
+            return client, transport
+        except TTransport.TTransportException:
+            time.sleep(0.1)
+    raise RuntimeError('Cannot connect to port {:d}'.format(port))
+
+def check_server(server_type, framed):
+    port = free_port()
+    server = thrift_server.create_server(factory, port=port, host='127.0.0.1',
+                                         server_type=server_type, workers=2)
+    thread = threading.Thread(target=server.serve)
+    thread.daemon = True
+    thread.start()
+    c1, t1 = connect(port, framed)
+    c2, t2 = connect(port, framed)
+    # interleave calls; each connection must keep its own state
+    c1.init(ttypes.AuthInfo(token='one'))
+    c2.init(ttypes.AuthInfo(token='two'))
+    assert c1.get_info('1/1').object_id == 'one'
+    assert c2.get_info('1/2').object_id == 'two'
+    t1.close()
+    t2.close()
+    if server_type == 'nonblocking':
+        server.stop()
+
+def test_threadpool():
+    check_server('threadpool', False)
+
+def test_nonblocking():
+    check_server('nonblocking', True)
+
+def test_bad_args():
+    for kw in ({'server_type': 'nope'}, {'workers': 0}):
+        try:
+            thrift_server.create_server(factory, **kw)
+        except ValueError:
+            pass
+        else:
+            assert False, 'Expected ValueError for {}'.format(kw)
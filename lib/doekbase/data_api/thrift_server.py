@@ -0,0 +1,206 @@
+"""
+Multi-client Thrift servers for the Data API services.
+
+Handlers such as :class:`doekbase.data_api.baseobj.impl.ObjectImpl`
+keep state between calls (`init` sets the token, `get_info` sets the
+object for later calls), so every client connection gets its own
+handler, created by a factory function.
+"""
+# Imports
+
+# Stdlib
+import argparse
+import logging
+import Queue
+import sys
+import weakref
+# Third-party
+from thrift.transport import TSocket
+from thrift.transport import TTransport
+from thrift.protocol import TBinaryProtocol
+from thrift.server import TServer, TProcessPoolServer, TNonblockingServer
+# Local
+from doekbase.data_api.util import get_logger
+
+# Constants
+
+DEFAULT_PORT = 9090
+DEFAULT_WORKERS = 10
+DEFAULT_WS_URL = 'https://ci.kbase.us/services/ws/'
+DEFAULT_SHOCK_URL = 'https://ci.kbase.us/services/shock-api/'
+
+#: Server types, the first is the default
+SERVER_TYPES = ('threadpool', 'processpool', 'nonblocking')
+
+# Logging
+
+_log = get_logger('thrift_server')
+
+# Classes and functions
+
+def _serve_client(server, client):
+    """Serve one client connection with its own processor.
+    Replaces `serveClient` of the blocking Thrift servers.
+    """
+    itrans = server.inputTransportFactory.getTransport(client)
+    otrans = server.outputTransportFactory.getTransport(client)
+    iprot = server.inputProtocolFactory.getProtocol(itrans)
+    oprot = server.outputProtocolFactory.getProtocol(otrans)
+    processor = server.processor_factory()
+    try:
+        while True:
+            processor.process(iprot, oprot)
+    except TTransport.TTransportException:
+        pass
+    except Exception as err:
+        _log.exception(err)
+    itrans.close()
+    otrans.close()
+
+
+class ThreadPoolServer(TServer.TThreadPoolServer):
+    """Fixed pool of threads, one connection per thread at a time.
+    """
+    def __init__(self, processor_factory, *args, **kwargs):
+        TServer.TThreadPoolServer.__init__(self, None, *args, **kwargs)
+        self.processor_factory = processor_factory
+
+    serveClient = _serve_client
+
+
+class ProcessPoolServer(TProcessPoolServer.TProcessPoolServer):
+    """Fixed pool of worker processes, one connection per process
+    at a time. Avoids contention for the GIL when decoding large objects.
+    """
+    def __init__(self, processor_factory, *args):
+        TProcessPoolServer.TProcessPoolServer.__init__(self, None, *args)
+        self.processor_factory = processor_factory
+
+    serveClient = _serve_client
+
+
+class _ConnectionTasks(Queue.Queue):
+    """Task queue of the non-blocking server that replaces the shared
+    processor of each task with the processor of its connection.
+
+    Each task ends with the `ready` callback of the
+    connection it came from, which identifies the connection. A connection
+    waits for the reply to a request before it reads the next one, so
+    its processor is never used by two workers at once.
+    """
+    def __init__(self, processor_factory):
+        Queue.Queue.__init__(self)
+        self._factory = processor_factory
+        self._processors = weakref.WeakKeyDictionary()
+
+    def put(self, task, *args, **kwargs):
+        callback = task[-1]
+        if task[0] is not None:  # None is the signal to stop
+            connection = callback.__self__
+            processor = self._processors.get(connection, None)
+            if processor is None:
+                processor = self._factory()
+                self._processors[connection] = processor
+            task = [processor] + list(task[1:])
+        Queue.Queue.put(self, task, *args, **kwargs)
+
+
+class NonblockingServer(TNonblockingServer.TNonblockingServer):
+    """Single select() loop for all connections, with a pool of
+    threads to process requests. Clients must use a framed transport.
+    """
+    def __init__(self, processor_factory, lsocket, protocol_factory=None,
+                 threads=DEFAULT_WORKERS):
+        # the shared processor is only a placeholder, see _ConnectionTasks
+        TNonblockingServer.TNonblockingServer.__init__(
+            self, processor_factory, lsocket, protocol_factory,
+            protocol_factory, threads)
+        self.tasks = _ConnectionTasks(processor_factory)
+
+
+def create_server(processor_factory, port=DEFAULT_PORT, host=None,
+                  server_type=SERVER_TYPES[0], workers=DEFAULT_WORKERS):
+    """Create a Thrift server.
+
+    Args:
+      processor_factory (function): Called with no arguments for each
+        client connection, returns a new Thrift processor with its own
+        handler.
+      port (int): Port to listen on.
+      host (str): Host or address to listen on, None for all.
+      server_type (str): One of `SERVER_TYPES`.
+      workers (int): Number of worker threads, or processes.
+    Returns:
+      The server. Start it with `serve()`.
+    Raises:
+      ValueError: for an unknown server type or bad number of workers
+    """
+    if server_type not in SERVER_TYPES:
+        raise ValueError('Unknown server type "{}", expected one of: {}'
+                         .format(server_type, ', '.join(SERVER_TYPES)))
+    if workers < 1:
+        raise ValueError('Number of workers must be at least 1')
+    transport = TSocket.TServerSocket(host=host, port=port)
+    pfactory = TBinaryProtocol.TBinaryProtocolAcceleratedFactory()
+    if server_type == 'nonblocking':
+        return NonblockingServer(processor_factory, transport, pfactory,
+                                 threads=workers)
+    tfactory = TTransport.TBufferedTransportFactory()
+    if server_type == 'processpool':
+        server = ProcessPoolServer(processor_factory, transport, tfactory,
+                                   pfactory)
+        server.setNumWorkers(workers)
+    else:
+        server = ThreadPoolServer(processor_factory, transport, tfactory,
+                                  pfactory, daemon=True)
+        server.setNumThreads(workers)
+    return server
+
+
+def object_processor_factory(services):
+    """Processor factory for the object service.
+    """
+    from doekbase.data_api.baseobj import thrift_service
+    from doekbase.data_api.baseobj.impl import ObjectImpl
+    return lambda: thrift_service.Processor(ObjectImpl(services=services))
+
+
+def main(args=None):
+    """Run the object service.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__.strip())
+    parser.add_argument('--host', default=None,
+                        help='Host to listen on (default=all)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help='Port to listen on (default=%(default)s)')
+    parser.add_argument('--server', choices=SERVER_TYPES,
+                        default=SERVER_TYPES[0],
+                        help='Server type (default=%(default)s)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help='Number of worker threads or processes '
+                             '(default=%(default)s)')
+    parser.add_argument('--ws-url', default=DEFAULT_WS_URL,
+                        help='Workspace URL (default=%(default)s)')
+    parser.add_argument('--shock-url', default=DEFAULT_SHOCK_URL,
+                        help='Shock URL (default=%(default)s)')
+    args = parser.parse_args(args)
+
+    logging.basicConfig()
+    services = {'workspace_service_url': args.ws_url,
+                'shock_service_url': args.shock_url}
+    try:
+        server = create_server(object_processor_factory(services),
+                               port=args.port, host=args.host,
+                               server_type=args.server, workers=args.workers)
+    except ValueError as err:
+        parser.error(str(err))
+    _log.info('Starting {} server on port {:d} with {:d} workers'.format(
+        args.server, args.port, args.workers))
+    try:
+        server.serve()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -21,7 +21,7 @@ import re
 import mongomock as mm
 # Local
 from doekbase.data_api.util import get_logger, log_start, log_end
-from doekbase.workspace.client import ServerError
+from doekbase.workspace.client import ServerError, WorkspaceBatch
 
 # Logging
 
@@ -44,6 +44,47 @@ class LibError(ServerError):
 
 ws_url_template = 'https://{}.kbase.us/services/ws/'
 
+_MISSING = object()
+
+def _extract_path(d, parts):
+    """Get the part of `d` on a path, as nested dicts and lists
+    holding only that part, or _MISSING if it is not there.
+    Dicts on the path are kept, even if the rest of the path is not found.
+    """
+    if not parts:
+        return d
+    key, rest = parts[0], parts[1:]
+    if key == '[*]':
+        if not isinstance(d, list):
+            return _MISSING
+        items = [_extract_path(x, rest) for x in d]
+        return [{} if x is _MISSING else x for x in items]
+    if key == '*':
+        if not isinstance(d, dict):
+            return _MISSING
+        items = [(k, _extract_path(v, rest)) for k, v in d.items()]
+        return dict([(k, v) for k, v in items if v is not _MISSING])
+    if not isinstance(d, dict) or key not in d:
+        return _MISSING
+    value = _extract_path(d[key], rest)
+    if value is _MISSING:
+        if not isinstance(d[key], dict):
+            return _MISSING
+        value = {}
+    return {key: value}
+
+def _merge_subsets(a, b):
+    """Merge two results of :func:`_extract_path` from the same data."""
+    if isinstance(a, dict) and isinstance(b, dict):
+        merged = dict(a)
+        for key, value in b.items():
+            merged[key] = _merge_subsets(merged[key], value) \
+                if key in merged else value
+        return merged
+    if isinstance(a, list) and isinstance(b, list) and len(a) == len(b):
+        return [_merge_subsets(x, y) for x, y in zip(a, b)]
+    return b
+
 def workspace_to_file(ref, workspace='narrative', token=None):
     """Convert Workspace objects to the JSON format read by the
     mongomock module.
@@ -158,8 +199,12 @@ class WorkspaceFile(object):
         # log start
         t0 = log_start(_log, 'WorkspaceFile.load', level=logging.INFO,
                        kvp=dict(ref=ref))
-        # stop if already loaded in the past
+        # stop if already loaded in the past, after making sure
+        # this instance's collection has the record too
         if ref in self._loaded:
+            record = self._loaded[ref]
+            if self.collection.find_one({'ref': record['ref']}) is None:
+                self.collection.insert(record)
             # log done and return
             log_end(_log, t0, 'WorkspaceFile.load', level=logging.INFO,
                     kvp=dict(ref=ref, cached='yes'))
@@ -204,6 +249,9 @@ class WorkspaceFile(object):
 
     # Public methods
 
+    def batch(self):
+        return WorkspaceBatch(self)
+
     def copy_object(self, prm):
         # do nothing
         return
@@ -212,10 +260,11 @@ class WorkspaceFile(object):
         return []
 
     def get_object_info_new(self, prm):
-        ref = prm['objects'][0]['ref']
-        records = self._find_ref(ref)
-        result = [self._make_info_tuple(record, record['ref'])
-                  for record in records]
+        result = []
+        for obj in prm['objects']:
+            records = self._find_ref(obj['ref'])
+            result.extend([self._make_info_tuple(record, record['ref'])
+                           for record in records])
         return result
 
     def get_object_provenance(self, prm):
@@ -224,6 +273,10 @@ class WorkspaceFile(object):
     def get_object_subset(self, prm):
         """Note: this is not efficient. It actually looks at
         the whole object.
+
+        As in the Workspace, a path element `[*]` selects every
+        item of a list, e.g. `contigs/[*]/id`, and `*` every value
+        of a mapping, e.g. `features/*/locations`.
         """
         # loop over each specified subset, and add all results
         # to a single list in `result`
@@ -236,29 +289,11 @@ class WorkspaceFile(object):
             for r in records:
                 extracted = {} # all extracted paths
                 for p in paths:
-                    d = r['data'] # alias
-                    parts = p.split('/')
-
-                    # Look for value matching path in 'd'
-                    e = extracted
-                    for i in xrange(len(parts) - 1):
-                        if parts[i] in d:
-                            d = d[parts[i]]
-
-                            if parts[i] not in e and isinstance(d, dict):
-                                e[parts[i]] = {}
-
-                            if isinstance(e[parts[i]], dict):
-                                e = e[parts[i]]
-                        else:
-                            break
-                    else:
-                        if parts[-1] in d:
-                            e[parts[-1]] = d[parts[-1]]
-
+                    value = _extract_path(r['data'], p.split('/'))
+                    if value is not _MISSING:
+                        extracted = _merge_subsets(extracted, value)
                     _log.debug(extracted)
                 if len(extracted) > 0:
-                    #print("@@ add extracted: {}".format(extracted))
                     obj = self._make_object(r, ref, data=extracted)
                     result.append(obj)
         return result
@@ -273,6 +308,12 @@ class WorkspaceFile(object):
             result.extend(objects)
         return result
 
+    def get_objects_data(self, prm):
+        return [obj['data'] for obj in self.get_objects(prm)]
+
+    def get_object_subset_data(self, prm):
+        return [obj['data'] for obj in self.get_object_subset(prm)]
+
     def get_type_info(self, type_name):
         return self._make_type_info({'type': type_name})
 
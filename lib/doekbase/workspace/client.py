@@ -13,16 +13,44 @@ except ImportError:
     import simplejson as _json
 
 import requests as _requests
+from requests.adapters import HTTPAdapter as _HTTPAdapter
+from requests.packages.urllib3.util.retry import Retry as _Retry
 import urlparse as _urlparse
 import random as _random
 import base64 as _base64
 from ConfigParser import ConfigParser as _ConfigParser
 import os as _os
+import threading as _threading
+from doekbase.workspace import codec as _codec
+from decimal import Decimal as _Decimal
+
+# Optional incremental JSON parser. Only the C backends are used: the
+# others are several times slower than decoding the whole response.
+_ijson = None
+for _name in ('ijson.backends.yajl2_c', 'ijson.backends.yajl2_cffi'):
+    try:
+        _ijson = __import__(_name, fromlist=['items'])
+        break
+    except Exception:
+        pass
+# ijson 3.1 and later can return floats instead of Decimals
+_ijson_use_float = False
+if _ijson is not None:
+    try:
+        import ijson as _ijson_pkg
+        _ijson_use_float = tuple(
+            int(v) for v in _ijson_pkg.__version__.split('.')[:2]) >= (3, 1)
+    except Exception:
+        pass
 
 _CT = 'content-type'
 _AJ = 'application/json'
 _URL_SCHEME = frozenset(['http', 'https'])
 
+# Shared HTTP sessions, keyed by service URL
+_sessions = dict()
+_sessions_lock = _threading.Lock()
+
 
 def _get_token(user_id, password,
                auth_svc='https://nexus.api.globusonline.org/goauth/token?' +
@@ -79,6 +107,63 @@ def _read_inifile(file=_os.environ.get(  # @ReservedAssignment
     return authdata
 
 
+def _get_session(url, pool_size=10, max_retries=3, backoff_factor=0.5):
+    """Get the keep-alive HTTP session shared by all clients of `url`,
+    creating it the first time. The pool size and retry policy of the
+    first caller for a URL are the ones used for that URL.
+
+    Connection errors are retried, with exponential backoff, up to
+    `max_retries` times. Since RPCs are sent with POST, errors after the
+    request was sent are not retried.
+    """
+    with _sessions_lock:
+        session = _sessions.get(url, None)
+        if session is None:
+            retry = _Retry(total=max_retries, read=0,
+                           backoff_factor=backoff_factor)
+            adapter = _HTTPAdapter(pool_connections=pool_size,
+                                   pool_maxsize=pool_size,
+                                   max_retries=retry)
+            session = _requests.Session()
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _sessions[url] = session
+    return session
+
+
+def _session_stats(session):
+    new, total = 0, 0
+    for adapter in set(session.adapters.values()):
+        pools = adapter.poolmanager.pools
+        with pools.lock:
+            conn_pools = list(pools._container.values())
+        for pool in conn_pools:
+            new += pool.num_connections
+            total += pool.num_requests
+    return {'requests': total, 'new': new, 'reused': max(total - new, 0)}
+
+
+def connection_stats(url=None):
+    """Count the HTTP requests sent through the shared sessions, and
+    how many of them opened a new connection versus reused one.
+
+    Args:
+      url (str): Service URL, or None for the total over all URLs.
+    Returns:
+      dict with integer values for 'requests', 'new' and 'reused'.
+    """
+    with _sessions_lock:
+        if url is None:
+            sessions = list(_sessions.values())
+        else:
+            sessions = [_sessions[url]] if url in _sessions else []
+    result = {'requests': 0, 'new': 0, 'reused': 0}
+    for session in sessions:
+        for key, value in _session_stats(session).items():
+            result[key] += value
+    return result
+
+
 class ServerError(Exception):
 
     def __init__(self, name, code, message, data=None, error=None):
@@ -93,21 +178,190 @@ class ServerError(Exception):
             '\n' + self.data
 
 
-class _JSONObjectEncoder(_json.JSONEncoder):
-
-    def default(self, obj):
-        if isinstance(obj, set):
-            return list(obj)
-        if isinstance(obj, frozenset):
-            return list(obj)
-        return _json.JSONEncoder.default(self, obj)
+def _float_events(events):
+    for prefix, event, value in events:
+        if event == 'number' and isinstance(value, _Decimal):
+            value = float(value)
+        yield prefix, event, value
+
+
+def _stream_items(raw, prefix):
+    """Incrementally decode the JSON in the file-like `raw`, returning
+    the items found at `prefix` (ijson syntax), or None if no
+    incremental parser with a C backend is installed.
+    """
+    if _ijson is None:
+        return None
+    # floats, not Decimals, to match the json module
+    if _ijson_use_float:
+        return list(_ijson.items(raw, prefix, use_float=True))
+    from ijson.common import items
+    return list(items(_float_events(_ijson.parse(raw)), prefix))
+
+
+# Methods that take a list of object specifications and return a list
+# with one result per specification, so queued calls can be merged.
+_MERGE_LIST_METHODS = frozenset([
+    'get_objects', 'get_object_subset', 'get_object_provenance',
+    'list_referencing_objects', 'list_referencing_object_counts',
+    'get_referenced_objects'])
+# Methods that take a dict with an 'objects' list, plus options that
+# must match for queued calls to be merged.
+_MERGE_DICT_METHODS = frozenset(['get_object_info_new'])
+
+
+class BatchResult(object):
+    """Result of one call queued in a :class:`WorkspaceBatch`.
+    The value is available after the batch has been sent.
+    """
+
+    def __init__(self, method):
+        self.method = method
+        self._done = False
+        self._value = None
+        self._error = None
+
+    def done(self):
+        return self._done
+
+    def result(self):
+        """Get the value returned by the call.
+
+        Raises:
+          RuntimeError: if the batch was not sent yet
+          Exception: whatever error the call raised
+        """
+        if not self._done:
+            raise RuntimeError('Batch has not been sent for ' + self.method)
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+    def _set(self, value):
+        self._value, self._done = value, True
+
+    def _fail(self, error):
+        self._error, self._done = error, True
+
+
+class WorkspaceBatch(object):
+    """Queue Workspace calls and send them together.
+
+    Calls to the same method on lists of objects (such as `get_objects`,
+    `get_object_subset`, `get_object_info_new` or
+    `list_referencing_objects`) are merged into a single multi-object call,
+    and the results are split back out to each queued call.
+    Other methods are sent one by one.
+
+    Use through :meth:`Workspace.batch`::
+
+        with ws.batch() as batch:
+            a = batch.get_object_subset([{'ref': r1, 'included': ['x']}])
+            b = batch.get_object_subset([{'ref': r2, 'included': ['y']}])
+        print(a.result(), b.result())
+    """
+
+    def __init__(self, client):
+        self._client = client
+        self._queue = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.send()
+        return False
+
+    def __getattr__(self, name):
+        method = getattr(self._client, name)
+        if name.startswith('_') or not callable(method):
+            raise AttributeError(name)
+
+        def queue_call(*args):
+            result = BatchResult(name)
+            self._queue.append((name, args, result))
+            return result
+        return queue_call
+
+    def send(self):
+        """Send all queued calls. Called automatically on leaving
+        the `with` block.
+        """
+        queue, self._queue = self._queue, []
+        groups, group_order = {}, []
+        for name, args, result in queue:
+            if name in _MERGE_LIST_METHODS and len(args) == 1:
+                key = (name,)
+            elif name in _MERGE_DICT_METHODS and len(args) == 1:
+                key = self._options_key(name, args[0])
+            else:
+                key = None
+            if key is None:
+                key = (name, len(group_order))  # never merged
+            if key not in groups:
+                groups[key] = []
+                group_order.append(key)
+            groups[key].append((args, result))
+        for key in group_order:
+            self._send_group(key[0], groups[key])
+
+    def _options_key(self, name, params):
+        """Key of a call taking a dict with an `objects` list, equal
+        for calls with the same other options, or None if the call
+        cannot be merged.
+        """
+        options = dict(params)
+        if not isinstance(options.pop('objects', None), list):
+            return None
+        try:
+            return (name, _json.dumps(options, sort_keys=True))
+        except (TypeError, ValueError):
+            return None
+
+    def _send_group(self, name, calls):
+        method = getattr(self._client, name)
+        if len(calls) == 1:
+            args, result = calls[0]
+            try:
+                result._set(method(*args))
+            except Exception as err:
+                result._fail(err)
+            return
+        if name in _MERGE_DICT_METHODS:
+            params = dict(calls[0][0][0])
+            params['objects'] = []
+            counts = []
+            for args, _ in calls:
+                params['objects'].extend(args[0]['objects'])
+                counts.append(len(args[0]['objects']))
+        else:
+            params, counts = [], []
+            for args, _ in calls:
+                params.extend(args[0])
+                counts.append(len(args[0]))
+        try:
+            values = method(params)
+            if len(values) != sum(counts):
+                raise ServerError('Unknown', 0, 'Expected {:d} results from '
+                                  'merged {}, got {:d}'.format(
+                                      sum(counts), name, len(values)))
+        except Exception as err:
+            for _, result in calls:
+                result._fail(err)
+            return
+        offset = 0
+        for (_, result), count in zip(calls, counts):
+            result._set(values[offset:offset + count])
+            offset += count
 
 
 class Workspace(object):
 
     def __init__(self, url=None, timeout=30 * 60, user_id=None,
                  password=None, token=None, ignore_authrc=False,
-                 trust_all_ssl_certificates=False):
+                 trust_all_ssl_certificates=False, pool_size=10,
+                 max_retries=3, backoff_factor=0.5, json_codec=None):
         if url is None:
             url = 'https://kbase.us/services/ws/'
         scheme, _, _, _, _, _ = _urlparse.urlparse(url)
@@ -137,18 +391,82 @@ class Workspace(object):
                         authdata['user_id'], authdata['password'])
         if self.timeout < 1:
             raise ValueError('Timeout value must be at least 1 second')
+        self._session = _get_session(url, pool_size=pool_size,
+                                     max_retries=max_retries,
+                                     backoff_factor=backoff_factor)
+        self._codec = _codec.get_codec(json_codec)
+
+    def batch(self):
+        """Queue calls and send them together when the returned
+        :class:`WorkspaceBatch` is used as a context manager.
+        """
+        return WorkspaceBatch(self)
+
+    def connection_stats(self):
+        """Count requests sent, and connections opened or reused, by all
+        clients sharing this client's HTTP session.
+        """
+        return _session_stats(self._session)
+
+    def _call(self, method, params, stream=False):
+        """Call `method` on the server.
+
+        If `stream` is true, the response is decoded as it is read from
+        the socket, without first buffering it all as text.
+        """
+        ret = self._post(method, params, stream)
+        try:
+            self._check_status(ret)
+            if stream:
+                ret.raw.decode_content = True
+                resp = self._codec.load(ret.raw)
+            else:
+                resp = self._codec.loads(ret.content)
+        finally:
+            ret.close()
+        if 'result' not in resp:
+            raise ServerError('Unknown', 0, 'An unknown server error occurred')
+        return resp['result']
+
+    def _call_data(self, method, params):
+        """Call `method`, a method returning a list of objects, and
+        return only the 'data' of each object.
 
-    def _call(self, method, params):
+        With an incremental JSON parser installed, the rest of the
+        response is skipped as it is read, so peak memory stays close to
+        the size of the data itself.
+        """
+        ret = self._post(method, params, True)
+        try:
+            self._check_status(ret)
+            ret.raw.decode_content = True
+            data = _stream_items(ret.raw, 'result.item.item.data')
+            if data is None:
+                resp = self._codec.load(ret.raw)
+                if 'result' not in resp:
+                    raise ServerError('Unknown', 0,
+                                      'An unknown server error occurred')
+                data = [obj['data'] for obj in resp['result'][0]]
+        finally:
+            ret.close()
+        if len(data) != len(params[0]):
+            raise ServerError('Unknown', 0, 'Expected {:d} objects, got {:d}'
+                              .format(len(params[0]), len(data)))
+        return data
+
+    def _post(self, method, params, stream):
         arg_hash = {'method': method,
                     'params': params,
                     'version': '1.1',
                     'id': str(_random.random())[2:]
                     }
 
-        body = _json.dumps(arg_hash, cls=_JSONObjectEncoder)
-        ret = _requests.post(self.url, data=body, headers=self._headers,
-                             timeout=self.timeout,
-                             verify=not self.trust_all_ssl_certificates)
+        body = self._codec.dumps(arg_hash)
+        return self._session.post(self.url, data=body, headers=self._headers,
+                                  timeout=self.timeout, stream=stream,
+                                  verify=not self.trust_all_ssl_certificates)
+
+    def _check_status(self, ret):
         if ret.status_code == _requests.codes.server_error:
             if _CT in ret.headers and ret.headers[_CT] == _AJ:
                 err = _json.loads(ret.text)
@@ -160,10 +478,6 @@ class Workspace(object):
                 raise ServerError('Unknown', 0, ret.text)
         if ret.status_code != _requests.codes.OK:
             ret.raise_for_status()
-        resp = _json.loads(ret.text)
-        if 'result' not in resp:
-            raise ServerError('Unknown', 0, 'An unknown server error occurred')
-        return resp['result']
 
     def ver(self):
         resp = self._call('Workspace.ver',
@@ -243,14 +557,27 @@ class Workspace(object):
 
     def get_objects(self, object_ids):
         resp = self._call('Workspace.get_objects',
-                          [object_ids])
+                          [object_ids], stream=True)
         return resp[0]
 
+    def get_objects_data(self, object_ids):
+        """Like `get_objects`, but return only the data of each object,
+        decoded incrementally from the response.
+        """
+        return self._call_data('Workspace.get_objects', [object_ids])
+
     def get_object_subset(self, sub_object_ids):
         resp = self._call('Workspace.get_object_subset',
-                          [sub_object_ids])
+                          [sub_object_ids], stream=True)
         return resp[0]
 
+    def get_object_subset_data(self, sub_object_ids):
+        """Like `get_object_subset`, but return only the data of each
+        object, decoded incrementally from the response.
+        """
+        return self._call_data('Workspace.get_object_subset',
+                               [sub_object_ids])
+
     def get_object_history(self, object):
         resp = self._call('Workspace.get_object_history',
                           [object])
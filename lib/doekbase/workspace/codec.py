@@ -0,0 +1,195 @@
+"""
+Registry of JSON codecs used to encode and decode Workspace data.
+
+The codec is chosen by name, with :func:`get_codec`. With no name,
+the environment variable named by `CODEC_ENV` is used, and if that
+is not set either, the fastest codec that is installed, other than
+those in `OPT_IN`, which are only used when asked for by name.
+
+All codecs encode sets and frozensets as lists, and round-trip floats
+and integers of any size exactly. If a fast encoder or decoder cannot
+handle some value, such as an integer above 64 bits, the standard
+library is used instead.
+"""
+
+# Imports
+
+# Stdlib
+import json as _json
+import os as _os
+import threading as _threading
+
+#: Environment variable with the name of the JSON codec to use
+CODEC_ENV = 'KB_JSON_CODEC'
+
+#: Key in the services dictionary with the name of the JSON codec to use
+CODEC_SERVICE_KEY = 'json_codec'
+
+#: Codecs never picked automatically. ujson 1.x cannot encode floats
+#: exactly, so with it encoding falls back to the standard library.
+OPT_IN = frozenset(['ujson'])
+
+
+def _default(obj):
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(repr(obj) + ' is not JSON serializable')
+
+
+class _JSONObjectEncoder(_json.JSONEncoder):
+
+    def default(self, obj):
+        if isinstance(obj, (set, frozenset)):
+            return list(obj)
+        return _json.JSONEncoder.default(self, obj)
+
+
+def _std_dumps(obj):
+    return _json.dumps(obj, cls=_JSONObjectEncoder)
+
+
+class Codec(object):
+    """A JSON encoder and decoder.
+
+    Args:
+      name (str): Name of the codec.
+      dumps (function): Encode an object to a JSON string.
+      loads (function): Decode a JSON string (bytes or text) to an object.
+      load (function): Decode JSON from a file-like object. If None,
+        the whole file is read and passed to `loads`.
+    """
+
+    def __init__(self, name, dumps, loads, load=None):
+        self.name = name
+        self._dumps = dumps
+        self._loads = loads
+        self._load = load
+
+    def dumps(self, obj):
+        try:
+            s = self._dumps(obj)
+        except (TypeError, OverflowError, ValueError):
+            return _std_dumps(obj)
+        if not isinstance(s, str):
+            s = s.decode('utf-8')
+        return s
+
+    def loads(self, s):
+        try:
+            return self._loads(s)
+        except (ValueError, OverflowError):
+            if self._loads is _json.loads:
+                raise
+            return _json.loads(s)  # e.g. integers above 64 bits
+
+    def load(self, fp):
+        if self._load is None:
+            return self._loads(fp.read())
+        return self._load(fp)
+
+    def __repr__(self):
+        return 'Codec({})'.format(self.name)
+
+
+# Factories, by name, in order of preference (fastest first).
+# Each returns a Codec, or raises ImportError if its module is missing.
+
+def _orjson():
+    import orjson
+    return Codec('orjson', lambda o: orjson.dumps(o, default=_default),
+                 orjson.loads)
+
+
+def _ujson():
+    import ujson
+    if int(ujson.__version__.split('.')[0]) >= 2:
+        dumps = ujson.dumps  # shortest exact representation of floats
+    else:
+        # ujson 1.x rounds floats to at most 15 digits
+        dumps = _std_dumps
+    return Codec('ujson', dumps,
+                 lambda s: ujson.loads(s, precise_float=True))
+
+
+def _simplejson():
+    import simplejson
+    return Codec('simplejson',
+                 lambda o: simplejson.dumps(o, default=_default),
+                 simplejson.loads, simplejson.load)
+
+
+def _stdlib():
+    return Codec('json', _std_dumps, _json.loads, _json.load)
+
+
+_factories = [('orjson', _orjson), ('ujson', _ujson),
+              ('simplejson', _simplejson), ('json', _stdlib)]
+_codecs = dict()
+_codecs_lock = _threading.Lock()
+
+
+def register(name, factory, first=False):
+    """Add a codec to the registry, replacing any with the same name.
+
+    Args:
+      name (str): Name of the codec.
+      factory (function): Called with no arguments, returns a
+        :class:`Codec`, or raises ImportError if it is not available.
+      first (bool): If true, prefer this codec to all others when
+        picking the fastest one.
+    """
+    with _codecs_lock:
+        _factories[:] = [f for f in _factories if f[0] != name]
+        if first:
+            _factories.insert(0, (name, factory))
+        else:
+            _factories.insert(len(_factories) - 1, (name, factory))
+        _codecs.pop(name, None)
+
+
+def available():
+    """Get names of all codecs that are installed, fastest first.
+    """
+    return [name for name, _ in list(_factories)
+            if _load_codec(name) is not None]
+
+
+def _load_codec(name):
+    with _codecs_lock:
+        if name not in _codecs:
+            factories = dict(_factories)
+            if name not in factories:
+                raise ValueError('Unknown JSON codec "{}". Known codecs: {}'
+                                 .format(name, ', '.join(factories)))
+            try:
+                _codecs[name] = factories[name]()
+            except ImportError:
+                _codecs[name] = None
+        return _codecs[name]
+
+
+def get_codec(name=None):
+    """Get a JSON codec.
+
+    Args:
+      name (str): Name of the codec, or None to use the environment
+        variable `KB_JSON_CODEC`, or if that is empty the fastest
+        installed codec not in `OPT_IN`.
+    Returns:
+      Codec: The codec.
+    Raises:
+      ValueError: if the named codec is unknown or not installed.
+    """
+    if name is None:
+        name = _os.environ.get(CODEC_ENV, None) or None
+    if name is None:
+        for name, _ in list(_factories):
+            if name in OPT_IN:
+                continue
+            codec = _load_codec(name)
+            if codec is not None:
+                return codec
+    codec = _load_codec(name)
+    if codec is None:
+        raise ValueError('JSON codec "{}" is not installed'.format(name))
+    return codec
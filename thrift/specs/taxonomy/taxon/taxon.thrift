@@ -11,6 +11,22 @@ exception ServiceException {
     4: map<string,string> inputs;
 }
 
+/**
+ * Attributes of one Taxon, as returned by get_taxa.
+ * Only the requested fields are set.
+ */
+struct TaxonInfo {
+    1: ObjectReference ref;
+    2: optional ObjectReference parent;
+    3: optional string scientific_name;
+    4: optional string scientific_lineage;
+    5: optional i32 taxonomic_id;
+    6: optional string kingdom;
+    7: optional string domain;
+    8: optional byte genetic_code;
+    9: optional list<string> aliases;
+}
+
 service thrift_service {
 
     /**
@@ -71,5 +87,13 @@ service thrift_service {
      * Retrieve the aliases.
      *
      */
-    list<string> get_aliases(1:string token, 2:ObjectReference ref) throws (1:ServiceException failure)
+    list<string> get_aliases(1:string token, 2:ObjectReference ref) throws (1:ServiceException failure),
+
+    /**
+     * Retrieve attributes of many Taxa at once.
+     *
+     * @param fields. Names of the TaxonInfo fields to return
+     *                (other than ref). All of them, if empty.
+     */
+    list<TaxonInfo> get_taxa(1:string token, 2:list<ObjectReference> refs, 3:list<string> fields) throws (1:ServiceException failure)
 }